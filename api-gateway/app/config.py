@@ -13,6 +13,14 @@ class Settings(BaseSettings):
     # JWT Settings
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
+    # Asymmetric algorithms (RS256, ES256): PEM public key or JWKS path on the auth service
+    JWT_PUBLIC_KEY: str = ""
+    JWT_JWKS_PATH: str = ""
+    JWKS_REFRESH_INTERVAL: int = 60
+    
+    # Verified token cache
+    TOKEN_CACHE_SIZE: int = 10000
+    TOKEN_CACHE_MAX_TTL: int = 900
     
     # CORS
     ALLOWED_ORIGINS: List[str] = [
@@ -21,11 +29,50 @@ class Settings(BaseSettings):
         "https://connectin.vercel.app",
     ]
     
+    # Redis (shared cache tier; empty disables it)
+    REDIS_URL: str = "redis://redis:6379/0"
+    REDIS_SOCKET_TIMEOUT: float = 0.5
+    
+    # Response cache
+    CACHE_ENABLED: bool = True
+    CACHE_LOCAL_MAX_ENTRIES: int = 1000
+    CACHE_MAX_ENTRY_BYTES: int = 1048576
+    CACHE_INDEX_TTL: int = 3600
+    CACHE_PURGE_TOKEN: str = ""
+    
     # Rate Limiting
+    RATE_LIMIT_ENABLED: bool = True
     RATE_LIMIT_PER_MINUTE: int = 60
+    RATE_LIMIT_LOCAL_HEADROOM: float = 0.5
+    RATE_LIMIT_LOCAL_SYNC_SECONDS: float = 1.0
+    RATE_LIMIT_TRUST_FORWARDED: bool = False
     
     # Timeout
     REQUEST_TIMEOUT: int = 30
+    AUTH_SERVICE_TIMEOUT: float = 10.0
+    PROJECT_SERVICE_TIMEOUT: float = 10.0
+    NOTIFICATION_SERVICE_TIMEOUT: float = 10.0
+    
+    # Upstream connection pool
+    UPSTREAM_HTTP2: bool = True
+    UPSTREAM_MAX_CONNECTIONS: int = 100
+    UPSTREAM_MAX_KEEPALIVE: int = 20
+    UPSTREAM_KEEPALIVE_EXPIRY: float = 30.0
+    UPSTREAM_CONNECT_TIMEOUT: float = 5.0
+    UPSTREAM_POOL_TIMEOUT: float = 5.0
+    
+    # Upstream resilience
+    UPSTREAM_MAX_CONCURRENCY: int = 100
+    UPSTREAM_BULKHEAD_TIMEOUT: float = 1.0
+    BREAKER_FAILURE_THRESHOLD: int = 5
+    BREAKER_RESET_TIMEOUT: float = 30.0
+    BREAKER_HALF_OPEN_MAX_CALLS: int = 1
+    UPSTREAM_RETRIES: int = 2
+    RETRY_BACKOFF_BASE: float = 0.05
+    RETRY_BACKOFF_MAX: float = 1.0
+    RETRY_BUDGET_RATIO: float = 0.2
+    UPSTREAM_HEDGING: bool = False
+    HEDGE_MIN_SAMPLES: int = 20
     
     class Config:
         env_file = ".env"
@@ -2,6 +2,7 @@
 API Gateway - Main Entry Point for ConnectIn Microservices
 Handles routing, authentication verification, and request forwarding
 """
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request, HTTPException, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
@@ -11,18 +12,34 @@ from typing import Optional
 import logging
 
 from app.middleware.auth import verify_token
-from app.routes import auth_routes, project_routes, notification_routes
+from app.routes import auth_routes, project_routes, notification_routes, gateway_routes, bff_routes
 from app.config import settings
+from app.utils.cache import response_cache
+from app.utils.http_client import upstreams
+from app.utils.jwt_keys import verification_keys
+from app.utils.redis_client import close_redis
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open pooled upstream clients on startup and drain them on shutdown"""
+    upstreams.start()
+    await verification_keys.start()
+    response_cache.start()
+    yield
+    await response_cache.stop()
+    await upstreams.close()
+    await close_redis()
+
 # Create FastAPI app
 app = FastAPI(
     title="ConnectIn API Gateway",
     description="Central API Gateway for ConnectIn microservices",
     version="2.0.0",
+    lifespan=lifespan,
 )
 
 # CORS Middleware
@@ -38,6 +55,8 @@ app.add_middleware(
 app.include_router(auth_routes.router, prefix="/auth", tags=["Authentication"])
 app.include_router(project_routes.router, prefix="/projects", tags=["Projects"])
 app.include_router(notification_routes.router, prefix="/notifications", tags=["Notifications"])
+app.include_router(bff_routes.router, prefix="/bff", tags=["BFF"])
+app.include_router(gateway_routes.router, prefix="/gateway", tags=["Gateway"])
 
 # Health check
 @app.get("/health")
@@ -60,7 +79,8 @@ async def root():
         "services": {
             "auth": "/auth",
             "projects": "/projects",
-            "notifications": "/notifications"
+            "notifications": "/notifications",
+            "bff": "/bff"
         }
     }
 
@@ -71,7 +91,8 @@ async def http_exception_handler(request: Request, exc: HTTPException):
     logger.error(f"HTTP error: {exc.status_code} - {exc.detail}")
     return JSONResponse(
         status_code=exc.status_code,
-        content={"error": exc.detail, "status_code": exc.status_code}
+        content={"error": exc.detail, "status_code": exc.status_code},
+        headers=getattr(exc, "headers", None)
     )
 
 @app.exception_handler(Exception)
@@ -1,72 +1,145 @@
 """
 Authentication middleware for API Gateway
 Verifies JWT tokens and extracts user information
+
+Verified payloads are kept in a bounded LRU keyed by the token's SHA-256
+until the token expires, so repeated requests with the same token skip
+signature verification. Dependencies are async so that verification runs
+on the event loop instead of a threadpool hop.
 """
+from collections import OrderedDict
 from fastapi import HTTPException, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import JWTError, jwt
-from typing import Optional
+from typing import Optional, Tuple
+import hashlib
 import logging
+import time
 
 from app.config import settings
+from app.utils.jwt_keys import verification_keys
 
 logger = logging.getLogger(__name__)
 security = HTTPBearer()
 
-def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)) -> dict:
+
+class TokenCache:
+    """Bounded LRU of verified token payloads, each valid until its exp"""
+
+    def __init__(self, max_entries: int, max_ttl: int):
+        self.max_entries = max_entries
+        self.max_ttl = max_ttl
+        self._entries: "OrderedDict[bytes, Tuple[dict, float]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> Optional[dict]:
+        key = self._key(token)
+        entry = self._entries.get(key)
+        if entry is None or entry[1] <= time.time():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, token: str, payload: dict) -> None:
+        expires_at = time.time() + self.max_ttl
+        if isinstance(payload.get("exp"), (int, float)):
+            expires_at = min(expires_at, payload["exp"])
+        key = self._key(token)
+        self._entries[key] = (payload, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+token_cache = TokenCache(settings.TOKEN_CACHE_SIZE, settings.TOKEN_CACHE_MAX_TTL)
+
+
+def _credentials_error(detail: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail=detail,
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+async def decode_token(token: str) -> dict:
+    """
+    Verify signature and claims with the precompiled key
+
+    Raises:
+        JWTError: If the token is malformed, expired or signed with an unknown key
+    """
+    kid = jwt.get_unverified_header(token).get("kid")
+    key = await verification_keys.get(kid)
+    if key is None:
+        raise JWTError(f"Unknown signing key: {kid}")
+    return jwt.decode(token, key, algorithms=[settings.ALGORITHM])
+
+
+async def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)) -> dict:
     """
     Verify JWT token and extract payload
-    
+
     Args:
         credentials: Bearer token from Authorization header
-        
+
     Returns:
         dict: Token payload with user information
-        
+
     Raises:
         HTTPException: If token is invalid or expired
     """
     token = credentials.credentials
-    
-    try:
-        payload = jwt.decode(
-            token,
-            settings.SECRET_KEY,
-            algorithms=[settings.ALGORITHM]
-        )
-        
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid token: missing user ID",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-        
+
+    payload = token_cache.get(token)
+    if payload is not None:
         return payload
-        
+
+    try:
+        payload = await decode_token(token)
     except JWTError as e:
         logger.error(f"Token verification failed: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        raise _credentials_error("Could not validate credentials")
+
+    if payload.get("sub") is None:
+        raise _credentials_error("Invalid token: missing user ID")
+
+    token_cache.put(token, payload)
+    return payload
 
-def get_optional_user(credentials: Optional[HTTPAuthorizationCredentials] = Depends(HTTPBearer(auto_error=False))) -> Optional[dict]:
+
+async def get_optional_user(credentials: Optional[HTTPAuthorizationCredentials] = Depends(HTTPBearer(auto_error=False))) -> Optional[dict]:
     """
     Extract user from token if provided (for optional authentication)
-    
+
     Args:
         credentials: Optional bearer token
-        
+
     Returns:
         dict | None: User payload or None if no token provided
     """
     if credentials is None:
         return None
-    
+
     try:
-        return verify_token(credentials)
+        return await verify_token(credentials)
     except HTTPException:
         return None
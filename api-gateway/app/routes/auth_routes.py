@@ -1,115 +1,22 @@
 """
 Auth routes - Forward authentication requests to auth service
 """
-from fastapi import APIRouter, HTTPException, Request
-from fastapi.responses import JSONResponse
-import httpx
-import logging
+from app.utils.cache import CachePolicy
+from app.utils.proxy import ProxyRoute, build_router
+from app.utils.rate_limit import Quota
 
-from app.config import settings
+# Credential endpoints get tight per-IP quotas against brute force
+ROUTES = [
+    ProxyRoute("POST", "/register", "auth", "/auth/register", summary="Forward registration request to auth service",
+               rate_limit=Quota(5, 60)),
+    ProxyRoute("POST", "/login", "auth", "/auth/login", summary="Forward login request to auth service",
+               rate_limit=Quota(10, 60)),
+    ProxyRoute("POST", "/refresh", "auth", "/auth/refresh", summary="Forward token refresh request to auth service",
+               rate_limit=Quota(20, 60)),
+    ProxyRoute("GET", "/google", "auth", "/auth/google", summary="Forward Google OAuth request to auth service"),
+    ProxyRoute("GET", "/health", "auth", "/health", summary="Check auth service health", timeout=5),
+    ProxyRoute("GET", "/.well-known/jwks.json", "auth", "/.well-known/jwks.json", summary="Public keys for verifying access tokens",
+               cache=CachePolicy(ttl=300, vary_query=False)),
+]
 
-router = APIRouter()
-logger = logging.getLogger(__name__)
-
-@router.post("/register")
-async def register(request: Request):
-    """Forward registration request to auth service"""
-    try:
-        body = await request.json()
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{settings.AUTH_SERVICE_URL}/auth/register",
-                json=body,
-                timeout=settings.REQUEST_TIMEOUT
-            )
-            return JSONResponse(
-                status_code=response.status_code,
-                content=response.json()
-            )
-    except httpx.RequestError as e:
-        logger.error(f"Auth service connection error: {str(e)}")
-        raise HTTPException(
-            status_code=503,
-            detail="Authentication service unavailable"
-        )
-
-@router.post("/login")
-async def login(request: Request):
-    """Forward login request to auth service"""
-    try:
-        body = await request.json()
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{settings.AUTH_SERVICE_URL}/auth/login",
-                json=body,
-                timeout=settings.REQUEST_TIMEOUT
-            )
-            return JSONResponse(
-                status_code=response.status_code,
-                content=response.json()
-            )
-    except httpx.RequestError as e:
-        logger.error(f"Auth service connection error: {str(e)}")
-        raise HTTPException(
-            status_code=503,
-            detail="Authentication service unavailable"
-        )
-
-@router.post("/refresh")
-async def refresh_token(request: Request):
-    """Forward token refresh request to auth service"""
-    try:
-        body = await request.json()
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{settings.AUTH_SERVICE_URL}/auth/refresh",
-                json=body,
-                timeout=settings.REQUEST_TIMEOUT
-            )
-            return JSONResponse(
-                status_code=response.status_code,
-                content=response.json()
-            )
-    except httpx.RequestError as e:
-        logger.error(f"Auth service connection error: {str(e)}")
-        raise HTTPException(
-            status_code=503,
-            detail="Authentication service unavailable"
-        )
-
-@router.get("/google")
-async def google_auth(request: Request):
-    """Forward Google OAuth request to auth service"""
-    try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{settings.AUTH_SERVICE_URL}/auth/google",
-                params=dict(request.query_params),
-                timeout=settings.REQUEST_TIMEOUT
-            )
-            return JSONResponse(
-                status_code=response.status_code,
-                content=response.json()
-            )
-    except httpx.RequestError as e:
-        logger.error(f"Auth service connection error: {str(e)}")
-        raise HTTPException(
-            status_code=503,
-            detail="Authentication service unavailable"
-        )
-
-@router.get("/health")
-async def auth_health():
-    """Check auth service health"""
-    try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{settings.AUTH_SERVICE_URL}/health",
-                timeout=5
-            )
-            return response.json()
-    except httpx.RequestError:
-        raise HTTPException(
-            status_code=503,
-            detail="Authentication service unavailable"
-        )
+router = build_router(ROUTES)
@@ -0,0 +1,18 @@
+"""
+BFF routes - Composite endpoints that replace several client round trips
+"""
+from app.utils.aggregation import CompositePart, CompositeRoute, build_composite_router
+
+ROUTES = [
+    CompositeRoute(
+        "/project/{project_id}",
+        parts=(
+            CompositePart("project", "project", "/projects/{project_id}", timeout=3.0, required=True),
+            CompositePart("applications", "project", "/projects/{project_id}/applications", auth_required=True),
+            CompositePart("viewer", "auth", "/auth/me", auth_required=True),
+        ),
+        summary="Project page: project, applications visible to the viewer and the viewer profile",
+    ),
+]
+
+router = build_composite_router(ROUTES)
@@ -0,0 +1,49 @@
+"""
+Gateway routes - Operational endpoints of the gateway itself
+"""
+from typing import List
+
+from fastapi import APIRouter, Header, HTTPException
+from pydantic import BaseModel
+import hmac
+
+from app.config import settings
+from app.middleware.auth import token_cache
+from app.utils.cache import response_cache
+from app.utils.http_client import upstreams
+from app.utils.rate_limit import rate_limiter
+
+router = APIRouter()
+
+
+class PurgeRequest(BaseModel):
+    paths: List[str]
+
+
+@router.get("/metrics")
+async def gateway_metrics():
+    """Upstream, response cache, rate limiter and token cache counters"""
+    return {
+        "upstreams": upstreams.stats(),
+        "cache": response_cache.stats(),
+        "rate_limit": rate_limiter.stats(),
+        "token_cache": token_cache.stats(),
+    }
+
+
+@router.get("/upstreams")
+async def upstream_status():
+    """Circuit breaker, bulkhead, retry budget and latency state per upstream"""
+    return {"upstreams": upstreams.status()}
+
+
+@router.post("/cache/purge")
+async def purge_cache(
+    body: PurgeRequest,
+    x_purge_token: str = Header(default="")
+):
+    """Purge cached responses for gateway paths on all instances (requires X-Purge-Token)"""
+    if not settings.CACHE_PURGE_TOKEN or not hmac.compare_digest(x_purge_token, settings.CACHE_PURGE_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid purge token")
+    removed = await response_cache.purge(body.paths)
+    return {"purged_paths": body.paths, "removed_entries": removed}
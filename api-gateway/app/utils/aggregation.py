@@ -0,0 +1,155 @@
+"""
+Request aggregation (backend-for-frontend)
+
+A CompositeRoute declares the upstream calls behind one client request.
+The parts are fetched concurrently over the pooled upstream clients, each
+with its own timeout, and merged into one JSON document keyed by part
+name. A failed optional part becomes null and is reported under
+"meta.parts" so the client can render the rest of the page; a failed
+required part fails the whole request with the upstream status.
+"""
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import JSONResponse
+import httpx
+import logging
+
+from app.config import settings
+from app.middleware.auth import get_optional_user
+from app.utils.http_client import upstreams
+from app.utils.proxy import upstream_request_headers
+from app.utils.rate_limit import enforce_rate_limit
+
+logger = logging.getLogger(__name__)
+
+PART_OK = "ok"
+PART_ERROR = "error"
+PART_TIMEOUT = "timeout"
+PART_SKIPPED = "skipped"
+
+
+@dataclass(frozen=True)
+class CompositePart:
+    """
+    One upstream call of a composite endpoint
+
+    Args:
+        name: Key of the part in the merged response
+        upstream: Upstream client name
+        path: Upstream path, formatted with the composite path params
+        timeout: Seconds to wait for this part
+        required: Fail the whole request if this part fails
+        auth_required: Skip the part for anonymous requests
+    """
+    name: str
+    upstream: str
+    path: str
+    timeout: float = 2.0
+    required: bool = False
+    auth_required: bool = False
+
+
+@dataclass(frozen=True)
+class CompositeRoute:
+    path: str
+    parts: Tuple[CompositePart, ...]
+    summary: str = ""
+
+
+def _marker(status: str, started: float, status_code: Optional[int] = None, error: Optional[str] = None) -> dict:
+    marker = {"status": status, "ms": round((time.perf_counter() - started) * 1000, 1)}
+    if status_code is not None:
+        marker["status_code"] = status_code
+    if error:
+        marker["error"] = error
+    return marker
+
+
+async def fetch_part(request: Request, part: CompositePart, user: Optional[dict]) -> Tuple[Any, dict]:
+    """
+    Fetch one part
+
+    Returns:
+        tuple: (parsed JSON body or None, marker for meta.parts)
+    """
+    started = time.perf_counter()
+    if part.auth_required and not user:
+        return None, _marker(PART_SKIPPED, started, error="Authentication required")
+
+    upstream = upstreams.get(part.upstream)
+    try:
+        response = await asyncio.wait_for(
+            upstream.request(
+                "GET",
+                part.path.format(**request.path_params),
+                headers=upstream_request_headers(request, user),
+            ),
+            timeout=part.timeout,
+        )
+    except asyncio.TimeoutError:
+        return None, _marker(PART_TIMEOUT, started, error=f"No response within {part.timeout}s")
+    except httpx.RequestError as e:
+        logger.error(f"Composite part {part.name} failed: {str(e)}")
+        return None, _marker(PART_ERROR, started, error=f"{upstream.label} unavailable")
+
+    if response.status_code >= 400:
+        return None, _marker(PART_ERROR, started, status_code=response.status_code)
+    try:
+        return response.json(), _marker(PART_OK, started, status_code=response.status_code)
+    except ValueError:
+        return None, _marker(PART_ERROR, started, status_code=response.status_code, error="Invalid JSON")
+
+
+async def aggregate(request: Request, route: CompositeRoute, user: Optional[dict]) -> Dict[str, Any]:
+    """
+    Fan out to all parts concurrently and merge the results
+
+    Raises:
+        HTTPException: If a required part fails (its upstream status, 504 on timeout, 503 otherwise)
+    """
+    results = await asyncio.gather(*(fetch_part(request, part, user) for part in route.parts))
+
+    merged: Dict[str, Any] = {}
+    markers: Dict[str, dict] = {}
+    for part, (data, marker) in zip(route.parts, results):
+        if part.required and marker["status"] != PART_OK:
+            status_code = marker.get("status_code") or (504 if marker["status"] == PART_TIMEOUT else 503)
+            raise HTTPException(status_code=status_code, detail=f"Required part '{part.name}' failed")
+        merged[part.name] = data
+        markers[part.name] = marker
+
+    merged["meta"] = {
+        "partial": any(marker["status"] in (PART_ERROR, PART_TIMEOUT) for marker in markers.values()),
+        "parts": markers,
+    }
+    return merged
+
+
+def _make_endpoint(route: CompositeRoute) -> Callable:
+    async def endpoint(request: Request, user: Optional[dict] = Depends(get_optional_user)):
+        decision = None
+        if settings.RATE_LIMIT_ENABLED:
+            decision = await enforce_rate_limit(request, user)
+        response = JSONResponse(content=await aggregate(request, route, user))
+        if decision is not None:
+            response.headers.update(decision.headers())
+        return response
+
+    return endpoint
+
+
+def build_composite_router(routes: List[CompositeRoute]) -> APIRouter:
+    """Create a router with one aggregation endpoint per composite route"""
+    router = APIRouter()
+    for route in routes:
+        router.add_api_route(
+            route.path,
+            _make_endpoint(route),
+            methods=["GET"],
+            summary=route.summary or None,
+        )
+    return router
@@ -0,0 +1,325 @@
+"""
+Gateway response cache
+
+Two tiers: a per-instance LRU in memory and Redis shared by all gateway
+instances. Concurrent identical misses are coalesced into one upstream
+request. Entries live for the route policy TTL unless the upstream
+Cache-Control says otherwise (no-store / no-cache / private disable
+caching, s-maxage overrides the TTL, max-age caps it).
+
+Writes through the gateway and POST /gateway/cache/purge purge all
+variants of a path; purges are broadcast over Redis pub/sub so every
+instance drops its local copies.
+
+Redis keys:
+  gw:cache:{sha256(variant)}   serialized entry
+  gw:cache:index:{path}        SET of entry keys cached for the path
+"""
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+import logging
+
+from app.config import settings
+from app.utils.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "gw:cache:"
+INDEX_PREFIX = "gw:cache:index:"
+PURGE_CHANNEL = "gw:cache:purge"
+LISTENER_RETRY_SECONDS = 5
+
+# Response headers that describe the transfer, not the cached representation
+UNCACHED_HEADERS = {"content-length", "content-encoding", "date", "age", "x-cache"}
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    """
+    Caching rules for a route
+
+    Args:
+        ttl: Seconds an entry stays fresh
+        vary_query: Separate entries per query string
+        vary_user: Separate entries per user (anonymous requests share one)
+    """
+    ttl: int
+    vary_query: bool = True
+    vary_user: bool = False
+
+
+@dataclass
+class CachedResponse:
+    path: str
+    status_code: int
+    headers: List[Tuple[str, str]]
+    body: bytes
+    etag: str
+    stored_at: float
+    expires_at: float
+
+    def age(self) -> int:
+        return max(0, int(time.time() - self.stored_at))
+
+    def is_fresh(self) -> bool:
+        return time.time() < self.expires_at
+
+    def dumps(self) -> bytes:
+        meta = {
+            "path": self.path,
+            "status_code": self.status_code,
+            "headers": self.headers,
+            "etag": self.etag,
+            "stored_at": self.stored_at,
+            "expires_at": self.expires_at,
+        }
+        return json.dumps(meta).encode() + b"\n" + self.body
+
+    @classmethod
+    def loads(cls, raw: bytes) -> "CachedResponse":
+        meta, body = raw.split(b"\n", 1)
+        data = json.loads(meta)
+        data["headers"] = [tuple(header) for header in data["headers"]]
+        return cls(body=body, **data)
+
+
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.sha1(body).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison (RFC 7232 2.3.2) against an If-None-Match header"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag.removeprefix("W/") in candidates
+
+
+def parse_cache_control(value: Optional[str]) -> Dict[str, Optional[str]]:
+    directives: Dict[str, Optional[str]] = {}
+    for part in (value or "").split(","):
+        name, _, arg = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = arg.strip('"') if arg else None
+    return directives
+
+
+def storage_ttl(policy: CachePolicy, cache_control: Optional[str]) -> int:
+    """Seconds to keep a response given the route policy and upstream Cache-Control; 0 = do not store"""
+    directives = parse_cache_control(cache_control)
+    if "no-store" in directives or "no-cache" in directives:
+        return 0
+    if "private" in directives and not policy.vary_user:
+        return 0
+    try:
+        if directives.get("s-maxage") is not None:
+            return max(0, int(directives["s-maxage"]))
+        if directives.get("max-age") is not None:
+            return max(0, min(policy.ttl, int(directives["max-age"])))
+    except ValueError:
+        return 0
+    return policy.ttl
+
+
+def cache_key(path: str, query: str, user_id: Optional[str], policy: CachePolicy) -> str:
+    variant = "|".join([
+        path,
+        query if policy.vary_query else "",
+        (user_id or "anonymous") if policy.vary_user else "",
+    ])
+    return KEY_PREFIX + hashlib.sha256(variant.encode()).hexdigest()
+
+
+class LocalLRU:
+    """Bounded in-process LRU of fresh entries"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if not entry.is_fresh():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def set(self, key: str, entry: CachedResponse) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def purge_paths(self, paths: Iterable[str]) -> int:
+        paths = set(paths)
+        stale = [key for key, entry in self._entries.items() if entry.path in paths]
+        for key in stale:
+            del self._entries[key]
+        return len(stale)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class ResponseCache:
+    def __init__(self):
+        self.local = LocalLRU(settings.CACHE_LOCAL_MAX_ENTRIES)
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._listener: Optional[asyncio.Task] = None
+        self.counters = {"local_hits": 0, "redis_hits": 0, "misses": 0, "coalesced": 0, "stores": 0, "purges": 0}
+
+    async def _redis_get(self, key: str) -> Optional[CachedResponse]:
+        redis = get_redis()
+        if redis is None:
+            return None
+        try:
+            raw = await redis.get(key)
+        except Exception as e:
+            logger.warning(f"Cache read from Redis failed: {e}")
+            return None
+        if raw is None:
+            return None
+        try:
+            entry = CachedResponse.loads(raw)
+        except (ValueError, TypeError, KeyError) as e:
+            logger.warning(f"Dropping undecodable cache entry {key}: {e}")
+            return None
+        return entry if entry.is_fresh() else None
+
+    async def _store(self, key: str, entry: CachedResponse, ttl: int) -> None:
+        self.local.set(key, entry)
+        self.counters["stores"] += 1
+        redis = get_redis()
+        if redis is None:
+            return
+        try:
+            index_key = INDEX_PREFIX + entry.path
+            async with redis.pipeline(transaction=False) as pipe:
+                pipe.set(key, entry.dumps(), ex=ttl)
+                pipe.sadd(index_key, key)
+                pipe.expire(index_key, max(ttl, settings.CACHE_INDEX_TTL))
+                await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Cache write to Redis failed: {e}")
+
+    async def get_or_fetch(
+        self,
+        key: str,
+        fetch: Callable[[], Awaitable[Tuple[CachedResponse, int]]],
+    ) -> Tuple[CachedResponse, str]:
+        """
+        Return a cached response or fetch it, coalescing concurrent misses
+
+        Args:
+            key: Cache key from cache_key
+            fetch: Coroutine factory returning (response, ttl); ttl 0 skips storing
+
+        Returns:
+            tuple: (response, cache status HIT | MISS | COALESCED)
+        """
+        entry = self.local.get(key)
+        if entry is not None:
+            self.counters["local_hits"] += 1
+            return entry, "HIT"
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self.counters["coalesced"] += 1
+            return await asyncio.shield(pending), "COALESCED"
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            entry = await self._redis_get(key)
+            if entry is not None:
+                self.counters["redis_hits"] += 1
+                self.local.set(key, entry)
+                status = "HIT"
+            else:
+                self.counters["misses"] += 1
+                entry, ttl = await fetch()
+                if ttl > 0:
+                    await self._store(key, entry, ttl)
+                status = "MISS"
+            future.set_result(entry)
+            return entry, status
+        except Exception as e:
+            future.set_exception(e)
+            # Followers re-raise it; mark as retrieved when there are none
+            future.exception()
+            raise
+        finally:
+            if not future.done():
+                future.cancel()
+            del self._inflight[key]
+
+    async def purge(self, paths: Iterable[str]) -> int:
+        """Drop every cached variant of the given paths on all gateway instances"""
+        paths = sorted(set(paths))
+        if not paths:
+            return 0
+        self.counters["purges"] += 1
+        removed = self.local.purge_paths(paths)
+        redis = get_redis()
+        if redis is None:
+            return removed
+        try:
+            for path in paths:
+                index_key = INDEX_PREFIX + path
+                keys = await redis.smembers(index_key)
+                await redis.delete(index_key, *keys)
+                removed += len(keys)
+            await redis.publish(PURGE_CHANNEL, json.dumps(paths))
+        except Exception as e:
+            logger.warning(f"Cache purge in Redis failed for {paths}: {e}")
+        return removed
+
+    async def _listen_for_purges(self) -> None:
+        while True:
+            redis = get_redis()
+            if redis is None:
+                return
+            try:
+                pubsub = redis.pubsub()
+                await pubsub.subscribe(PURGE_CHANNEL)
+                try:
+                    async for message in pubsub.listen():
+                        if message.get("type") == "message":
+                            self.local.purge_paths(json.loads(message["data"]))
+                finally:
+                    await pubsub.aclose()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Cache purge listener disconnected: {e}")
+                await asyncio.sleep(LISTENER_RETRY_SECONDS)
+
+    def start(self) -> None:
+        if get_redis() is not None and self._listener is None:
+            self._listener = asyncio.create_task(self._listen_for_purges())
+
+    async def stop(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+
+    def stats(self) -> dict:
+        return {"local_entries": len(self.local), "inflight": len(self._inflight), **self.counters}
+
+
+response_cache = ResponseCache()
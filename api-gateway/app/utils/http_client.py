@@ -0,0 +1,290 @@
+"""
+Pooled upstream HTTP clients for the API Gateway
+
+One long-lived httpx.AsyncClient per upstream service, created in the app
+lifespan and closed on shutdown. Connections are kept alive and reused
+between requests instead of paying TCP/TLS setup on every proxied call.
+HTTP/2 is negotiated via ALPN on https upstreams; plain http upstreams
+stay on HTTP/1.1 keep-alive.
+
+Each upstream has its own circuit breaker, bulkhead and retry budget
+(app.utils.resilience). The bulkhead slot is held until response headers
+arrive; streamed bodies do not occupy it.
+"""
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+import httpx
+import logging
+
+from app.config import settings
+from app.utils.resilience import (
+    RETRYABLE_STATUSES,
+    Bulkhead,
+    BulkheadFullError,
+    CircuitBreaker,
+    CircuitOpenError,
+    LatencyWindow,
+    RetryBudget,
+    backoff_delay,
+)
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+def _close_orphaned_response(task: asyncio.Task) -> None:
+    """Close the response of a hedge attempt that finished after losing"""
+    if not task.cancelled() and task.exception() is None:
+        asyncio.ensure_future(task.result().aclose())
+
+
+@dataclass
+class UpstreamMetrics:
+    """Request counters and latency for a single upstream"""
+    requests: int = 0
+    errors: int = 0
+    in_flight: int = 0
+    hedged: int = 0
+    status_classes: Dict[str, int] = field(default_factory=dict)
+    latency_total_ms: float = 0.0
+    latency_max_ms: float = 0.0
+
+    def as_dict(self) -> dict:
+        completed = self.requests - self.errors - self.in_flight
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "in_flight": self.in_flight,
+            "hedged": self.hedged,
+            "status_classes": dict(self.status_classes),
+            "latency_avg_ms": round(self.latency_total_ms / completed, 2) if completed > 0 else 0.0,
+            "latency_max_ms": round(self.latency_max_ms, 2),
+        }
+
+
+class UpstreamClient:
+    """Pooled client bound to one upstream service"""
+
+    def __init__(self, name: str, label: str, base_url: str, timeout: float):
+        self.name = name
+        self.label = label
+        self.base_url = base_url
+        self.timeout = timeout
+        self.metrics = UpstreamMetrics()
+        self.breaker = CircuitBreaker(
+            settings.BREAKER_FAILURE_THRESHOLD,
+            settings.BREAKER_RESET_TIMEOUT,
+            settings.BREAKER_HALF_OPEN_MAX_CALLS,
+        )
+        self.bulkhead = Bulkhead(settings.UPSTREAM_MAX_CONCURRENCY, settings.UPSTREAM_BULKHEAD_TIMEOUT)
+        self.retry_budget = RetryBudget(settings.RETRY_BUDGET_RATIO)
+        self.latency = LatencyWindow()
+        self.client = httpx.AsyncClient(
+            base_url=base_url,
+            http2=settings.UPSTREAM_HTTP2,
+            limits=httpx.Limits(
+                max_connections=settings.UPSTREAM_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.UPSTREAM_MAX_KEEPALIVE,
+                keepalive_expiry=settings.UPSTREAM_KEEPALIVE_EXPIRY,
+            ),
+            timeout=httpx.Timeout(
+                timeout,
+                connect=settings.UPSTREAM_CONNECT_TIMEOUT,
+                pool=settings.UPSTREAM_POOL_TIMEOUT,
+            ),
+        )
+
+    def build_request(self, method: str, path: str, **kwargs) -> httpx.Request:
+        return self.client.build_request(method, path, **kwargs)
+
+    async def _send_once(self, request: httpx.Request, stream: bool) -> httpx.Response:
+        """Single attempt through the breaker and bulkhead, with metrics"""
+        self.breaker.before_call(request)
+        try:
+            await self.bulkhead.acquire(request)
+        except BaseException:
+            self.breaker.cancel_call()
+            raise
+
+        self.metrics.requests += 1
+        self.metrics.in_flight += 1
+        started = time.perf_counter()
+        try:
+            response = await self.client.send(request, stream=stream)
+        except httpx.RequestError:
+            self.metrics.errors += 1
+            self.breaker.record_failure()
+            raise
+        except BaseException:
+            self.breaker.cancel_call()
+            raise
+        finally:
+            self.metrics.in_flight -= 1
+            self.bulkhead.release()
+
+        elapsed = time.perf_counter() - started
+        self.metrics.latency_total_ms += elapsed * 1000
+        self.metrics.latency_max_ms = max(self.metrics.latency_max_ms, elapsed * 1000)
+        status_class = f"{response.status_code // 100}xx"
+        self.metrics.status_classes[status_class] = self.metrics.status_classes.get(status_class, 0) + 1
+        if response.status_code in RETRYABLE_STATUSES:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+            if request.method in IDEMPOTENT_METHODS:
+                self.latency.add(elapsed)
+        return response
+
+    async def _send_hedged(self, request: httpx.Request, stream: bool) -> httpx.Response:
+        """
+        Send a second copy if the first has not answered within the observed p95;
+        the first successful response wins and the other attempt is cancelled
+        """
+        delay = self.latency.p95()
+        if delay is None:
+            return await self._send_once(request, stream)
+
+        pending = {asyncio.create_task(self._send_once(request, stream))}
+        error: Optional[BaseException] = None
+        try:
+            done, pending = await asyncio.wait(pending, timeout=delay)
+            if not done:
+                self.metrics.hedged += 1
+                pending.add(asyncio.create_task(self._send_once(request, stream)))
+            while True:
+                for task in done:
+                    if task.exception() is None:
+                        # Both may finish in the same tick; close the extra response
+                        for other in done - {task}:
+                            if other.exception() is None:
+                                await other.result().aclose()
+                        return task.result()
+                    error = task.exception()
+                if not pending:
+                    raise error
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in pending:
+                task.cancel()
+                task.add_done_callback(_close_orphaned_response)
+
+    async def send(self, request: httpx.Request, stream: bool = False) -> httpx.Response:
+        """
+        Send a request through the pool with breaker, bulkhead, retries and hedging
+
+        Only idempotent requests are retried (connection errors, timeouts and
+        502/503/504, within the retry budget) or hedged.
+
+        Args:
+            request: Request built with build_request
+            stream: Return as soon as headers arrive; caller must close the response
+
+        Returns:
+            httpx.Response: Upstream response
+
+        Raises:
+            httpx.RequestError: If the upstream cannot be reached, the breaker is open
+                or the bulkhead is full
+        """
+        idempotent = request.method in IDEMPOTENT_METHODS
+        attempts = 1 + (settings.UPSTREAM_RETRIES if idempotent else 0)
+        self.retry_budget.deposit()
+        for attempt in range(attempts):
+            last_attempt = attempt == attempts - 1
+            try:
+                if idempotent and settings.UPSTREAM_HEDGING:
+                    response = await self._send_hedged(request, stream)
+                else:
+                    response = await self._send_once(request, stream)
+            except (CircuitOpenError, BulkheadFullError):
+                raise
+            except httpx.RequestError:
+                if last_attempt or not self.retry_budget.withdraw():
+                    raise
+                await asyncio.sleep(backoff_delay(attempt))
+                continue
+
+            if response.status_code in RETRYABLE_STATUSES and not last_attempt and self.retry_budget.withdraw():
+                await response.aclose()
+                await asyncio.sleep(backoff_delay(attempt))
+                continue
+            return response
+
+    async def request(self, method: str, path: str, **kwargs) -> httpx.Response:
+        return await self.send(self.build_request(method, path, **kwargs))
+
+    def pool_stats(self) -> dict:
+        """Connection pool state (relies on httpcore internals, best effort)"""
+        pool = getattr(getattr(self.client, "_transport", None), "_pool", None)
+        connections = getattr(pool, "connections", None)
+        if connections is None:
+            return {}
+        return {
+            "connections": len(connections),
+            "idle": sum(1 for conn in connections if conn.is_idle()),
+            "http2": sum(1 for conn in connections if "HTTP/2" in repr(conn)),
+        }
+
+    def status(self) -> dict:
+        """Resilience state for /gateway/upstreams"""
+        p95 = self.latency.p95()
+        return {
+            "base_url": self.base_url,
+            "breaker": self.breaker.status(),
+            "bulkhead": self.bulkhead.status(),
+            "retry_budget": self.retry_budget.status(),
+            "latency_p95_ms": round(p95 * 1000, 2) if p95 is not None else None,
+            "hedging": settings.UPSTREAM_HEDGING,
+        }
+
+    def stats(self) -> dict:
+        return {
+            "base_url": self.base_url,
+            "timeout": self.timeout,
+            **self.metrics.as_dict(),
+            "pool": self.pool_stats(),
+        }
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+
+class UpstreamRegistry:
+    """Holds the pooled clients for all upstream services"""
+
+    def __init__(self):
+        self._clients: Dict[str, UpstreamClient] = {}
+
+    def start(self) -> None:
+        upstreams = {
+            "auth": ("Authentication service", settings.AUTH_SERVICE_URL, settings.AUTH_SERVICE_TIMEOUT),
+            "project": ("Project service", settings.PROJECT_SERVICE_URL, settings.PROJECT_SERVICE_TIMEOUT),
+            "notification": ("Notification service", settings.NOTIFICATION_SERVICE_URL, settings.NOTIFICATION_SERVICE_TIMEOUT),
+        }
+        for name, (label, base_url, timeout) in upstreams.items():
+            self._clients[name] = UpstreamClient(name, label, base_url, timeout)
+        logger.info(f"Upstream clients started: {', '.join(self._clients)}")
+
+    async def close(self) -> None:
+        for upstream in self._clients.values():
+            await upstream.aclose()
+        self._clients.clear()
+
+    def get(self, name: str) -> UpstreamClient:
+        upstream: Optional[UpstreamClient] = self._clients.get(name)
+        if upstream is None:
+            raise RuntimeError(f"Upstream client '{name}' is not started")
+        return upstream
+
+    def stats(self) -> dict:
+        return {name: upstream.stats() for name, upstream in self._clients.items()}
+
+    def status(self) -> dict:
+        return {name: upstream.status() for name, upstream in self._clients.items()}
+
+
+upstreams = UpstreamRegistry()
@@ -0,0 +1,79 @@
+"""
+JWT verification keys
+
+Keys are constructed once (jose Key objects) instead of on every decode.
+HS* tokens use SECRET_KEY. For asymmetric algorithms (RS256, ES256) the
+public key comes from JWT_PUBLIC_KEY, or from the auth service JWKS
+(JWT_JWKS_PATH) selected by the token's "kid"; an unknown kid triggers a
+JWKS refresh, at most once per JWKS_REFRESH_INTERVAL.
+"""
+import time
+from typing import Dict, Optional
+
+from jose import jwk
+from jose.backends.base import Key
+import httpx
+import logging
+
+from app.config import settings
+from app.utils.http_client import upstreams
+
+logger = logging.getLogger(__name__)
+
+
+class VerificationKeys:
+    def __init__(self):
+        self._keys: Dict[Optional[str], Key] = {}
+        self._jwks_fetched_at = 0.0
+
+    @property
+    def uses_jwks(self) -> bool:
+        return not settings.ALGORITHM.startswith("HS") and bool(settings.JWT_JWKS_PATH)
+
+    def load_static(self) -> None:
+        if settings.ALGORITHM.startswith("HS"):
+            self._keys = {None: jwk.construct(settings.SECRET_KEY, settings.ALGORITHM)}
+        elif settings.JWT_PUBLIC_KEY:
+            self._keys = {None: jwk.construct(settings.JWT_PUBLIC_KEY, settings.ALGORITHM)}
+
+    async def refresh_jwks(self) -> None:
+        """Reload public keys from the auth service JWKS endpoint"""
+        self._jwks_fetched_at = time.monotonic()
+        try:
+            response = await upstreams.get("auth").request("GET", settings.JWT_JWKS_PATH)
+            response.raise_for_status()
+            keys = {}
+            for data in response.json().get("keys", []):
+                if data.get("alg", settings.ALGORITHM) == settings.ALGORITHM:
+                    keys[data.get("kid")] = jwk.construct(data, settings.ALGORITHM)
+        except (httpx.HTTPError, ValueError) as e:
+            logger.error(f"JWKS refresh failed: {str(e)}")
+            return
+        self._keys = keys
+        logger.info(f"Loaded {len(keys)} JWT verification key(s) from JWKS")
+
+    async def start(self) -> None:
+        self.load_static()
+        if self.uses_jwks:
+            await self.refresh_jwks()
+
+    async def get(self, kid: Optional[str]) -> Optional[Key]:
+        """
+        Key for a token header kid
+
+        Args:
+            kid: Key ID from the unverified token header
+
+        Returns:
+            Key | None: Verification key, or None if unknown after a refresh
+        """
+        if not self._keys and not self.uses_jwks:
+            self.load_static()
+        key = self._keys.get(kid) or (self._keys.get(None) if not self.uses_jwks else None)
+        if key is None and self.uses_jwks and time.monotonic() - self._jwks_fetched_at > settings.JWKS_REFRESH_INTERVAL:
+            await self.refresh_jwks()
+            key = self._keys.get(kid)
+        return key
+
+
+verification_keys = VerificationKeys()
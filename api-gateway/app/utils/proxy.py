@@ -0,0 +1,280 @@
+"""
+Generic streaming reverse proxy
+
+Routes are declared as a table of ProxyRoute entries and turned into a
+router by build_router. Request and response bodies are streamed chunk by
+chunk through the pooled upstream clients without being parsed; status
+and end-to-end headers pass through unchanged. The verified user ID is
+sent upstream as X-User-ID.
+
+Routes with a CachePolicy serve GETs through the response cache (bodies
+are buffered there); routes with purges drop cached paths after a
+successful write.
+"""
+import math
+import time
+from dataclasses import dataclass
+from typing import AsyncIterator, Callable, List, Optional, Tuple
+from urllib.parse import urlencode
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import Response, StreamingResponse
+import httpx
+import logging
+
+from app.config import settings
+from app.middleware.auth import verify_token, get_optional_user
+from app.utils.cache import (
+    UNCACHED_HEADERS,
+    CachedResponse,
+    CachePolicy,
+    cache_key,
+    etag_matches,
+    make_etag,
+    response_cache,
+    storage_ttl,
+)
+from app.utils.http_client import upstreams
+from app.utils.rate_limit import Quota, enforce_rate_limit
+from app.utils.resilience import CircuitOpenError
+
+logger = logging.getLogger(__name__)
+
+AUTH_NONE = "none"
+AUTH_OPTIONAL = "optional"
+AUTH_REQUIRED = "required"
+
+# Hop-by-hop headers (RFC 7230 6.1) are never forwarded
+HOP_BY_HOP_HEADERS = {
+    "connection",
+    "keep-alive",
+    "proxy-authenticate",
+    "proxy-authorization",
+    "te",
+    "trailer",
+    "transfer-encoding",
+    "upgrade",
+}
+
+# Request headers the gateway sets itself
+GATEWAY_REQUEST_HEADERS = HOP_BY_HOP_HEADERS | {"host", "x-user-id", "x-forwarded-for", "x-forwarded-proto"}
+
+
+@dataclass(frozen=True)
+class ProxyRoute:
+    """
+    One proxied endpoint
+
+    Args:
+        method: HTTP method
+        path: Gateway path relative to the router prefix, may contain {params}
+        upstream: Upstream client name
+        upstream_path: Upstream path, formatted with the gateway path params
+        auth: AUTH_NONE, AUTH_OPTIONAL or AUTH_REQUIRED
+        summary: Endpoint description for the docs
+        timeout: Overrides the upstream read timeout
+        cache: Response cache policy for GET requests
+        purges: Cached gateway paths to purge after a successful request, formatted with path params
+        rate_limit: Route quota; routes without one share the global RATE_LIMIT_PER_MINUTE bucket
+    """
+    method: str
+    path: str
+    upstream: str
+    upstream_path: str
+    auth: str = AUTH_NONE
+    summary: str = ""
+    timeout: Optional[float] = None
+    cache: Optional[CachePolicy] = None
+    purges: Tuple[str, ...] = ()
+    rate_limit: Optional[Quota] = None
+
+    @property
+    def name(self) -> str:
+        return f"{self.upstream}:{self.method.lower()}:{self.upstream_path}"
+
+
+def _no_user() -> None:
+    return None
+
+
+AUTH_DEPENDENCIES = {
+    AUTH_NONE: _no_user,
+    AUTH_OPTIONAL: get_optional_user,
+    AUTH_REQUIRED: verify_token,
+}
+
+
+def upstream_request_headers(request: Request, user: Optional[dict]) -> dict:
+    headers = {
+        key: value for key, value in request.headers.items()
+        if key.lower() not in GATEWAY_REQUEST_HEADERS
+    }
+    client_host = request.client.host if request.client else None
+    forwarded_for = request.headers.get("x-forwarded-for")
+    if client_host:
+        headers["X-Forwarded-For"] = f"{forwarded_for}, {client_host}" if forwarded_for else client_host
+    headers["X-Forwarded-Proto"] = request.url.scheme
+    if user:
+        headers["X-User-ID"] = str(user.get("sub"))
+    return headers
+
+
+def client_response_headers(response: httpx.Response) -> List[Tuple[bytes, bytes]]:
+    """Raw upstream headers without hop-by-hop ones (repeated headers such as Set-Cookie kept)"""
+    return [
+        (key.lower(), value) for key, value in response.headers.raw
+        if key.decode("latin-1").lower() not in HOP_BY_HOP_HEADERS
+    ]
+
+
+def _build_upstream_request(request: Request, route: ProxyRoute, user: Optional[dict]) -> httpx.Request:
+    upstream = upstreams.get(route.upstream)
+    has_body = "content-length" in request.headers or "transfer-encoding" in request.headers
+    extra = {"timeout": route.timeout} if route.timeout is not None else {}
+    return upstream.build_request(
+        request.method,
+        route.upstream_path.format(**request.path_params),
+        params=request.query_params.multi_items(),
+        headers=upstream_request_headers(request, user),
+        content=request.stream() if has_body else None,
+        **extra
+    )
+
+
+async def _send(route: ProxyRoute, upstream_request: httpx.Request, stream: bool) -> httpx.Response:
+    upstream = upstreams.get(route.upstream)
+    try:
+        return await upstream.send(upstream_request, stream=stream)
+    except CircuitOpenError:
+        raise HTTPException(
+            status_code=503,
+            detail=f"{upstream.label} unavailable",
+            headers={"Retry-After": str(math.ceil(upstream.breaker.status()["retry_in_seconds"]) or 1)},
+        )
+    except httpx.TimeoutException as e:
+        logger.error(f"{upstream.label} timeout: {str(e)}")
+        raise HTTPException(status_code=504, detail=f"{upstream.label} timeout")
+    except httpx.RequestError as e:
+        logger.error(f"{upstream.label} connection error: {str(e)}")
+        raise HTTPException(status_code=503, detail=f"{upstream.label} unavailable")
+
+
+async def _relay_body(response: httpx.Response) -> AsyncIterator[bytes]:
+    """Raw upstream body; the upstream response is closed however streaming ends"""
+    try:
+        async for chunk in response.aiter_raw():
+            yield chunk
+    finally:
+        # Also runs when the client disconnects and the stream is abandoned,
+        # where a background task would be skipped
+        await response.aclose()
+
+
+async def proxy_request(request: Request, route: ProxyRoute, user: Optional[dict]) -> Response:
+    """
+    Stream a client request to the upstream and the response back
+
+    Args:
+        request: Incoming client request
+        route: Matched route table entry
+        user: Verified token payload or None
+
+    Returns:
+        Response: Upstream status, headers and raw body (from cache for cached routes)
+
+    Raises:
+        HTTPException: 503 if the upstream is unreachable, 504 on timeout
+    """
+    if route.cache is not None and request.method == "GET" and settings.CACHE_ENABLED:
+        return await cached_proxy_request(request, route, user)
+
+    response = await _send(route, _build_upstream_request(request, route, user), stream=True)
+
+    if route.purges and response.status_code < 400:
+        # Purge before answering so the client's next read sees the change
+        try:
+            await response_cache.purge(path.format(**request.path_params) for path in route.purges)
+        except BaseException:
+            await response.aclose()
+            raise
+
+    streaming = StreamingResponse(_relay_body(response), status_code=response.status_code)
+    streaming.raw_headers = client_response_headers(response)
+    return streaming
+
+
+async def cached_proxy_request(request: Request, route: ProxyRoute, user: Optional[dict]) -> Response:
+    """Serve a GET from the response cache, fetching and storing it on a miss"""
+    policy = route.cache
+    path = request.url.path
+    user_id = str(user.get("sub")) if user else None
+    key = cache_key(path, urlencode(sorted(request.query_params.multi_items())), user_id, policy)
+
+    async def fetch() -> Tuple[CachedResponse, int]:
+        response = await _send(route, _build_upstream_request(request, route, user), stream=False)
+        body = response.content
+        headers = [
+            (name.decode("latin-1"), value.decode("latin-1"))
+            for name, value in client_response_headers(response)
+            if name.decode("latin-1") not in UNCACHED_HEADERS | {"etag"}
+        ]
+        cacheable = (
+            response.status_code == 200
+            and "set-cookie" not in response.headers
+            and len(body) <= settings.CACHE_MAX_ENTRY_BYTES
+        )
+        ttl = storage_ttl(policy, response.headers.get("cache-control")) if cacheable else 0
+        etag = (response.headers.get("etag") or make_etag(body)) if response.status_code == 200 else ""
+        now = time.time()
+        return CachedResponse(path, response.status_code, headers, body, etag, now, now + ttl), ttl
+
+    entry, cache_status = await response_cache.get_or_fetch(key, fetch)
+    return cached_response(request, entry, cache_status)
+
+
+def cached_response(request: Request, entry: CachedResponse, cache_status: str) -> Response:
+    extra = [("x-cache", cache_status)]
+    if entry.etag:
+        extra.append(("etag", entry.etag))
+    if cache_status == "HIT":
+        extra.append(("age", str(entry.age())))
+
+    if entry.etag and etag_matches(request.headers.get("if-none-match"), entry.etag):
+        response = Response(status_code=304)
+        keep = [(k, v) for k, v in entry.headers if k in ("cache-control", "vary", "expires")]
+    else:
+        response = Response(content=entry.body, status_code=entry.status_code)
+        keep = entry.headers
+    response.raw_headers.extend(
+        (k.encode("latin-1"), v.encode("latin-1")) for k, v in keep + extra
+    )
+    return response
+
+
+def _make_endpoint(route: ProxyRoute) -> Callable:
+    auth_dependency = AUTH_DEPENDENCIES[route.auth]
+
+    async def endpoint(request: Request, user: Optional[dict] = Depends(auth_dependency)):
+        decision = None
+        if settings.RATE_LIMIT_ENABLED:
+            decision = await enforce_rate_limit(request, user, route.name, route.rate_limit)
+        response = await proxy_request(request, route, user)
+        if decision is not None:
+            response.headers.update(decision.headers())
+        return response
+
+    return endpoint
+
+
+def build_router(routes: List[ProxyRoute]) -> APIRouter:
+    """Create a router with one streaming proxy endpoint per table entry, in table order"""
+    router = APIRouter()
+    for route in routes:
+        router.add_api_route(
+            route.path,
+            _make_endpoint(route),
+            methods=[route.method],
+            summary=route.summary or None,
+            name=route.name,
+        )
+    return router
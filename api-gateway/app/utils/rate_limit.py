@@ -0,0 +1,227 @@
+"""
+Distributed token-bucket rate limiter
+
+Buckets live in Redis and are updated atomically by a Lua script, so all
+gateway instances share one budget per (scope, client). A client is the
+user ID for authenticated requests and the IP address otherwise.
+
+Local pre-check: each instance remembers the remaining tokens reported by
+the last Redis call. While that figure is well above the headroom
+threshold and recent, requests are admitted in-process and the tokens they
+spent are sent to Redis as debt on the next call. Clients far from their
+limit therefore cost one Redis round trip per sync interval instead of one
+per request. When Redis is unavailable the same algorithm runs on
+per-instance buckets.
+
+Redis keys:
+  gw:rl:{scope}:{client}   HASH tokens, ts (expires once the bucket would be full)
+"""
+import math
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from fastapi import HTTPException, Request
+import logging
+
+from app.config import settings
+from app.utils.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "gw:rl:"
+LOCAL_MAX_KEYS = 10000
+
+# KEYS[1] bucket; ARGV capacity, refill tokens/sec, cost, debt
+TOKEN_BUCKET_LUA = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local debt = tonumber(ARGV[4])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1])
+local ts = tonumber(state[2])
+if tokens == nil then
+  tokens = capacity
+  ts = now
+end
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+tokens = math.max(0, tokens - debt)
+local allowed = 0
+if tokens >= cost then
+  tokens = tokens - cost
+  allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return {allowed, tostring(tokens)}
+"""
+
+
+@dataclass(frozen=True)
+class Quota:
+    """
+    Requests allowed per period; bursts up to `limit`, refilled continuously
+
+    Args:
+        limit: Bucket capacity
+        period: Seconds to refill an empty bucket
+    """
+    limit: int
+    period: int = 60
+
+    @property
+    def rate(self) -> float:
+        return self.limit / self.period
+
+
+@dataclass
+class RateLimitDecision:
+    allowed: bool
+    limit: int
+    remaining: float
+    rate: float
+
+    def headers(self) -> Dict[str, str]:
+        headers = {
+            "X-RateLimit-Limit": str(self.limit),
+            "X-RateLimit-Remaining": str(max(0, int(self.remaining))),
+            "X-RateLimit-Reset": str(math.ceil((self.limit - self.remaining) / self.rate)),
+        }
+        if not self.allowed:
+            headers["Retry-After"] = str(max(1, math.ceil((1 - self.remaining) / self.rate)))
+        return headers
+
+
+@dataclass
+class LocalBucket:
+    """Last remaining count seen in Redis plus tokens spent locally since then"""
+    tokens: float
+    synced_at: float
+    pending: int = 0
+
+
+def take_tokens(bucket: LocalBucket, quota: Quota, now: float, cost: int = 1) -> bool:
+    """Python twin of the Lua script, used when Redis is unavailable"""
+    bucket.tokens = min(quota.limit, bucket.tokens + max(0.0, now - bucket.synced_at) * quota.rate)
+    bucket.synced_at = now
+    if bucket.tokens >= cost:
+        bucket.tokens -= cost
+        return True
+    return False
+
+
+def client_identity(request: Request, user: Optional[dict]) -> str:
+    if user and user.get("sub") is not None:
+        return f"user:{user.get('sub')}"
+    forwarded_for = request.headers.get("x-forwarded-for")
+    if settings.RATE_LIMIT_TRUST_FORWARDED and forwarded_for:
+        return f"ip:{forwarded_for.split(',')[0].strip()}"
+    return f"ip:{request.client.host if request.client else 'unknown'}"
+
+
+class RateLimiter:
+    def __init__(self):
+        self._local: "OrderedDict[str, LocalBucket]" = OrderedDict()
+        self._script = None
+        self.counters = {"local_decisions": 0, "redis_decisions": 0, "fallback_decisions": 0, "rejected": 0}
+
+    def _bucket(self, key: str) -> Optional[LocalBucket]:
+        bucket = self._local.get(key)
+        if bucket is not None:
+            self._local.move_to_end(key)
+        return bucket
+
+    def _remember(self, key: str, bucket: LocalBucket) -> None:
+        self._local[key] = bucket
+        self._local.move_to_end(key)
+        while len(self._local) > LOCAL_MAX_KEYS:
+            self._local.popitem(last=False)
+
+    async def _redis_take(self, key: str, quota: Quota, debt: int) -> Optional[Tuple[bool, float]]:
+        redis = get_redis()
+        if redis is None:
+            return None
+        try:
+            if self._script is None:
+                self._script = redis.register_script(TOKEN_BUCKET_LUA)
+            allowed, tokens = await self._script(keys=[key], args=[quota.limit, quota.rate, 1, debt])
+            return bool(int(allowed)), float(tokens)
+        except Exception as e:
+            logger.warning(f"Rate limit check in Redis failed, using local bucket: {e}")
+            return None
+
+    async def hit(self, scope: str, identity: str, quota: Quota) -> RateLimitDecision:
+        """
+        Consume one token from the client's bucket for the scope
+
+        Args:
+            scope: Quota scope (route name or "global")
+            identity: Client identity from client_identity
+            quota: Bucket size and refill period
+
+        Returns:
+            RateLimitDecision: Whether the request is allowed plus header values
+        """
+        key = f"{KEY_PREFIX}{scope}:{identity}"
+        now = time.monotonic()
+        bucket = self._bucket(key)
+
+        if (
+            bucket is not None
+            and now - bucket.synced_at < settings.RATE_LIMIT_LOCAL_SYNC_SECONDS
+            and bucket.tokens - bucket.pending - 1 >= quota.limit * settings.RATE_LIMIT_LOCAL_HEADROOM
+        ):
+            bucket.pending += 1
+            self.counters["local_decisions"] += 1
+            return RateLimitDecision(True, quota.limit, bucket.tokens - bucket.pending, quota.rate)
+
+        debt = bucket.pending if bucket is not None else 0
+        result = await self._redis_take(key, quota, debt)
+        if result is not None:
+            allowed, tokens = result
+            self._remember(key, LocalBucket(tokens=tokens, synced_at=now))
+            self.counters["redis_decisions"] += 1
+        else:
+            if bucket is None:
+                bucket = LocalBucket(tokens=quota.limit, synced_at=now)
+                self._remember(key, bucket)
+            bucket.tokens = max(0.0, bucket.tokens - bucket.pending)
+            bucket.pending = 0
+            allowed = take_tokens(bucket, quota, now)
+            tokens = bucket.tokens
+            self.counters["fallback_decisions"] += 1
+
+        if not allowed:
+            self.counters["rejected"] += 1
+        return RateLimitDecision(allowed, quota.limit, tokens, quota.rate)
+
+    def stats(self) -> dict:
+        return {"tracked_clients": len(self._local), **self.counters}
+
+
+rate_limiter = RateLimiter()
+
+
+async def enforce_rate_limit(
+    request: Request,
+    user: Optional[dict],
+    scope: str = "global",
+    quota: Optional[Quota] = None,
+) -> RateLimitDecision:
+    """
+    Charge the request to the client's bucket; without a quota the global
+    RATE_LIMIT_PER_MINUTE bucket is used
+
+    Raises:
+        HTTPException: 429 with Retry-After and X-RateLimit-* headers when the bucket is empty
+    """
+    if quota is None:
+        scope, quota = "global", Quota(settings.RATE_LIMIT_PER_MINUTE)
+    decision = await rate_limiter.hit(scope, client_identity(request, user), quota)
+    if not decision.allowed:
+        raise HTTPException(status_code=429, detail="Rate limit exceeded", headers=decision.headers())
+    return decision
@@ -0,0 +1,42 @@
+"""
+Shared Redis connection for the API Gateway
+
+Redis is an optional shared tier: when REDIS_URL is empty, or Redis is
+down, gateway features fall back to per-instance in-memory state.
+"""
+from typing import Optional
+
+from redis import asyncio as redis_asyncio
+import logging
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+_redis: Optional[redis_asyncio.Redis] = None
+
+
+def get_redis() -> Optional[redis_asyncio.Redis]:
+    """
+    Get the process-wide Redis client (created lazily, pooled)
+
+    Returns:
+        Redis | None: Client with binary responses, or None if Redis is not configured
+    """
+    global _redis
+    if not settings.REDIS_URL:
+        return None
+    if _redis is None:
+        _redis = redis_asyncio.from_url(
+            settings.REDIS_URL,
+            socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+            socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT,
+        )
+    return _redis
+
+
+async def close_redis() -> None:
+    global _redis
+    if _redis is not None:
+        await _redis.aclose()
+        _redis = None
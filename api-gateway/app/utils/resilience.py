@@ -0,0 +1,169 @@
+"""
+Resilience primitives for upstream calls
+
+- CircuitBreaker: closed -> open after consecutive failures, open -> half-open
+  after a cool-down, half-open lets a few probes through and closes on success
+- Bulkhead: caps concurrent requests per upstream so one slow service cannot
+  take every gateway worker
+- RetryBudget: retries may add at most a fixed share of recent traffic
+- LatencyWindow: rolling latency samples, p95 drives hedged requests
+"""
+import asyncio
+import random
+import time
+from collections import deque
+from typing import Deque, Optional
+
+import httpx
+
+from app.config import settings
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Upstream statuses that count as failures and are worth retrying
+RETRYABLE_STATUSES = {502, 503, 504}
+
+
+class CircuitOpenError(httpx.RequestError):
+    """Upstream is failing; request rejected without being sent"""
+
+
+class BulkheadFullError(httpx.RequestError):
+    """Upstream concurrency limit reached and no slot freed up in time"""
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int, reset_timeout: float, half_open_max_calls: int):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.half_open_calls = 0
+        self.times_opened = 0
+
+    def before_call(self, request: httpx.Request) -> None:
+        """
+        Admit or reject a call
+
+        Raises:
+            CircuitOpenError: While open, or when half-open probes are exhausted
+        """
+        if self.state == OPEN:
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                raise CircuitOpenError("Circuit breaker is open", request=request)
+            self.state = HALF_OPEN
+            self.half_open_calls = 0
+        if self.state == HALF_OPEN:
+            if self.half_open_calls >= self.half_open_max_calls:
+                raise CircuitOpenError("Circuit breaker is half-open, probe in progress", request=request)
+            self.half_open_calls += 1
+
+    def cancel_call(self) -> None:
+        """Call admitted by before_call ended without an outcome (rejected by the bulkhead, cancelled)"""
+        if self.state == HALF_OPEN and self.half_open_calls > 0:
+            self.half_open_calls -= 1
+
+    def record_success(self) -> None:
+        self.consecutive_failures = 0
+        self.state = CLOSED
+
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+        if self.state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != OPEN:
+                self.times_opened += 1
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+
+    def status(self) -> dict:
+        retry_in = max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at)) if self.state == OPEN else 0.0
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "times_opened": self.times_opened,
+            "retry_in_seconds": round(retry_in, 1),
+        }
+
+
+class Bulkhead:
+    def __init__(self, max_concurrency: int, acquire_timeout: float):
+        self.max_concurrency = max_concurrency
+        self.acquire_timeout = acquire_timeout
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.in_use = 0
+        self.rejected = 0
+
+    async def acquire(self, request: httpx.Request) -> None:
+        """
+        Raises:
+            BulkheadFullError: If no slot frees up within acquire_timeout
+        """
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=self.acquire_timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise BulkheadFullError("Upstream concurrency limit reached", request=request)
+        self.in_use += 1
+
+    def release(self) -> None:
+        self.in_use -= 1
+        self._semaphore.release()
+
+    def status(self) -> dict:
+        return {"in_use": self.in_use, "limit": self.max_concurrency, "rejected": self.rejected}
+
+
+class RetryBudget:
+    """Each request deposits `ratio` tokens, each retry withdraws one"""
+
+    def __init__(self, ratio: float, max_tokens: float = 10.0):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self.tokens = max_tokens
+        self.retries = 0
+        self.exhausted = 0
+
+    def deposit(self) -> None:
+        self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        if self.tokens < 1:
+            self.exhausted += 1
+            return False
+        self.tokens -= 1
+        self.retries += 1
+        return True
+
+    def status(self) -> dict:
+        return {"tokens": round(self.tokens, 2), "retries": self.retries, "exhausted": self.exhausted}
+
+
+class LatencyWindow:
+    def __init__(self, size: int = 200):
+        self._samples: Deque[float] = deque(maxlen=size)
+        self._p95: Optional[float] = None
+        self._dirty = 0
+
+    def add(self, seconds: float) -> None:
+        self._samples.append(seconds)
+        self._dirty += 1
+
+    def p95(self) -> Optional[float]:
+        """95th percentile in seconds, None until HEDGE_MIN_SAMPLES samples are collected"""
+        if len(self._samples) < settings.HEDGE_MIN_SAMPLES:
+            return None
+        # Re-sorting on every call is wasteful; refresh every 10 samples
+        if self._p95 is None or self._dirty >= 10:
+            ordered = sorted(self._samples)
+            self._p95 = ordered[int(len(ordered) * 0.95) - 1]
+            self._dirty = 0
+        return self._p95
+
+
+def backoff_delay(attempt: int) -> float:
+    """Exponential backoff with full jitter"""
+    return random.uniform(0, min(settings.RETRY_BACKOFF_MAX, settings.RETRY_BACKOFF_BASE * 2 ** attempt))
@@ -0,0 +1,32 @@
+"""
+Test settings: no Redis (every shared tier falls back to in-process state)
+and a throwaway signing key. Set before app.config is imported.
+"""
+import os
+
+import pytest
+
+os.environ["REDIS_URL"] = ""
+os.environ.setdefault("SECRET_KEY", "test-secret")
+
+
+
+class Clock:
+    """Stand-in for the time module with a manually advanced monotonic clock"""
+
+    def __init__(self, start: float = 1000.0):
+        self.now = start
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def time(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+@pytest.fixture
+def clock() -> Clock:
+    return Clock()
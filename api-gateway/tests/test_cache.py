@@ -0,0 +1,140 @@
+"""ResponseCache.get_or_fetch: local hits and coalescing of concurrent misses"""
+import asyncio
+import time
+
+from app.utils.cache import CachedResponse, ResponseCache
+
+
+def make_entry(body: bytes = b"{}") -> CachedResponse:
+    now = time.time()
+    return CachedResponse("/api/v1/projects", 200, [], body, '"etag"', now, now + 60)
+
+
+def test_concurrent_misses_share_one_fetch():
+    cache = ResponseCache()
+    calls = 0
+
+    async def scenario():
+        release = asyncio.Event()
+
+        async def fetch():
+            nonlocal calls
+            calls += 1
+            await release.wait()
+            return make_entry(), 60
+
+        tasks = [asyncio.create_task(cache.get_or_fetch("key", fetch)) for _ in range(5)]
+        await asyncio.sleep(0)
+        assert cache.stats()["inflight"] == 1
+        release.set()
+        return await asyncio.gather(*tasks)
+
+    results = asyncio.run(scenario())
+    assert calls == 1
+    assert sorted(status for _, status in results) == ["COALESCED"] * 4 + ["MISS"]
+    assert len({id(entry) for entry, _ in results}) == 1
+    assert cache.counters["misses"] == 1
+    assert cache.counters["coalesced"] == 4
+    assert cache.stats()["inflight"] == 0
+
+
+def test_stored_entry_is_served_from_local_cache():
+    cache = ResponseCache()
+
+    async def fetch():
+        return make_entry(b"first"), 60
+
+    async def scenario():
+        await cache.get_or_fetch("key", fetch)
+        return await cache.get_or_fetch("key", fetch)
+
+    entry, status = asyncio.run(scenario())
+    assert (entry.body, status) == (b"first", "HIT")
+    assert cache.counters["local_hits"] == 1
+
+
+def test_zero_ttl_response_is_not_stored():
+    cache = ResponseCache()
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        return make_entry(), 0
+
+    async def scenario():
+        first = await cache.get_or_fetch("key", fetch)
+        second = await cache.get_or_fetch("key", fetch)
+        return first[1], second[1]
+
+    assert asyncio.run(scenario()) == ("MISS", "MISS")
+    assert calls == 2
+    assert len(cache.local) == 0
+
+
+def test_fetch_error_reaches_every_waiter_and_is_not_cached():
+    cache = ResponseCache()
+    calls = 0
+
+    async def scenario():
+        release = asyncio.Event()
+
+        async def failing_fetch():
+            nonlocal calls
+            calls += 1
+            await release.wait()
+            raise RuntimeError("upstream down")
+
+        tasks = [asyncio.create_task(cache.get_or_fetch("key", failing_fetch)) for _ in range(3)]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        assert cache.stats()["inflight"] == 0
+
+        async def fetch():
+            return make_entry(), 60
+
+        # The failure is not remembered: the next request fetches again
+        _, status = await cache.get_or_fetch("key", fetch)
+        return results, status
+
+    results, status = asyncio.run(scenario())
+    assert calls == 1
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert status == "MISS"
+
+
+def test_different_keys_are_fetched_separately():
+    cache = ResponseCache()
+    fetched = []
+
+    def fetcher(name):
+        async def fetch():
+            fetched.append(name)
+            await asyncio.sleep(0)
+            return make_entry(name.encode()), 60
+        return fetch
+
+    async def scenario():
+        return await asyncio.gather(
+            cache.get_or_fetch("a", fetcher("a")),
+            cache.get_or_fetch("b", fetcher("b")),
+        )
+
+    results = asyncio.run(scenario())
+    assert sorted(fetched) == ["a", "b"]
+    assert [entry.body for entry, _ in results] == [b"a", b"b"]
+    assert [status for _, status in results] == ["MISS", "MISS"]
+
+
+def test_expired_local_entry_is_refetched():
+    cache = ResponseCache()
+    stale = make_entry(b"stale")
+    stale.expires_at = time.time() - 1
+    cache.local.set("key", stale)
+
+    async def fetch():
+        return make_entry(b"fresh"), 60
+
+    entry, status = asyncio.run(cache.get_or_fetch("key", fetch))
+    assert (entry.body, status) == (b"fresh", "MISS")
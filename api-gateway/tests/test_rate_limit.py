@@ -0,0 +1,164 @@
+"""RateLimiter: local pre-check with debt, Redis fallback and header values"""
+import asyncio
+
+import pytest
+
+from app.config import settings
+from app.utils import rate_limit
+from app.utils.rate_limit import LocalBucket, Quota, RateLimitDecision, RateLimiter, take_tokens
+
+
+class FakeBucketScript:
+    """Stands in for TOKEN_BUCKET_LUA: one bucket without refill, records the debt of each call"""
+
+    def __init__(self, tokens: float, fail: bool = False):
+        self.tokens = tokens
+        self.fail = fail
+        self.debts = []
+
+    async def __call__(self, keys, args):
+        if self.fail:
+            raise ConnectionError("Redis is down")
+        _, _, cost, debt = args
+        self.debts.append(debt)
+        self.tokens = max(0, self.tokens - debt)
+        allowed = self.tokens >= cost
+        if allowed:
+            self.tokens -= cost
+        return [int(allowed), str(self.tokens)]
+
+
+class FakeRedis:
+    def __init__(self, script: FakeBucketScript):
+        self.script = script
+
+    def register_script(self, lua: str) -> FakeBucketScript:
+        return self.script
+
+
+@pytest.fixture
+def limiter(monkeypatch, clock):
+    monkeypatch.setattr(settings, "RATE_LIMIT_LOCAL_HEADROOM", 0.5)
+    monkeypatch.setattr(settings, "RATE_LIMIT_LOCAL_SYNC_SECONDS", 1.0)
+    monkeypatch.setattr(rate_limit, "time", clock)
+    return RateLimiter()
+
+
+def use_redis(monkeypatch, script: FakeBucketScript) -> None:
+    redis = FakeRedis(script)
+    monkeypatch.setattr(rate_limit, "get_redis", lambda: redis)
+
+
+def hits(limiter: RateLimiter, quota: Quota, count: int):
+    async def scenario():
+        return [await limiter.hit("global", "user:1", quota) for _ in range(count)]
+
+    return asyncio.run(scenario())
+
+
+def test_local_precheck_admits_far_from_the_limit_and_sends_debt(limiter, monkeypatch):
+    script = FakeBucketScript(tokens=100)
+    use_redis(monkeypatch, script)
+
+    # Redis answers 99 left; locally admitted while 99 - pending - 1 >= 50
+    decisions = hits(limiter, Quota(100), 51)
+
+    assert all(decision.allowed for decision in decisions)
+    assert limiter.counters["local_decisions"] == 49
+    assert script.debts == [0, 49]
+    assert decisions[-1].remaining == 49
+    assert script.tokens == 49
+
+
+def test_local_precheck_expires_after_the_sync_interval(limiter, monkeypatch, clock):
+    script = FakeBucketScript(tokens=100)
+    use_redis(monkeypatch, script)
+
+    hits(limiter, Quota(100), 3)
+    clock.advance(1.0)
+    hits(limiter, Quota(100), 1)
+
+    assert script.debts == [0, 2]
+    assert limiter.counters["local_decisions"] == 2
+
+
+def test_near_the_limit_every_request_goes_to_redis(limiter, monkeypatch):
+    script = FakeBucketScript(tokens=4)
+    use_redis(monkeypatch, script)
+
+    decisions = hits(limiter, Quota(10), 6)
+
+    assert [decision.allowed for decision in decisions] == [True] * 4 + [False] * 2
+    assert limiter.counters["local_decisions"] == 0
+    assert limiter.counters["redis_decisions"] == 6
+    assert limiter.counters["rejected"] == 2
+
+
+def test_without_redis_falls_back_to_a_local_bucket(limiter):
+    decisions = hits(limiter, Quota(3), 4)
+
+    assert [decision.allowed for decision in decisions] == [True, True, True, False]
+    assert limiter.counters["fallback_decisions"] == 4
+    assert limiter.counters["rejected"] == 1
+
+
+def test_redis_error_falls_back_and_settles_local_debt(limiter, monkeypatch):
+    script = FakeBucketScript(tokens=10)
+    use_redis(monkeypatch, script)
+
+    # 9 left in Redis, then 4 local admissions (9 - pending - 1 >= 5)
+    hits(limiter, Quota(10), 5)
+    assert limiter.counters["local_decisions"] == 4
+
+    script.fail = True
+    decision = hits(limiter, Quota(10), 1)[0]
+
+    assert decision.allowed
+    assert decision.remaining == 9 - 4 - 1
+    assert limiter.counters["fallback_decisions"] == 1
+
+
+def test_fallback_bucket_refills_over_time(limiter, clock):
+    quota = Quota(2, period=60)
+    assert [d.allowed for d in hits(limiter, quota, 3)] == [True, True, False]
+
+    clock.advance(30)
+    assert [d.allowed for d in hits(limiter, quota, 2)] == [True, False]
+
+
+def test_take_tokens_caps_refill_at_capacity():
+    quota = Quota(10, period=10)
+    bucket = LocalBucket(tokens=0.5, synced_at=0.0)
+
+    assert not take_tokens(bucket, quota, now=0.0)
+    assert bucket.tokens == 0.5
+    assert take_tokens(bucket, quota, now=100.0)
+    assert bucket.tokens == 9
+    assert bucket.synced_at == 100.0
+
+
+def test_headers_of_an_allowed_request():
+    headers = RateLimitDecision(True, limit=60, remaining=30.5, rate=1.0).headers()
+
+    assert headers == {
+        "X-RateLimit-Limit": "60",
+        "X-RateLimit-Remaining": "30",
+        # 29.5 tokens to refill at one per second
+        "X-RateLimit-Reset": "30",
+    }
+
+
+def test_headers_of_a_rejected_request():
+    quota = Quota(6, period=60)
+    headers = RateLimitDecision(False, quota.limit, remaining=0.0, rate=quota.rate).headers()
+
+    assert headers["X-RateLimit-Remaining"] == "0"
+    assert headers["X-RateLimit-Reset"] == "60"
+    # One token at 0.1 tokens/second
+    assert headers["Retry-After"] == "10"
+
+
+def test_retry_after_is_at_least_one_second():
+    headers = RateLimitDecision(False, limit=60, remaining=0.99, rate=1.0).headers()
+
+    assert headers["Retry-After"] == "1"
@@ -0,0 +1,99 @@
+"""CircuitBreaker state transitions"""
+import httpx
+import pytest
+
+from app.utils import resilience
+from app.utils.resilience import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+
+REQUEST = httpx.Request("GET", "http://upstream/api")
+
+
+@pytest.fixture
+def breaker(monkeypatch, clock):
+    monkeypatch.setattr(resilience, "time", clock)
+    return CircuitBreaker(failure_threshold=3, reset_timeout=30.0, half_open_max_calls=1)
+
+
+def fail(breaker: CircuitBreaker, times: int) -> None:
+    for _ in range(times):
+        breaker.before_call(REQUEST)
+        breaker.record_failure()
+
+
+def test_opens_after_consecutive_failures(breaker):
+    fail(breaker, 2)
+    assert breaker.state == CLOSED
+
+    fail(breaker, 1)
+    assert breaker.state == OPEN
+    assert breaker.times_opened == 1
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call(REQUEST)
+
+
+def test_success_resets_the_failure_count(breaker):
+    fail(breaker, 2)
+    breaker.before_call(REQUEST)
+    breaker.record_success()
+    fail(breaker, 2)
+
+    assert breaker.state == CLOSED
+    assert breaker.consecutive_failures == 2
+
+
+def test_half_open_after_the_cool_down_admits_limited_probes(breaker, clock):
+    fail(breaker, 3)
+    clock.advance(29.9)
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call(REQUEST)
+
+    clock.advance(0.1)
+    breaker.before_call(REQUEST)
+    assert breaker.state == HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call(REQUEST)
+
+
+def test_successful_probe_closes_the_circuit(breaker, clock):
+    fail(breaker, 3)
+    clock.advance(30)
+    breaker.before_call(REQUEST)
+    breaker.record_success()
+
+    assert breaker.state == CLOSED
+    assert breaker.consecutive_failures == 0
+    breaker.before_call(REQUEST)
+
+
+def test_failed_probe_reopens_the_circuit(breaker, clock):
+    fail(breaker, 3)
+    clock.advance(30)
+    fail(breaker, 1)
+
+    assert breaker.state == OPEN
+    assert breaker.times_opened == 2
+    assert breaker.status()["retry_in_seconds"] == 30.0
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call(REQUEST)
+
+
+def test_cancelled_probe_frees_its_slot(breaker, clock):
+    fail(breaker, 3)
+    clock.advance(30)
+    breaker.before_call(REQUEST)
+    breaker.cancel_call()
+
+    breaker.before_call(REQUEST)
+    assert breaker.state == HALF_OPEN
+
+
+def test_status_reports_the_remaining_cool_down(breaker, clock):
+    assert breaker.status()["retry_in_seconds"] == 0.0
+
+    fail(breaker, 3)
+    clock.advance(12)
+    status = breaker.status()
+
+    assert status["state"] == OPEN
+    assert status["consecutive_failures"] == 3
+    assert status["retry_in_seconds"] == 18.0
@@ -7,12 +7,33 @@ from typing import List
 class Settings(BaseSettings):
     # Database
     DATABASE_URL: str
+    # Pool (per process) and statement timeout; DB_ASYNC runs sessions on asyncpg
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_TIMEOUT: float = 30
+    DB_STATEMENT_TIMEOUT_MS: int = 5000
+    DB_ASYNC: bool = False
     
     # JWT
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    # Asymmetric signing (ALGORITHM=RS256 / ES256): PEM keys and the key ID published in JWKS
+    JWT_PRIVATE_KEY: str = ""
+    JWT_PUBLIC_KEY: str = ""
+    JWT_KEY_ID: str = "auth-1"
+    
+    # Password hashing: scheme for new hashes (argon2 | bcrypt); the other is still verified and upgraded on login
+    PASSWORD_HASH_SCHEME: str = "bcrypt"
+    BCRYPT_ROUNDS: int = 12
+    ARGON2_TIME_COST: int = 2
+    ARGON2_MEMORY_COST: int = 19456  # KiB
+    ARGON2_PARALLELISM: int = 1
+    # Dedicated hashing threads and how many calls may wait for one before 429
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_QUEUE_SIZE: int = 32
     
     # OAuth
     GOOGLE_CLIENT_ID: str = ""
@@ -1,21 +1,16 @@
 """
 Database configuration and session management
 """
-from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
 
 from app.config import settings
+from app.db_runtime import Database, DbSession
 
-engine = create_engine(settings.DATABASE_URL, pool_pre_ping=True)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+database = Database.from_settings(settings)
+engine = database.engine
+SessionLocal = database.SessionLocal
 
 Base = declarative_base()
 
-def get_db():
-    """Dependency for database session"""
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+# Dependency for database session: a DbSession, query code runs through db.run(...)
+get_db = database.session
@@ -0,0 +1,217 @@
+"""
+Database runtime shared by the microservices (kept identical in each service)
+
+- Pool sizing: DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_RECYCLE, DB_POOL_TIMEOUT
+- Pool metrics: checkout wait time (avg/p95/max), checkout timeouts, connections
+  in use / idle / overflow, new and invalidated connections
+- Statement timeout (PostgreSQL): DB_STATEMENT_TIMEOUT_MS, applied per connection
+- DB_ASYNC: sessions run on an asyncpg engine instead of psycopg2
+
+Query code stays written against a sync Session. Handlers call it through
+DbSession.run: with DB_ASYNC it runs on the async engine via
+AsyncSession.run_sync, otherwise in the threadpool. Either way the event
+loop is never blocked by a query.
+"""
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Deque, Optional, Type
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from starlette.concurrency import run_in_threadpool
+
+ASYNC_DRIVERS = {"postgresql": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
+
+
+class PoolMetrics:
+    def __init__(self, window: int = 1000):
+        self._waits: Deque[float] = deque(maxlen=window)
+        self.checkouts = 0
+        self.checkout_timeouts = 0
+        self.max_wait = 0.0
+        self.connects = 0
+        self.invalidated = 0
+
+    def observe_wait(self, seconds: float) -> None:
+        self._waits.append(seconds)
+        self.checkouts += 1
+        self.max_wait = max(self.max_wait, seconds)
+
+    def snapshot(self, pool) -> dict:
+        waits = sorted(self._waits)
+        return {
+            "size": pool.size(),
+            "in_use": pool.checkedout(),
+            "idle": pool.checkedin(),
+            "overflow": max(0, pool.overflow()),
+            "checkouts": self.checkouts,
+            "checkout_timeouts": self.checkout_timeouts,
+            "wait_ms": {
+                "avg": round(sum(waits) / len(waits) * 1000, 2) if waits else 0.0,
+                "p95": round(waits[int(len(waits) * 0.95) - 1] * 1000, 2) if len(waits) >= 20 else None,
+                "max": round(self.max_wait * 1000, 2),
+            },
+            "connects": self.connects,
+            "invalidated": self.invalidated,
+        }
+
+
+def _instrumented_pool(base: Type[QueuePool], metrics: PoolMetrics) -> Type[QueuePool]:
+    """Pool class timing every checkout; recreate() keeps the class, so metrics survive dispose()"""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = base._do_get(self)
+        except PoolTimeoutError:
+            metrics.checkout_timeouts += 1
+            raise
+        metrics.observe_wait(time.perf_counter() - started)
+        return connection
+
+    return type(f"Instrumented{base.__name__}", (base,), {"_do_get": _do_get})
+
+
+def _count_connections(engine: Engine, metrics: PoolMetrics) -> None:
+    @event.listens_for(engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        metrics.connects += 1
+
+    @event.listens_for(engine, "invalidate")
+    def on_invalidate(dbapi_connection, connection_record, exception):
+        metrics.invalidated += 1
+
+
+def async_url(url: str) -> str:
+    """postgresql(+psycopg2):// -> postgresql+asyncpg://, sqlite:// -> sqlite+aiosqlite://"""
+    parsed = make_url(url)
+    driver = ASYNC_DRIVERS.get(parsed.get_backend_name())
+    if driver is None:
+        raise ValueError(f"No async driver configured for {parsed.get_backend_name()}")
+    return parsed.set(drivername=driver).render_as_string(hide_password=False)
+
+
+class DbSession:
+    """Request-scoped session; run() executes sync-Session code without blocking the event loop"""
+
+    def __init__(self, sync_session: Optional[Session] = None, async_session=None):
+        self._sync_session = sync_session
+        self._async_session = async_session
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Call fn(session, *args, **kwargs)
+
+        Returns:
+            Whatever fn returns
+        """
+        if self._async_session is not None:
+            return await self._async_session.run_sync(fn, *args, **kwargs)
+        return await run_in_threadpool(fn, self._sync_session, *args, **kwargs)
+
+
+class Database:
+    def __init__(
+        self,
+        url: str,
+        pool_size: int = 5,
+        max_overflow: int = 10,
+        pool_recycle: int = 1800,
+        pool_timeout: float = 30,
+        statement_timeout_ms: int = 0,
+        use_async: bool = False,
+    ):
+        pool_options = {
+            "pool_pre_ping": True,
+            "pool_size": pool_size,
+            "max_overflow": max_overflow,
+            "pool_recycle": pool_recycle,
+            "pool_timeout": pool_timeout,
+        }
+        is_postgres = make_url(url).get_backend_name() == "postgresql"
+
+        # The sync engine always exists: create_all at startup and scripts use it
+        self.metrics = PoolMetrics()
+        sync_connect_args = {}
+        if is_postgres and statement_timeout_ms:
+            sync_connect_args["options"] = f"-c statement_timeout={statement_timeout_ms}"
+        self.engine = create_engine(
+            url,
+            poolclass=_instrumented_pool(QueuePool, self.metrics),
+            connect_args=sync_connect_args,
+            **pool_options,
+        )
+        _count_connections(self.engine, self.metrics)
+        # Like the async sessions: objects stay loaded after commit, so reading
+        # them back on the event loop never triggers a lazy SELECT
+        self.SessionLocal = sessionmaker(
+            autocommit=False, autoflush=False, expire_on_commit=False, bind=self.engine
+        )
+
+        self.async_engine = None
+        self.async_metrics: Optional[PoolMetrics] = None
+        self.AsyncSessionLocal = None
+        if use_async:
+            # Imported lazily so services without the asyncio extra still start
+            from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+            self.async_metrics = PoolMetrics()
+            async_connect_args = {}
+            if is_postgres and statement_timeout_ms:
+                async_connect_args["server_settings"] = {"statement_timeout": str(statement_timeout_ms)}
+            self.async_engine = create_async_engine(
+                async_url(url),
+                poolclass=_instrumented_pool(AsyncAdaptedQueuePool, self.async_metrics),
+                connect_args=async_connect_args,
+                **pool_options,
+            )
+            _count_connections(self.async_engine.sync_engine, self.async_metrics)
+            self.AsyncSessionLocal = async_sessionmaker(
+                self.async_engine, autoflush=False, expire_on_commit=False
+            )
+
+    @classmethod
+    def from_settings(cls, settings) -> "Database":
+        return cls(
+            settings.DATABASE_URL,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            statement_timeout_ms=settings.DB_STATEMENT_TIMEOUT_MS,
+            use_async=settings.DB_ASYNC,
+        )
+
+    @asynccontextmanager
+    async def open_session(self) -> AsyncIterator[DbSession]:
+        """DbSession for work outside a request (startup, background jobs)"""
+        if self.AsyncSessionLocal is not None:
+            async with self.AsyncSessionLocal() as async_session:
+                yield DbSession(async_session=async_session)
+            return
+        sync_session = self.SessionLocal()
+        try:
+            yield DbSession(sync_session=sync_session)
+        finally:
+            sync_session.close()
+
+    async def session(self) -> AsyncIterator[DbSession]:
+        """FastAPI dependency yielding a DbSession"""
+        async with self.open_session() as db:
+            yield db
+
+    def stats(self) -> dict:
+        stats = {"mode": "async" if self.async_engine is not None else "sync"}
+        stats["pool"] = self.metrics.snapshot(self.engine.pool)
+        if self.async_engine is not None:
+            stats["async_pool"] = self.async_metrics.snapshot(self.async_engine.sync_engine.pool)
+        return stats
+
+    async def dispose(self) -> None:
+        if self.async_engine is not None:
+            await self.async_engine.dispose()
+        self.engine.dispose()
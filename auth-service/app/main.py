@@ -2,18 +2,20 @@
 Auth Service - Authentication and Authorization
 Handles user registration, login, JWT tokens, and OAuth
 """
-from fastapi import FastAPI, HTTPException, Depends, status
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Request, Depends, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
+from fastapi.responses import JSONResponse
 from datetime import datetime, timedelta
 from typing import Optional
 import logging
 
-from app.database import get_db, engine
+from app.database import DbSession, database, get_db, engine
 from app import models, schemas
 from app.services import auth_service
 from app.config import settings
+from app.utils.password_hasher import HasherBusyError, password_hasher
 
 # Create tables
 models.Base.metadata.create_all(bind=engine)
@@ -22,11 +24,18 @@ models.Base.metadata.create_all(bind=engine)
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    password_hasher.shutdown()
+    await database.dispose()
+
 # Create FastAPI app
 app = FastAPI(
     title="ConnectIn Auth Service",
     description="Authentication and user management service",
     version="2.0.0",
+    lifespan=lifespan,
 )
 
 # CORS
@@ -40,19 +49,39 @@ app.add_middleware(
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
+# Password hashing pool saturated: shed load instead of queueing without bound
+@app.exception_handler(HasherBusyError)
+async def hasher_busy_handler(request: Request, exc: HasherBusyError):
+    logger.warning(f"Password hashing overloaded: {request.url.path}")
+    return JSONResponse(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        content={"detail": "Too many authentication requests, retry shortly"},
+        headers={"Retry-After": "1"},
+    )
+
 # Health check
 @app.get("/health")
 async def health_check():
     return {"status": "healthy", "service": "auth-service"}
 
+# Connection pool and password hashing pool state
+@app.get("/metrics")
+async def metrics():
+    return {"database": database.stats(), "password_hasher": password_hasher.stats()}
+
+# Public signing keys for local token verification by the gateway and services
+@app.get("/.well-known/jwks.json")
+async def jwks():
+    return auth_service.get_jwks()
+
 # Registration
 @app.post("/auth/register", response_model=schemas.UserResponse, status_code=status.HTTP_201_CREATED)
-async def register(user: schemas.UserCreate, db: Session = Depends(get_db)):
+async def register(user: schemas.UserCreate, db: DbSession = Depends(get_db)):
     """Register a new user"""
     logger.info(f"Registration attempt for email: {user.email}")
     
     # Check if user exists
-    existing_user = auth_service.get_user_by_email(db, user.email)
+    existing_user = await db.run(auth_service.get_user_by_email, user.email)
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -60,19 +89,19 @@ async def register(user: schemas.UserCreate, db: Session = Depends(get_db)):
         )
     
     # Create user
-    new_user = auth_service.create_user(db, user)
+    new_user = await auth_service.create_user(db, user)
     logger.info(f"User registered successfully: {new_user.id}")
     
     return new_user
 
 # Login
 @app.post("/auth/login", response_model=schemas.TokenResponse)
-async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: DbSession = Depends(get_db)):
     """Login and get access token"""
     logger.info(f"Login attempt for username: {form_data.username}")
     
     # Authenticate user
-    user = auth_service.authenticate_user(db, form_data.username, form_data.password)
+    user = await auth_service.authenticate_user(db, form_data.username, form_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -95,7 +124,7 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session =
 
 # Refresh token
 @app.post("/auth/refresh", response_model=schemas.TokenResponse)
-async def refresh_token(token_data: schemas.RefreshTokenRequest, db: Session = Depends(get_db)):
+async def refresh_token(token_data: schemas.RefreshTokenRequest, db: DbSession = Depends(get_db)):
     """Refresh access token"""
     try:
         # Verify refresh token
@@ -106,7 +135,7 @@ async def refresh_token(token_data: schemas.RefreshTokenRequest, db: Session = D
             raise HTTPException(status_code=401, detail="Invalid token")
         
         # Get user
-        user = auth_service.get_user_by_id(db, int(user_id))
+        user = await db.run(auth_service.get_user_by_id, int(user_id))
         if user is None:
             raise HTTPException(status_code=404, detail="User not found")
         
@@ -126,7 +155,7 @@ async def refresh_token(token_data: schemas.RefreshTokenRequest, db: Session = D
 
 # Get current user
 @app.get("/auth/me", response_model=schemas.UserResponse)
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+async def get_current_user(token: str = Depends(oauth2_scheme), db: DbSession = Depends(get_db)):
     """Get current authenticated user"""
     try:
         payload = auth_service.verify_token(token)
@@ -135,7 +164,7 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
         if user_id is None:
             raise HTTPException(status_code=401, detail="Invalid authentication credentials")
         
-        user = auth_service.get_user_by_id(db, int(user_id))
+        user = await db.run(auth_service.get_user_by_id, int(user_id))
         if user is None:
             raise HTTPException(status_code=404, detail="User not found")
         
@@ -152,7 +181,7 @@ async def google_auth():
     return {"message": "Google OAuth not yet implemented"}
 
 @app.get("/auth/google/callback")
-async def google_callback(code: str, db: Session = Depends(get_db)):
+async def google_callback(code: str, db: DbSession = Depends(get_db)):
     """Handle Google OAuth callback"""
     # TODO: Exchange code for tokens, create/login user
     return {"message": "Google OAuth callback"}
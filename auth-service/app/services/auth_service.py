@@ -2,23 +2,23 @@
 Authentication service logic
 """
 from sqlalchemy.orm import Session
-from passlib.context import CryptContext
-from jose import JWTError, jwt
+from jose import JWTError, jwk, jwt
 from datetime import datetime, timedelta
 from typing import Optional
 
 from app import models, schemas
 from app.config import settings
+from app.db_runtime import DbSession
+from app.utils.password_hasher import password_hasher
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password against its hash (in the hashing pool)"""
+    verified, _ = await password_hasher.verify_and_update(plain_password, hashed_password)
+    return verified
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a password against its hash"""
-    return pwd_context.verify(plain_password, hashed_password)
-
-def get_password_hash(password: str) -> str:
-    """Hash a password"""
-    return pwd_context.hash(password)
+async def get_password_hash(password: str) -> str:
+    """Hash a password (in the hashing pool)"""
+    return await password_hasher.hash(password)
 
 def get_user_by_email(db: Session, email: str) -> Optional[models.User]:
     """Get user by email"""
@@ -28,9 +28,8 @@ def get_user_by_id(db: Session, user_id: int) -> Optional[models.User]:
     """Get user by ID"""
     return db.query(models.User).filter(models.User.id == user_id).first()
 
-def create_user(db: Session, user: schemas.UserCreate) -> models.User:
-    """Create a new user"""
-    hashed_password = get_password_hash(user.password)
+def insert_user(db: Session, user: schemas.UserCreate, hashed_password: str) -> models.User:
+    """Insert a user row"""
     db_user = models.User(
         email=user.email,
         username=user.username,
@@ -42,15 +41,49 @@ def create_user(db: Session, user: schemas.UserCreate) -> models.User:
     db.refresh(db_user)
     return db_user
 
-def authenticate_user(db: Session, email: str, password: str) -> Optional[models.User]:
-    """Authenticate user with email and password"""
-    user = get_user_by_email(db, email)
+def update_password_hash(db: Session, user: models.User, hashed_password: str) -> None:
+    """Store an upgraded password hash"""
+    user.hashed_password = hashed_password
+    db.commit()
+
+async def create_user(db: DbSession, user: schemas.UserCreate) -> models.User:
+    """Create a new user"""
+    hashed_password = await get_password_hash(user.password)
+    return await db.run(insert_user, user, hashed_password)
+
+async def authenticate_user(db: DbSession, email: str, password: str) -> Optional[models.User]:
+    """Authenticate user with email and password; outdated hashes are replaced on success"""
+    user = await db.run(get_user_by_email, email)
     if not user:
         return None
-    if not verify_password(password, user.hashed_password):
+    verified, new_hash = await password_hasher.verify_and_update(password, user.hashed_password)
+    if not verified:
         return None
+    if new_hash is not None:
+        await db.run(update_password_hash, user, new_hash)
     return user
 
+def is_asymmetric() -> bool:
+    """RS256/ES256 tokens are signed with the private key and verified with the published public key"""
+    return not settings.ALGORITHM.startswith("HS")
+
+def _signing_key() -> str:
+    return settings.JWT_PRIVATE_KEY if is_asymmetric() else settings.SECRET_KEY
+
+def _verification_key() -> str:
+    return settings.JWT_PUBLIC_KEY if is_asymmetric() else settings.SECRET_KEY
+
+def _token_headers() -> Optional[dict]:
+    return {"kid": settings.JWT_KEY_ID} if is_asymmetric() else None
+
+def get_jwks() -> dict:
+    """Public keys in JWKS form; empty for HMAC algorithms (the secret is never published)"""
+    if not is_asymmetric():
+        return {"keys": []}
+    public_jwk = jwk.construct(settings.JWT_PUBLIC_KEY, settings.ALGORITHM).to_dict()
+    public_jwk.update({"kid": settings.JWT_KEY_ID, "use": "sig", "alg": settings.ALGORITHM})
+    return {"keys": [public_jwk]}
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create JWT access token"""
     to_encode = data.copy()
@@ -60,7 +93,7 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
         expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     
     to_encode.update({"exp": expire, "type": "access"})
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    encoded_jwt = jwt.encode(to_encode, _signing_key(), algorithm=settings.ALGORITHM, headers=_token_headers())
     return encoded_jwt
 
 def create_refresh_token(data: dict) -> str:
@@ -68,13 +101,13 @@ def create_refresh_token(data: dict) -> str:
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
     to_encode.update({"exp": expire, "type": "refresh"})
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    encoded_jwt = jwt.encode(to_encode, _signing_key(), algorithm=settings.ALGORITHM, headers=_token_headers())
     return encoded_jwt
 
 def verify_token(token: str) -> dict:
     """Verify and decode JWT token"""
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        payload = jwt.decode(token, _verification_key(), algorithms=[settings.ALGORITHM])
         return payload
     except JWTError:
         raise
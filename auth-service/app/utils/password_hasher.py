@@ -0,0 +1,123 @@
+"""
+Password hashing off the event loop
+
+bcrypt/argon2 take a few hundred milliseconds of CPU per call. Hashes run on
+a dedicated, bounded thread pool (the hash libraries release the GIL), so
+login and registration no longer stall every other request on the worker.
+Calls beyond the pool size wait in a queue of limited depth; when that is
+full the caller gets HasherBusyError and the API answers 429 instead of
+letting latency grow without bound.
+
+The CryptContext is built from settings: PASSWORD_HASH_SCHEME selects the
+scheme for new hashes, the other one stays accepted for verification and is
+marked deprecated, so existing hashes are transparently upgraded on the next
+successful login. bcrypt hashes with fewer than BCRYPT_ROUNDS rounds are
+upgraded the same way.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+
+from passlib.context import CryptContext
+
+from app.config import settings
+
+SCHEMES = ("argon2", "bcrypt")
+
+
+class HasherBusyError(Exception):
+    """All hashing workers are busy and the wait queue is full"""
+
+
+def build_crypt_context() -> CryptContext:
+    if settings.PASSWORD_HASH_SCHEME not in SCHEMES:
+        raise ValueError(f"PASSWORD_HASH_SCHEME must be one of {', '.join(SCHEMES)}")
+    schemes = [settings.PASSWORD_HASH_SCHEME] + [s for s in SCHEMES if s != settings.PASSWORD_HASH_SCHEME]
+    return CryptContext(
+        schemes=schemes,
+        deprecated="auto",
+        bcrypt__rounds=settings.BCRYPT_ROUNDS,
+        bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+        argon2__time_cost=settings.ARGON2_TIME_COST,
+        argon2__memory_cost=settings.ARGON2_MEMORY_COST,
+        argon2__parallelism=settings.ARGON2_PARALLELISM,
+    )
+
+
+class PasswordHasher:
+    def __init__(self, workers: int, queue_size: int):
+        self.workers = workers
+        self.capacity = workers + queue_size
+        self.context = build_crypt_context()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.in_flight = 0
+        self.rejected = 0
+        self.rehashed = 0
+
+    def _pool(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hash")
+        return self._executor
+
+    async def _run(self, fn, *args):
+        if self.in_flight >= self.capacity:
+            self.rejected += 1
+            raise HasherBusyError("Password hashing capacity exhausted")
+        self.in_flight += 1
+        try:
+            future = asyncio.get_running_loop().run_in_executor(self._pool(), fn, *args)
+        except BaseException:
+            self.in_flight -= 1
+            raise
+        # Released when the job finishes, not when the caller stops waiting:
+        # a cancelled request leaves its hash running on the pool
+        future.add_done_callback(self._release)
+        return await asyncio.shield(future)
+
+    def _release(self, future: asyncio.Future) -> None:
+        self.in_flight -= 1
+        if not future.cancelled():
+            # Nobody may be awaiting it any more (caller cancelled)
+            future.exception()
+
+    async def hash(self, password: str) -> str:
+        """
+        Hash a password with the configured scheme
+
+        Raises:
+            HasherBusyError: If the executor queue is full
+        """
+        return await self._run(self.context.hash, password)
+
+    async def verify_and_update(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """
+        Verify a password and rehash it if the stored hash is outdated
+
+        Returns:
+            tuple: (password matches, new hash to store or None)
+
+        Raises:
+            HasherBusyError: If the executor queue is full
+        """
+        verified, new_hash = await self._run(self.context.verify_and_update, password, hashed_password)
+        if new_hash is not None:
+            self.rehashed += 1
+        return verified, new_hash
+
+    def stats(self) -> dict:
+        return {
+            "scheme": settings.PASSWORD_HASH_SCHEME,
+            "workers": self.workers,
+            "in_flight": self.in_flight,
+            "capacity": self.capacity,
+            "rejected": self.rejected,
+            "rehashed": self.rehashed,
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_QUEUE_SIZE)
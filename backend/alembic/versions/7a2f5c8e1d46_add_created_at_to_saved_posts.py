@@ -0,0 +1,34 @@
+"""Add created_at to saved_posts
+
+Revision ID: 7a2f5c8e1d46
+Revises: e3b7c1d9a5f2
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7a2f5c8e1d46'
+down_revision: Union[str, None] = 'e3b7c1d9a5f2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Existing rows get the migration time; ties are ordered by id
+    op.add_column('saved_posts', sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False))
+    op.create_index(
+        'ix_saved_posts_user_id_created_at_id',
+        'saved_posts',
+        ['user_id', 'created_at', 'id'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_saved_posts_user_id_created_at_id', table_name='saved_posts')
+    op.drop_column('saved_posts', 'created_at')
@@ -0,0 +1,56 @@
+"""Add participant_key to conversations with unique index for direct chats
+
+Revision ID: 8b2e4d6f1a93
+Revises: 3c1f9a7d2b64
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b2e4d6f1a93'
+down_revision: Union[str, None] = '3c1f9a7d2b64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('conversations', sa.Column('participant_key', sa.String(length=32), nullable=True))
+
+    # Backfill existing direct conversations. If duplicates already exist,
+    # only the oldest one keeps the key so the unique index can be built.
+    op.execute("""
+        WITH keys AS (
+            SELECT c.id,
+                   md5(string_agg(cp.user_id::text, ',' ORDER BY cp.user_id)) AS participant_key
+            FROM conversations c
+            JOIN conversation_participants cp ON cp.conversation_id = c.id
+            WHERE c.type = 'direct'
+            GROUP BY c.id
+        ), ranked AS (
+            SELECT id, participant_key,
+                   row_number() OVER (PARTITION BY participant_key ORDER BY id) AS rn
+            FROM keys
+        )
+        UPDATE conversations
+        SET participant_key = ranked.participant_key
+        FROM ranked
+        WHERE conversations.id = ranked.id AND ranked.rn = 1
+    """)
+
+    op.create_index(
+        'uq_conversations_direct_participant_key',
+        'conversations',
+        ['participant_key'],
+        unique=True,
+        postgresql_where=sa.text("type = 'direct'")
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('uq_conversations_direct_participant_key', table_name='conversations')
+    op.drop_column('conversations', 'participant_key')
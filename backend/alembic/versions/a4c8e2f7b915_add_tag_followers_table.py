@@ -0,0 +1,35 @@
+"""Add tag_followers table
+
+Revision ID: a4c8e2f7b915
+Revises: 5d7a3e9c4f12
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4c8e2f7b915'
+down_revision: Union[str, None] = '5d7a3e9c4f12'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('tag_followers',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('tag_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['tag_id'], ['tags.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'tag_id')
+    )
+    # Fan-out looks up followers by tag
+    op.create_index('ix_tag_followers_tag_id', 'tag_followers', ['tag_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_tag_followers_tag_id', table_name='tag_followers')
+    op.drop_table('tag_followers')
@@ -0,0 +1,37 @@
+"""Add todo listing indexes
+
+Revision ID: c5e9a2d7f318
+Revises: 7a2f5c8e1d46
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5e9a2d7f318'
+down_revision: Union[str, None] = '7a2f5c8e1d46'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_task_assignments_user_id_todo_id',
+        'task_assignments',
+        ['user_id', 'todo_id'],
+        unique=False
+    )
+    op.create_index(
+        'ix_todos_project_id_created_at',
+        'todos',
+        ['project_id', 'created_at'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_todos_project_id_created_at', table_name='todos')
+    op.drop_index('ix_task_assignments_user_id_todo_id', table_name='task_assignments')
@@ -0,0 +1,49 @@
+"""Add ON DELETE rules for bulk deletion
+
+Revision ID: e3b7c1d9a5f2
+Revises: a4c8e2f7b915
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3b7c1d9a5f2'
+down_revision: Union[str, None] = 'a4c8e2f7b915'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (table, column, referred table, ondelete)
+FOREIGN_KEYS = [
+    ('posts', 'author_id', 'users', 'SET NULL'),
+    ('posts', 'project_id', 'projects', 'CASCADE'),
+    ('posts', 'team_id', 'teams', 'CASCADE'),
+    ('user_teams', 'user_id', 'users', 'CASCADE'),
+    ('user_teams', 'team_id', 'teams', 'CASCADE'),
+    ('education', 'user_id', 'users', 'CASCADE'),
+    ('experience', 'user_id', 'users', 'CASCADE'),
+    # Раньше их обнуляла ORM через User.messages / User.todo_comments
+    ('messages', 'sender_id', 'users', 'SET NULL'),
+    ('todo_comments', 'author_id', 'users', 'SET NULL'),
+]
+
+
+def _recreate(table: str, column: str, referred: str, ondelete: Union[str, None]) -> None:
+    name = f'{table}_{column}_fkey'
+    # Имена ограничений в старых ревизиях задавались по-разному, поэтому IF EXISTS
+    op.execute(f'ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {name}')
+    op.create_foreign_key(name, table, referred, [column], ['id'], ondelete=ondelete)
+
+
+def upgrade() -> None:
+    for table, column, referred, ondelete in FOREIGN_KEYS:
+        _recreate(table, column, referred, ondelete)
+
+
+def downgrade() -> None:
+    for table, column, referred, _ in reversed(FOREIGN_KEYS):
+        _recreate(table, column, referred, None)
@@ -42,7 +42,7 @@ from app.utils.auth import (
     oauth
 )
 from app.utils.logger import get_logger
-from app.database.connection import get_db
+from app.database.connection import get_db, SessionLocal
 from app.core.config import settings
 
 # Инициализация роутера и OAuth2 схемы
@@ -189,6 +189,22 @@ async def get_current_user(
         raise credentials_exception
     return user
 
+def get_user_from_token(token: str) -> Optional[User]:
+    """
+    Resolves a JWT to a user for long-lived connections (WebSocket, SSE).
+    The session is closed right away so it is not held for the lifetime of the connection.
+    """
+    payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    email: str = payload.get("sub")
+    if email is None:
+        return None
+
+    db = SessionLocal()
+    try:
+        return db.query(User).filter(User.email == email).first()
+    finally:
+        db.close()
+
 async def get_current_user_ws(websocket: WebSocket, token: str = None) -> Optional[User]:
     """
     Authenticate user for WebSocket connections.
@@ -201,16 +217,7 @@ async def get_current_user_ws(websocket: WebSocket, token: str = None) -> Option
             if not token:
                 return None
 
-        # Verify token
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
-            return None
-
-        # Get user from database using email
-        db = next(get_db())
-        user = db.query(User).filter(User.email == email).first()
-        return user
+        return get_user_from_token(token)
     except Exception as e:
         logger.error(f"WebSocket authentication error: {e}")
         return None
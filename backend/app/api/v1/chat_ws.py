@@ -1,11 +1,13 @@
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 from typing import Dict, List, Optional
 from datetime import datetime
-from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 from app.api.v1.auth import get_current_user_ws
 from app.models.user import User
-from app.models.chat import Conversation, Message
-from app.database.connection import get_db
+from app.models.chat import Message
+from app.database.connection import SessionLocal
+from app.services.chat_membership import membership_cache
+from app.websockets.manager import EventCoalescer
 import json
 
 router = APIRouter()
@@ -14,6 +16,8 @@ class ConnectionManager:
     def __init__(self):
         # Store active connections as {conversation_id: {user_id: WebSocket}}
         self.active_connections: Dict[int, Dict[int, WebSocket]] = {}
+        # Typing and read events are batched into one "events" frame per tick
+        self.coalescer = EventCoalescer(self)
 
     async def connect(self, websocket: WebSocket, conversation_id: int, user_id: int):
         """Accept and register a new connection"""
@@ -28,6 +32,21 @@ class ConnectionManager:
             del self.active_connections[conversation_id][user_id]
             if not self.active_connections[conversation_id]:
                 del self.active_connections[conversation_id]
+        self.coalescer.forget_user(conversation_id, user_id)
+
+    def get_online_users_in_conversation(self, conversation_id: int) -> List[int]:
+        """IDs of the users connected to the conversation"""
+        return list(self.active_connections.get(conversation_id, {}).keys())
+
+    async def send_to_user(self, conversation_id: int, user_id: int, message_json: str):
+        """Send a JSON string to one connected participant"""
+        connection = self.active_connections.get(conversation_id, {}).get(user_id)
+        if connection is None:
+            return
+        try:
+            await connection.send_text(message_json)
+        except Exception:
+            self.disconnect(conversation_id, user_id)
 
     async def broadcast(self, message_data: dict, conversation_id: int, sender_id: int):
         """Send a message to all users in the conversation"""
@@ -44,11 +63,31 @@ class ConnectionManager:
 # Initialize the connection manager
 manager = ConnectionManager()
 
+
+def save_message(conversation_id: int, sender_id: int, content: str, media_url, media_type, media_name) -> Message:
+    """Save a message in a short-lived session so the socket does not hold a pooled connection"""
+    db = SessionLocal()
+    try:
+        message = Message(
+            content=content,
+            conversation_id=conversation_id,
+            sender_id=sender_id,
+            media_url=media_url,
+            media_type=media_type,
+            media_name=media_name
+        )
+        db.add(message)
+        db.commit()
+        db.refresh(message)
+        db.expunge(message)
+        return message
+    finally:
+        db.close()
+
 @router.websocket("/{conversation_id}")
 async def websocket_endpoint(
     websocket: WebSocket, 
-    conversation_id: int,
-    db: Session = Depends(get_db)
+    conversation_id: int
 ):
     # Authenticate the user from the token
     user = await get_current_user_ws(websocket)
@@ -56,9 +95,9 @@ async def websocket_endpoint(
         await websocket.close(code=1008)  # Policy violation
         return
     
-    # Check if the user is part of this conversation
-    conversation = db.query(Conversation).filter(Conversation.id == conversation_id).first()
-    if not conversation or user.id not in [p.id for p in conversation.participants]:
+    # Check if the user is part of this conversation (served from the membership cache)
+    # (a cache miss is read in its own session, see ConversationMembershipCache.get_members)
+    if not await membership_cache.is_member(None, conversation_id, user.id):
         await websocket.close(code=1003)  # Not authorized
         return
     
@@ -69,6 +108,18 @@ async def websocket_endpoint(
         while True:
             # Receive message from WebSocket
             data = await websocket.receive_json()
+
+            # Typing indicators and read receipts go through the coalescer;
+            # other participants get them in the next "events" frame
+            event_type = data.get("type", "message")
+            if event_type == "typing":
+                manager.coalescer.add_typing(conversation_id, user.id, user.username, bool(data.get("is_typing")))
+                continue
+            if event_type == "read":
+                message_ids = [i for i in data.get("message_ids") or [] if isinstance(i, int)]
+                manager.coalescer.add_read(conversation_id, user.id, message_ids)
+                continue
+
             content = data.get("content", "")
             
             # Extract media information if present
@@ -81,17 +132,9 @@ async def websocket_endpoint(
                 continue
                 
             # Create and save the message to the database
-            message = Message(
-                content=content,
-                conversation_id=conversation_id,
-                sender_id=user.id,
-                media_url=media_url,
-                media_type=media_type,
-                media_name=media_name
+            message = await run_in_threadpool(
+                save_message, conversation_id, user.id, content, media_url, media_type, media_name
             )
-            db.add(message)
-            db.commit()
-            db.refresh(message)
             
             # Prepare message data for broadcast
             message_data = {
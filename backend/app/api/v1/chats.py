@@ -1,14 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from app.database.connection import get_db
 from app.models.user import User
 from app.models.chat import Conversation, Message, ConversationType
+from app.models.relations.associations import conversation_participants
 from app.api.v1.auth import get_current_user
-from sqlalchemy import and_, or_, desc
+from sqlalchemy import and_, or_, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from pydantic import BaseModel
 from datetime import datetime
 from app.utils.s3_chat_client import create_presigned_post_url
+from app.services.chat_membership import membership_cache
 
 router = APIRouter()
 
@@ -76,6 +79,55 @@ def serialize_message(message: Message) -> Dict[str, Any]:
         "media_name": message.media_name
     }
 
+# Column order of the compact (array-of-arrays) message encoding
+COMPACT_MESSAGE_FIELDS = [
+    "id", "content", "timestamp", "sender_id", "sender_name",
+    "sender_avatar", "media_url", "media_type", "media_name"
+]
+
+# Helper function to serialize a Message model to a compact row
+def serialize_message_compact(message: Message) -> List[Any]:
+    sender = message.sender
+    return [
+        message.id,
+        message.content,
+        message.timestamp.isoformat() if message.timestamp else None,
+        message.sender_id,
+        f"{sender.first_name} {sender.last_name}" if sender else "Unknown User",
+        sender.avatar_url if sender else None,
+        message.media_url,
+        message.media_type,
+        message.media_name
+    ]
+
+def fetch_message_page(
+    db: Session,
+    conversation_id: int,
+    limit: int,
+    before_id: Optional[int] = None,
+    after_id: Optional[int] = None
+) -> Tuple[List[Message], bool]:
+    """
+    Keyset page of a conversation's messages on (conversation_id, id).
+    Returns messages newest first and whether more exist in the paging direction.
+    """
+    query = db.query(Message).filter(Message.conversation_id == conversation_id)
+
+    if after_id is not None:
+        # Walk forward from the cursor, then flip to the usual newest-first order
+        query = query.filter(Message.id > after_id)
+        if before_id is not None:
+            query = query.filter(Message.id < before_id)
+        messages = query.order_by(Message.id.asc()).limit(limit + 1).all()
+        has_more = len(messages) > limit
+        return list(reversed(messages[:limit])), has_more
+
+    if before_id is not None:
+        query = query.filter(Message.id < before_id)
+    messages = query.order_by(Message.id.desc()).limit(limit + 1).all()
+    has_more = len(messages) > limit
+    return messages[:limit], has_more
+
 # Helper function to serialize a Conversation model to dict
 def serialize_conversation(conversation: Conversation) -> Dict[str, Any]:
     return {
@@ -87,6 +139,22 @@ def serialize_conversation(conversation: Conversation) -> Dict[str, Any]:
         "last_message": serialize_message(conversation.last_message) if conversation.last_message else None
     }
 
+# Helper that authorizes access to a conversation via the membership cache
+async def ensure_participant(db: Session, conversation_id: int, user_id: int) -> None:
+    if await membership_cache.is_member(db, conversation_id, user_id):
+        return
+    # Slow path only for rejected requests: tell "missing" apart from "forbidden"
+    exists = db.query(Conversation.id).filter(Conversation.id == conversation_id).first()
+    if not exists:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Conversation not found"
+        )
+    raise HTTPException(
+        status_code=status.HTTP_403_FORBIDDEN,
+        detail="User is not a participant in this conversation"
+    )
+
 # Routes
 @router.get("/conversations")
 async def get_user_conversations(
@@ -108,28 +176,44 @@ async def create_conversation(
     all_participant_ids = list(set(request.participant_ids + [current_user.id]))
     
     # Check if all users exist
-    participants = db.query(User).filter(User.id.in_(all_participant_ids)).all()
-    if len(participants) != len(all_participant_ids):
+    existing_count = db.query(User.id).filter(User.id.in_(all_participant_ids)).count()
+    if existing_count != len(all_participant_ids):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="One or more users not found"
         )
     
-    # Check if a conversation already exists with the same participants
-    for conversation in current_user.conversations:
-        # Get ids of all participants in this conversation
-        participant_ids = [p.id for p in conversation.participants]
-        # If the participant sets match, return the existing conversation
-        if set(participant_ids) == set(all_participant_ids) and conversation.type == ConversationType.DIRECT:
-            return serialize_conversation(conversation)
-    
-    # Create a new conversation
-    conversation = Conversation(type=ConversationType.DIRECT)
-    conversation.participants = participants
-    db.add(conversation)
-    db.commit()
-    db.refresh(conversation)
+    # Look up or create the direct conversation for this participant set in one
+    # statement; the partial unique index on participant_key arbitrates races
+    participant_key = Conversation.make_participant_key(all_participant_ids)
+    conversations_table = Conversation.__table__
+    conversation_id = db.execute(
+        pg_insert(conversations_table)
+        .values(type=ConversationType.DIRECT.value, participant_key=participant_key)
+        .on_conflict_do_nothing(
+            index_elements=[conversations_table.c.participant_key],
+            index_where=text("type = 'direct'")
+        )
+        .returning(conversations_table.c.id)
+    ).scalar()
+
+    if conversation_id is not None:
+        # New conversation: attach participants in the same transaction
+        db.execute(
+            conversation_participants.insert(),
+            [{"conversation_id": conversation_id, "user_id": user_id} for user_id in all_participant_ids]
+        )
+        db.commit()
+        await membership_cache.prime(conversation_id, all_participant_ids)
+    else:
+        # Already exists: return the existing conversation
+        db.rollback()
+        conversation_id = db.query(Conversation.id).filter(
+            Conversation.participant_key == participant_key,
+            Conversation.type == ConversationType.DIRECT.value
+        ).scalar()
     
+    conversation = db.query(Conversation).filter(Conversation.id == conversation_id).first()
     return serialize_conversation(conversation)
 
 @router.get("/conversations/{conversation_id}")
@@ -139,60 +223,68 @@ async def get_conversation(
     current_user: User = Depends(get_current_user)
 ):
     """Get details of a specific conversation"""
-    conversation = db.query(Conversation).filter(Conversation.id == conversation_id).first()
-    if not conversation:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Conversation not found"
-        )
-    
     # Check if user is a participant
-    if current_user.id not in [p.id for p in conversation.participants]:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="User is not a participant in this conversation"
-        )
+    await ensure_participant(db, conversation_id, current_user.id)
     
+    conversation = db.query(Conversation).filter(Conversation.id == conversation_id).first()
     return serialize_conversation(conversation)
 
 @router.get("/conversations/{conversation_id}/messages")
 async def get_conversation_messages(
     conversation_id: int,
-    limit: int = 20,
+    limit: int = Query(20, ge=1, le=100),
     before_id: Optional[int] = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get messages for a specific conversation with pagination"""
     # Check if the conversation exists and user is a participant
-    conversation = db.query(Conversation).filter(Conversation.id == conversation_id).first()
-    if not conversation:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Conversation not found"
-        )
-    
-    if current_user.id not in [p.id for p in conversation.participants]:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="User is not a participant in this conversation"
-        )
-    
-    # Query messages with pagination
-    query = db.query(Message).filter(Message.conversation_id == conversation_id)
+    await ensure_participant(db, conversation_id, current_user.id)
     
-    if before_id:
-        before_message = db.query(Message).filter(Message.id == before_id).first()
-        if before_message:
-            query = query.filter(Message.timestamp < before_message.timestamp)
-    
-    messages = query.order_by(desc(Message.timestamp)).limit(limit).all()
+    # Paginate by message id so messages sharing a timestamp are never skipped
+    messages, _ = fetch_message_page(db, conversation_id, limit, before_id=before_id)
     
     # Format the response with sender information
     result = [serialize_message(message) for message in messages]
     
     return result
 
+@router.get("/conversations/{conversation_id}/history")
+async def get_conversation_history(
+    conversation_id: int,
+    limit: int = Query(50, ge=1, le=200),
+    before: Optional[int] = Query(None, ge=1),
+    after: Optional[int] = Query(None, ge=0),
+    compact: bool = False,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Keyset message history. `before` pages towards older messages, `after`
+    towards newer ones; both cursors are message ids. With `compact=true`
+    messages are returned as rows in the order given by `fields`.
+    """
+    await ensure_participant(db, conversation_id, current_user.id)
+
+    messages, has_more = fetch_message_page(
+        db, conversation_id, limit, before_id=before, after_id=after
+    )
+
+    result: Dict[str, Any] = {
+        "conversation_id": conversation_id,
+        "has_more": has_more,
+        # Cursors for the next page in each direction
+        "before": messages[-1].id if messages else before,
+        "after": messages[0].id if messages else after,
+    }
+    if compact:
+        result["fields"] = COMPACT_MESSAGE_FIELDS
+        result["messages"] = [serialize_message_compact(m) for m in messages]
+    else:
+        result["messages"] = [serialize_message(m) for m in messages]
+
+    return result
+
 @router.post("/upload_url")
 async def get_upload_url(
     request: GetUploadUrlRequest,
@@ -1,35 +1,85 @@
-from fastapi import APIRouter, Depends, HTTPException
+import asyncio
+import json
+
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
-from typing import List
+from sqlalchemy import desc, tuple_
+from typing import List, Optional
 from datetime import datetime
 
 from app.database.connection import get_db
 from app.models.user import User
 from app.schemas.notification import NotificationOut
-from app.api.v1.auth import get_current_user
+from app.api.v1.auth import get_current_user, get_user_from_token
 from app.models.notification import Notification
+from app.services import notification_service
+from app.services.notification_stream import (
+    OVERFLOW,
+    TICKET_TTL_SECONDS,
+    issue_stream_ticket,
+    load_missed,
+    notification_hub,
+    redeem_stream_ticket,
+)
+from app.utils.logger import get_logger
 
 router = APIRouter()
+logger = get_logger(__name__)
+
+HEARTBEAT_SECONDS = 25
+NOTIFICATIONS_PAGE_SIZE = 50  # Page size when reading with a cursor
 
 @router.get("/me", response_model=List[NotificationOut])
-async def get_user_notifications(
+def get_user_notifications(
+    limit: Optional[int] = Query(None, ge=1, le=100, description=f"defaults to {NOTIFICATIONS_PAGE_SIZE} when paging"),
+    before: Optional[int] = Query(None, ge=1, description="id of the last notification of the previous page"),
+    before_created_at: Optional[datetime] = Query(None, description="created_at of the last notification of the previous page"),
+    unread_only: bool = False,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
-    Get all notifications for the current user, ordered by creation date (newest first).
+    Get notifications for the current user, newest first.
+    Without limit and before the whole inbox is returned, as before.
+    Pages are keyset-based: pass the id (and created_at) of the last item as
+    `before` (and `before_created_at`) to get the next page.
     """
-    notifications = db.query(Notification)\
-        .filter(Notification.user_id == current_user.id)\
-        .order_by(desc(Notification.created_at))\
-        .all()
-    
-    return notifications
+    query = db.query(Notification).filter(Notification.user_id == current_user.id)
+    if unread_only:
+        query = query.filter(Notification.read == False)
+    if before is not None:
+        if before_created_at is None:
+            cursor = db.query(Notification.created_at)\
+                .filter(Notification.id == before, Notification.user_id == current_user.id)\
+                .first()
+            before_created_at = cursor.created_at if cursor else None
+        if before_created_at is not None:
+            query = query.filter(
+                tuple_(Notification.created_at, Notification.id) < tuple_(before_created_at, before)
+            )
+        else:
+            # The cursor row was archived or deleted: ids grow with created_at
+            query = query.filter(Notification.id < before)
+        limit = limit or NOTIFICATIONS_PAGE_SIZE
+
+    query = query.order_by(desc(Notification.created_at), desc(Notification.id))
+    return (query.limit(limit) if limit else query).all()
+
+@router.get("/me/unread-count")
+async def get_unread_count(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Number of unread notifications (cached in Redis).
+    """
+    return {"unread": await notification_service.get_unread_count(db, current_user.id)}
 
 @router.post("/mark-read/{notification_id}")
 async def mark_notification_as_read(
     notification_id: int,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -43,29 +93,98 @@ async def mark_notification_as_read(
     if not notification:
         raise HTTPException(status_code=404, detail="Notification not found")
     
-    notification.read = True
-    notification.read_at = datetime.now()
-    db.commit()
+    if not notification.read:
+        notification.read = True
+        notification.read_at = datetime.now()
+        db.commit()
+        background_tasks.add_task(notification_service.invalidate_unread, [current_user.id])
     
     return {"detail": "Notification marked as read"}
 
 @router.post("/mark-all-read")
 async def mark_all_notifications_as_read(
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Mark all notifications for the current user as read.
     """
-    unread_notifications = db.query(Notification)\
-        .filter(Notification.user_id == current_user.id, Notification.read == False)\
-        .all()
-    
-    now = datetime.now()
-    for notification in unread_notifications:
-        notification.read = True
-        notification.read_at = now
+    updated = notification_service.mark_all_read(db, current_user.id)
+    background_tasks.add_task(notification_service.invalidate_unread, [current_user.id])
     
-    db.commit()
-    
-    return {"detail": f"{len(unread_notifications)} notifications marked as read"} 
\ No newline at end of file
+    return {"detail": f"{updated} notifications marked as read"}
+
+def format_event(payload: dict) -> str:
+    return f"id: {payload['id']}\nevent: notification\ndata: {json.dumps(payload)}\n\n"
+
+@router.post("/stream-ticket")
+async def create_stream_ticket(current_user: User = Depends(get_current_user)):
+    """
+    Single-use ticket for opening /stream from an EventSource, which cannot
+    send an Authorization header. Keeps access tokens out of URLs and logs.
+    """
+    return {"ticket": await issue_stream_ticket(current_user.id), "expires_in": TICKET_TTL_SECONDS}
+
+@router.get("/stream")
+async def stream_notifications(
+    request: Request,
+    ticket: Optional[str] = Query(None, description="single-use ticket from POST /notifications/stream-ticket"),
+    last_event_id: Optional[int] = Query(None, ge=0)
+):
+    """
+    Server-Sent Events stream of new notifications for the current user.
+    Authenticated by a stream ticket or an Authorization: Bearer header.
+    Each event id is the notification id; on reconnect the client sends
+    Last-Event-ID (or last_event_id) and everything created after it is replayed first.
+    """
+    user_id = None
+    if ticket:
+        user_id = await redeem_stream_ticket(ticket)
+    else:
+        scheme, _, credentials = request.headers.get("authorization", "").partition(" ")
+        if scheme.lower() == "bearer" and credentials:
+            try:
+                user = await asyncio.to_thread(get_user_from_token, credentials)
+            except Exception:
+                user = None
+            user_id = user.id if user else None
+    if user_id is None:
+        raise HTTPException(status_code=401, detail="Could not validate credentials")
+
+    header_id = request.headers.get("last-event-id")
+    if header_id and header_id.isdigit():
+        last_event_id = int(header_id)
+
+    async def events():
+        # Subscribe before replaying so nothing committed in between is lost
+        queue = notification_hub.subscribe(user_id)
+        try:
+            last_sent = last_event_id or 0
+            yield "retry: 5000\n\n"
+            if last_event_id is not None:
+                for payload in await asyncio.to_thread(load_missed, user_id, last_event_id):
+                    last_sent = payload["id"]
+                    yield format_event(payload)
+
+            while not await request.is_disconnected():
+                try:
+                    payload = await asyncio.wait_for(queue.get(), timeout=HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": ping\n\n"
+                    continue
+                if payload is OVERFLOW:
+                    logger.info(f"Notification stream of user {user_id} overflowed, closing")
+                    return
+                if payload["id"] <= last_sent:
+                    continue
+                last_sent = payload["id"]
+                yield format_event(payload)
+        finally:
+            notification_hub.unsubscribe(user_id, queue)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -1,6 +1,7 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query
 from sqlalchemy import func
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 from typing import List, Optional
 from app.database.connection import get_db
 from app.models.post import Post
@@ -11,14 +12,18 @@ from app.models.like import PostLike
 from app.models.save import SavedPost
 from app.models.comment import PostComment
 from app.models.relations.associations import post_tags_association
-from app.schemas.post import PostCreate, PostOut
+from app.schemas.post import PostCreate, PostOut, PostHydrateRequest, PostHydrateResponse
 from app.schemas.comment import CommentCreate, CommentOut
 from app.api.v1.auth import get_current_user
 from app.utils.logger import get_logger
 from datetime import datetime
 from math import ceil
 from app.models.recommendation import Recommendation
-from app.utils.logger import get_logger
+from app.models.project import Project
+from app.services.feed_service import fan_out_post, read_feed_ids
+from app.services.post_hydration import hydrate_posts, hydrate_posts_for_viewer, invalidate_post_payload
+from app.services import deletion_service, trending_service
+from app.events import PostCommented, PostLiked, PostSaved, emit
 
 router = APIRouter()
 logger = get_logger(__name__)
@@ -27,6 +32,7 @@ logger = get_logger(__name__)
 @router.post("/", response_model=PostOut)
 def create_post(
     post_data: PostCreate,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
@@ -46,6 +52,12 @@ def create_post(
             raise HTTPException(status_code=404, detail="Team not found.")
         new_post.team_id = team.id
 
+    if post_data.post_type == "project" and post_data.project_id:
+        project = db.query(Project).filter(Project.id == post_data.project_id).first()
+        if not project:
+            raise HTTPException(status_code=404, detail="Project not found.")
+        new_post.project_id = project.id
+
     if post_data.tag_ids:
         selected_tags = db.query(Tag).filter(Tag.id.in_(post_data.tag_ids)).all()
         if not selected_tags:
@@ -56,6 +68,9 @@ def create_post(
     db.commit()
     db.refresh(new_post)
 
+    # Push the post into followers' home feeds after the response is sent
+    background_tasks.add_task(fan_out_post, new_post.id)
+
     # Format the response data according to PostOut schema
     return PostOut(
         id=new_post.id,
@@ -249,6 +264,40 @@ def get_user_posts(
 
     return formatted_posts
 
+@router.get("/feed", response_model=dict)
+async def get_home_feed(
+    before_id: Optional[int] = Query(None, ge=1),
+    limit: int = Query(20, ge=1, le=50),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Personal feed: posts from the user's projects, teams and followed tags.
+    Paginated by post id; pass `next_cursor` back as `before_id`.
+    """
+    post_ids = await read_feed_ids(db, current_user.id, limit, before_id)
+    items = await run_in_threadpool(hydrate_posts, db, post_ids)
+    return {
+        "items": items,
+        "next_cursor": post_ids[-1] if len(post_ids) == limit else None
+    }
+
+@router.post("/hydrate", response_model=PostHydrateResponse)
+async def hydrate_post_batch(
+    request: PostHydrateRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Returns bodies, authors, tags, counts and the caller's like/save flags
+    for up to 200 posts with a fixed number of queries.
+    Replaces /batch_status plus per-post /is_liked, /is_saved calls.
+    """
+    items, missing = await hydrate_posts_for_viewer(
+        db, request.post_ids, current_user.id, use_cache=request.use_cache
+    )
+    return {"items": items, "missing": missing}
+
 @router.get("/search", response_model=List[PostOut])
 def search_posts(
     query: str = Query(""),  # Default to empty string with no validation constraints
@@ -297,15 +346,26 @@ def search_posts(
         logger.info(f"Empty query provided, returning empty results")
         return []
 
-# Get Popular Posts
-@router.get("/popular-posts", response_model=List[PostOut])
-def get_popular_posts(
-    limit: int = Query(3, ge=1, le=10),
+# Trending Posts
+@router.get("/trending", response_model=List[PostOut])
+async def get_trending_posts(
+    limit: int = Query(10, ge=1, le=50),
+    post_type: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
     """
-    Retrieves the most popular posts based on engagement metrics (likes, comments, saves).
+    Top posts by time-decayed engagement (likes, saves, comments).
     """
+    # Over-fetch when filtering by type, deleted/other-type posts are dropped
+    fetch = limit * 5 if post_type else limit
+    post_ids = await trending_service.top_ids("post", fetch)
+    posts = await run_in_threadpool(hydrate_posts, db, post_ids)
+    if post_type:
+        posts = [post for post in posts if post.post_type == post_type]
+    return posts[:limit]
+
+def popular_posts_from_db(db: Session, limit: int) -> List[PostOut]:
+    """All-time most liked news posts (fallback for empty trending scores, runs in the threadpool)."""
     # Subqueries for counts
     likes_count_subquery = db.query(PostLike.post_id, func.count(PostLike.id).label('likes_count')).group_by(PostLike.post_id).subquery()
     comments_count_subquery = db.query(PostComment.post_id, func.count(PostComment.id).label('comments_count')).group_by(PostComment.post_id).subquery()
@@ -352,6 +412,22 @@ def get_popular_posts(
 
     return formatted_posts
 
+# Get Popular Posts
+@router.get("/popular-posts", response_model=List[PostOut])
+async def get_popular_posts(
+    limit: int = Query(3, ge=1, le=10),
+    db: Session = Depends(get_db)
+):
+    """
+    Retrieves the most popular posts based on engagement metrics (likes, comments, saves).
+    Served from the trending scores; falls back to all-time likes when they are empty.
+    """
+    trending = await get_trending_posts(limit=limit, post_type="news", db=db)
+    if trending:
+        return trending
+
+    return await run_in_threadpool(popular_posts_from_db, db, limit)
+
 # Get Single Post with Counts
 @router.get("/{post_id}", response_model=PostOut)
 def get_single_post(post_id: int, db: Session = Depends(get_db)):
@@ -386,30 +462,26 @@ def get_single_post(post_id: int, db: Session = Depends(get_db)):
 @router.delete("/{post_id}", status_code=204)
 def delete_post(
     post_id: int,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     """
     Deletes a post if the current user is the author.
     """
-    post = db.query(Post).filter(Post.id == post_id).first()
-    
-    if not post:
+    author = db.query(Post.author_id).filter(Post.id == post_id).first()
+
+    if not author:
         raise HTTPException(status_code=404, detail="Post not found")
 
     # Ensure only the author can delete
-    if post.author_id != current_user.id:
+    if author.author_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized to delete this post")
 
-
-    # Delete related likes, comments, and saves
-    db.query(PostLike).filter(PostLike.post_id == post_id).delete()
-    db.query(PostComment).filter(PostComment.post_id == post_id).delete()
-    db.query(SavedPost).filter(SavedPost.post_id == post_id).delete()
-
-    # Now delete the post
-    db.delete(post)
-    db.commit()
+    # Likes, comments, saves and tags are removed by ON DELETE CASCADE
+    deletion_service.delete_post(db, post_id)
+    background_tasks.add_task(invalidate_post_payload, post_id)
+    background_tasks.add_task(trending_service.remove_entity, "post", post_id)
     
     return {"message": "Post deleted successfully"}
 
@@ -417,6 +489,7 @@ def delete_post(
 @router.post("/{post_id}/like")
 def like_post(
     post_id: int,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -447,6 +520,7 @@ def like_post(
         # Get updated like count
         like_count = db.query(PostLike).filter(PostLike.post_id == post_id).count()
         
+        emit(db, background_tasks, PostLiked(post_id=post_id, user_id=current_user.id, delta=1 if is_liked else -1))
         db.commit()
         
         return {
@@ -471,6 +545,7 @@ def is_post_liked(post_id: int, db: Session = Depends(get_db), current_user: Use
 @router.post("/{post_id}/save")
 def save_post(
     post_id: int,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -501,6 +576,7 @@ def save_post(
         # Get updated save count
         save_count = db.query(SavedPost).filter(SavedPost.post_id == post_id).count()
         
+        emit(db, background_tasks, PostSaved(post_id=post_id, user_id=current_user.id, delta=1 if is_saved else -1))
         db.commit()
         
         return {
@@ -548,6 +624,7 @@ def get_post_comments(post_id: int, db: Session = Depends(get_db)):
 def comment_post(
     post_id: int,
     comment_data: CommentCreate,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -563,6 +640,8 @@ def comment_post(
         post_id=post_id
     )
     db.add(new_comment)
+    db.flush()
+    emit(db, background_tasks, PostCommented(post_id=post_id, user_id=current_user.id, comment_id=new_comment.id))
     db.commit()
     db.refresh(new_comment)
 
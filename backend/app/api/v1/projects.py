@@ -6,9 +6,11 @@
 from datetime import datetime
 from math import ceil
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy import case, func
 from typing import List
 from sqlalchemy.orm import joinedload
@@ -28,6 +30,11 @@ from app.schemas.project import ApplicationDecisionRequest, ApplicationStatus
 from app.models.comment import ProjectComment
 from app.schemas.comment import CommentOut, CommentCreate
 from app.utils import get_logger
+from app.services.feed_service import invalidate_user_feeds
+from app.services import deletion_service, trending_service
+from app.services.post_hydration import invalidate_post_payloads
+from app.events import ApplicationDecided, ProjectCommented, ProjectVoted, emit
+from sqlalchemy.orm import selectinload
 
 router = APIRouter()
 logger = get_logger(__name__)
@@ -427,14 +434,57 @@ def search_projects(
         logger.info(f"Empty query provided, returning empty results")
         return []
 
-@router.get("/popular-projects", response_model=List[ProjectOut])
-def get_popular_projects(
-    limit: int = Query(3, ge=1, le=10),
+def build_projects_out(db: Session, project_ids: List[int]) -> List[ProjectOut]:
+    """
+    ProjectOut for a list of ids, in that order, with vote and comment counts
+    loaded by one grouped query each instead of per project.
+    """
+    if not project_ids:
+        return []
+    projects = db.query(Project).options(
+        selectinload(Project.owner),
+        selectinload(Project.tags),
+        selectinload(Project.skills),
+        selectinload(Project.members)
+    ).filter(Project.id.in_(project_ids)).all()
+    projects_by_id = {project.id: project for project in projects}
+
+    vote_counts = dict(db.query(
+        ProjectVote.project_id, func.sum(case((ProjectVote.is_upvote, 1), else_=-1))
+    ).filter(ProjectVote.project_id.in_(project_ids)).group_by(ProjectVote.project_id).all())
+    comment_counts = dict(db.query(
+        ProjectComment.project_id, func.count(ProjectComment.id)
+    ).filter(ProjectComment.project_id.in_(project_ids)).group_by(ProjectComment.project_id).all())
+
+    return [
+        ProjectOut(
+            id=project.id,
+            name=project.name,
+            description=project.description,
+            owner=UserOut.model_validate(project.owner) if project.owner else None,
+            tags=[TagOut.model_validate(tag, from_attributes=True) for tag in project.tags],
+            skills=[SkillOut.model_validate(skill, from_attributes=True) for skill in project.skills],
+            members=[UserOut.model_validate(user, from_attributes=True) for user in project.members],
+            comments_count=comment_counts.get(project.id, 0),
+            vote_count=vote_counts.get(project.id) or 0
+        )
+        for project in (projects_by_id.get(project_id) for project_id in project_ids)
+        if project is not None
+    ]
+
+@router.get("/trending", response_model=List[ProjectOut])
+async def get_trending_projects(
+    limit: int = Query(10, ge=1, le=50),
     db: Session = Depends(get_db)
 ):
     """
-    Retrieves the most popular projects based on votes and comments.
+    Top projects by time-decayed votes and comments.
     """
+    project_ids = await trending_service.top_ids("project", limit)
+    return await run_in_threadpool(build_projects_out, db, project_ids)
+
+def popular_projects_from_db(db: Session, limit: int) -> List[ProjectOut]:
+    """All-time most voted projects (fallback for empty trending scores, runs in the threadpool)."""
     # Get projects with most votes
     projects = db.query(Project)\
         .options(
@@ -469,6 +519,21 @@ def get_popular_projects(
 
     return formatted_projects
 
+@router.get("/popular-projects", response_model=List[ProjectOut])
+async def get_popular_projects(
+    limit: int = Query(3, ge=1, le=10),
+    db: Session = Depends(get_db)
+):
+    """
+    Retrieves the most popular projects based on votes and comments.
+    Served from the trending scores; falls back to all-time votes when they are empty.
+    """
+    trending = await get_trending_projects(limit=limit, db=db)
+    if trending:
+        return trending
+
+    return await run_in_threadpool(popular_projects_from_db, db, limit)
+
 # 🔹 Получить проект по ID
 @router.get("/{project_id}", response_model=ProjectOut)
 def read_project(project_id: int, db: Session = Depends(get_db)):
@@ -559,6 +624,7 @@ def update_project_status(
 @router.delete("/{project_id}", summary="Удалить проект")
 def delete_project(
     project_id: int,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -572,9 +638,10 @@ def delete_project(
     if project.owner_id != current_user.id:
         raise HTTPException(status_code=403, detail="Вы не можете удалить чужой проект")
 
-    # Now delete the project
-    db.delete(project)
-    db.commit()
+    # Посты проекта удаляются вместе с ним; их кэш payload сбрасывается
+    post_ids = deletion_service.delete_project(db, project)
+    background_tasks.add_task(invalidate_post_payloads, post_ids)
+    background_tasks.add_task(trending_service.remove_entity, "project", project_id)
     return {"detail": "Проект успешно удалён"}
 
 @router.get("/{project_id}/profile", response_model=ProjectProfileOut)
@@ -743,6 +810,7 @@ def decide_application(
     project_id: int,
     user_id: int,
     request: ApplicationDecisionRequest,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -796,11 +864,16 @@ def decide_application(
                 project_id=project_id
             )
             db.add(rejection_notification)
+            db.flush()
+            emit(db, background_tasks, ApplicationDecided(
+                project_id=project_id, user_id=user_id, accepted=False, notification_id=rejection_notification.id
+            ))
             db.commit()
             
-            raise HTTPException(
-                status_code=400, 
-                detail="Cannot accept: User has reached the maximum limit of 3 projects"
+            # Returned rather than raised so the background task still runs
+            return JSONResponse(
+                status_code=400,
+                content={"detail": "Cannot accept: User has reached the maximum limit of 3 projects"}
             )
             
         # Add user to project members
@@ -821,6 +894,11 @@ def decide_application(
             project_id=project_id
         )
         db.add(acceptance_notification)
+        db.flush()
+        # Обработчик события сбросит ленту нового участника и доставит уведомление
+        emit(db, background_tasks, ApplicationDecided(
+            project_id=project_id, user_id=user_id, accepted=True, notification_id=acceptance_notification.id
+        ))
         db.commit()
         
         return {"detail": "Пользователь принят в проект"}
@@ -840,6 +918,10 @@ def decide_application(
             project_id=project_id
         )
         db.add(rejection_notification)
+        db.flush()
+        emit(db, background_tasks, ApplicationDecided(
+            project_id=project_id, user_id=user_id, accepted=False, notification_id=rejection_notification.id
+        ))
         db.commit()
         
         return {"detail": "Заявка отклонена"}
@@ -849,6 +931,7 @@ def decide_application(
 def remove_user_from_project(
     project_id: int,
     user_id: int,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -877,6 +960,7 @@ def remove_user_from_project(
         (project_members_association.c.user_id == user_id)
     ))
     db.commit()
+    background_tasks.add_task(invalidate_user_feeds, [user_id])
     return {"detail": "Пользователь удален из проекта"}
 
 # 🔹 Проголосовать за проект (upvote/downvote)
@@ -884,6 +968,7 @@ def remove_user_from_project(
 def vote_project(
     project_id: int,
     vote_data: VoteRequest,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -896,17 +981,24 @@ def vote_project(
 
     existing_vote = db.query(ProjectVote).filter_by(user_id=current_user.id, project_id=project_id).first()
 
+    # Change of the vote sum, fed into trending scores
+    direction = 1 if vote_data.is_upvote else -1
     if existing_vote:
         if existing_vote.is_upvote == vote_data.is_upvote:
             db.delete(existing_vote)
-            db.commit()
+            vote_delta = -direction
         else:
             existing_vote.is_upvote = vote_data.is_upvote
-            db.commit()
+            vote_delta = 2 * direction
     else:
         new_vote = ProjectVote(user_id=current_user.id, project_id=project_id, is_upvote=vote_data.is_upvote)
         db.add(new_vote)
-        db.commit()
+        vote_delta = direction
+    emit(db, background_tasks, ProjectVoted(
+        project_id=project_id, user_id=current_user.id, delta=vote_delta,
+        upvoted=vote_data.is_upvote and vote_delta > 0
+    ))
+    db.commit()
 
     # Get the actual vote count after the operation
     vote_count = db.query(
@@ -945,6 +1037,7 @@ def get_vote_status(
 def comment_project(
     project_id: int,
     comment_data: CommentCreate,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -961,6 +1054,8 @@ def comment_project(
         project_id=project_id
     )
     db.add(new_comment)
+    db.flush()
+    emit(db, background_tasks, ProjectCommented(project_id=project_id, user_id=current_user.id, comment_id=new_comment.id))
     db.commit()
     db.refresh(new_comment)
 
@@ -2,16 +2,19 @@
 Этот модуль управляет операциями над тегами (Tag):
 - Получение списка всех тегов
 - Добавление новых тегов
+- Подписка на теги (для персональной ленты)
 """
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
 from sqlalchemy.orm import Session
 from typing import List
 
 from app.database.connection import get_db
 from app.models.tag import Tag
 from app.schemas.tag import TagCreate, TagOut
+from app.models.relations.associations import tag_followers
 from app.api.v1.auth import get_current_user
+from app.services.feed_service import invalidate_user_feeds
 from app.utils.logger import get_logger
 
 router = APIRouter()
@@ -43,3 +46,47 @@ def create_tag(
     db.commit()
     db.refresh(new_tag)
     return new_tag
+
+
+@router.post("/{tag_id}/follow", summary="Подписаться на тег")
+def follow_tag(
+    tag_id: int,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    current_user=Depends(get_current_user)
+):
+    """
+    Подписывает пользователя на тег: посты с этим тегом попадают в его ленту.
+    """
+    if not db.query(Tag.id).filter(Tag.id == tag_id).first():
+        raise HTTPException(status_code=404, detail="Тег не найден")
+
+    exists = db.execute(
+        tag_followers.select().where(
+            (tag_followers.c.tag_id == tag_id) & (tag_followers.c.user_id == current_user.id)
+        )
+    ).first()
+    if not exists:
+        db.execute(tag_followers.insert().values(user_id=current_user.id, tag_id=tag_id))
+        db.commit()
+        background_tasks.add_task(invalidate_user_feeds, [current_user.id])
+    return {"tag_id": tag_id, "following": True}
+
+
+@router.delete("/{tag_id}/follow", summary="Отписаться от тега")
+def unfollow_tag(
+    tag_id: int,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    current_user=Depends(get_current_user)
+):
+    """
+    Отписывает пользователя от тега.
+    """
+    result = db.execute(tag_followers.delete().where(
+        (tag_followers.c.tag_id == tag_id) & (tag_followers.c.user_id == current_user.id)
+    ))
+    db.commit()
+    if result.rowcount:
+        background_tasks.add_task(invalidate_user_feeds, [current_user.id])
+    return {"tag_id": tag_id, "following": False}
@@ -4,7 +4,7 @@
 - Получение списка всех команд и детальной информации о конкретной команде.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import List
 
@@ -13,6 +13,8 @@ from app.models.team import Team
 from app.models.user import User
 from app.schemas.team import TeamCreate, TeamOut, TeamUpdate
 from app.api.v1.auth import get_current_user
+from app.services import deletion_service
+from app.services.post_hydration import invalidate_post_payloads
 from app.utils.logger import get_logger
 
 router = APIRouter()
@@ -88,6 +90,7 @@ def update_team(
 @router.delete("/{team_id}", summary="Удалить команду")
 def delete_team(
     team_id: int,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -97,6 +100,7 @@ def delete_team(
     team = db.query(Team).filter(Team.id == team_id).first()
     if not team:
         raise HTTPException(status_code=404, detail="Команда не найдена")
-    db.delete(team)
-    db.commit()
+    # Посты команды удаляются вместе с ней; их кэш payload сбрасывается
+    post_ids = deletion_service.delete_team(db, team)
+    background_tasks.add_task(invalidate_post_payloads, post_ids)
     return {"detail": "Команда успешно удалена"}
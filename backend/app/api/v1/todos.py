@@ -7,8 +7,11 @@
 - Удаление Todo.
 """
 
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Path
+from collections import defaultdict
+from typing import Dict, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Path, Request, Response
+from fastapi.responses import JSONResponse
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 from math import ceil
 from datetime import datetime
@@ -16,7 +19,9 @@ from datetime import datetime
 from app.database.connection import get_db
 from app.models.todo import Todo, TaskStatus, TaskPriority
 from app.models.project import Project
-from app.models.relations.associations import task_assignments
+from app.models.relations.associations import task_assignments, todo_tags_association, todo_watchers_association
+from app.models.tag import Tag
+from app.models.todo_comment import TodoComment
 from app.models.user import User
 from app.schemas.todo import TodoInDB, TodoCreate, TodoUpdate, TodoDetail, TodosResponse, TaskAssignmentRole, UserBasic
 from app.api.v1.auth import get_current_user
@@ -140,7 +145,7 @@ def get_todos(
     todos = query.order_by(Todo.created_at.desc()).offset((page - 1) * page_size).limit(page_size).all()
     
     # Format results with details
-    todo_details = [get_todo_detail(db, todo) for todo in todos]
+    todo_details = get_todo_details(db, todos)
     
     return TodosResponse(
         items=todo_details,
@@ -190,7 +195,7 @@ def get_project_todos(
     todos = query.order_by(Todo.created_at.desc()).offset((page - 1) * page_size).limit(page_size).all()
     
     # Format results with details
-    todo_details = [get_todo_detail(db, todo) for todo in todos]
+    todo_details = get_todo_details(db, todos)
     
     return TodosResponse(
         items=todo_details,
@@ -200,6 +205,82 @@ def get_project_todos(
         total_pages=total_pages
     )
 
+BOARD_TODO_FIELDS = [
+    "id", "title", "priority", "due_date", "is_completed",
+    "user_id", "assignee_ids", "tags", "comment_count", "updated_at"
+]
+
+
+def get_board_version(db: Session, project_id: int) -> str:
+    """Board version: number of todos + latest updated_at, used as the ETag."""
+    count, last_updated = db.query(func.count(Todo.id), func.max(Todo.updated_at)).filter(
+        Todo.project_id == project_id
+    ).one()
+    return f"{project_id}-{count}-{last_updated.timestamp() if last_updated else 0}"
+
+
+@router.get("/project/{project_id}/board", summary="Get project task board")
+def get_project_board(
+        request: Request,
+        project_id: int = Path(..., ge=1),
+        db: Session = Depends(get_db),
+        current_user: User = Depends(get_current_user)
+):
+    """
+    Returns every todo of the project grouped by status in a compact form:
+    todos are rows in the order given by `fields`, `columns` maps a status to todo ids
+    and `users` holds the assignees once.
+
+    The response carries an ETag with the board version; a request with a matching
+    If-None-Match gets 304 Not Modified without the board being rebuilt.
+    """
+    if not is_project_member(db, current_user.id, project_id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You must be a member or owner of the project to view its tasks"
+        )
+
+    version = get_board_version(db, project_id)
+    etag = f'W/"board-{version}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    todos = db.query(Todo).filter(Todo.project_id == project_id).order_by(Todo.created_at.desc()).all()
+    details = get_todo_details(db, todos)
+
+    columns: Dict[str, List[int]] = {task_status.value: [] for task_status in TaskStatus}
+    users: Dict[int, Dict[str, Optional[str]]] = {}
+    rows = []
+    for todo in details:
+        columns.setdefault(todo.status, []).append(todo.id)
+        for assignee in todo.assignees:
+            users[assignee.id] = {"username": assignee.username, "avatar_url": assignee.avatar_url}
+        rows.append([
+            todo.id,
+            todo.title,
+            todo.priority,
+            todo.due_date.isoformat() if todo.due_date else None,
+            todo.is_completed,
+            todo.user_id,
+            [assignee.id for assignee in todo.assignees],
+            todo.tags,
+            todo.comment_count,
+            todo.updated_at.isoformat() if todo.updated_at else None
+        ])
+
+    return JSONResponse(
+        content={
+            "project_id": project_id,
+            "version": version,
+            "fields": BOARD_TODO_FIELDS,
+            "todos": rows,
+            "columns": columns,
+            "users": users
+        },
+        headers=headers
+    )
+
 @router.get("/{todo_id}", response_model=TodoDetail, summary="Get todo details")
 def get_todo(
         todo_id: int,
@@ -312,6 +393,8 @@ def update_todo(
         
         # Remove assignee_ids from the dict to avoid confusion with the model fields
         del update_data["assignee_ids"]
+        # Assignments live in another table; bump the todo so the board version changes
+        db_todo.updated_at = datetime.utcnow()
     
     # Update the todo object fields
     for key, value in update_data.items():
@@ -358,60 +441,71 @@ def delete_todo(
     db.commit()
     return
 
-# Helper function to get todo details with assignments, tags, etc.
+# Helper functions to get todo details with assignments, tags, etc.
+def _users_by_todo(db: Session, link_table, todo_ids: List[int], *conditions) -> Dict[int, List[UserBasic]]:
+    """One query for users linked to the todos through task_assignments/todo_watchers."""
+    rows = db.execute(
+        select(link_table.c.todo_id, User.id, User.username, User.avatar_url)
+        .join(User, User.id == link_table.c.user_id)
+        .where(link_table.c.todo_id.in_(todo_ids), *conditions)
+        .order_by(link_table.c.todo_id, User.id)
+    ).all()
+    users: Dict[int, List[UserBasic]] = defaultdict(list)
+    for todo_id, user_id, username, avatar_url in rows:
+        users[todo_id].append(UserBasic(id=user_id, username=username, avatar_url=avatar_url))
+    return users
+
+
+def get_todo_details(db: Session, todos: List[Todo]) -> List[TodoDetail]:
+    """
+    Builds TodoDetail objects for a page of todos with a fixed number of queries:
+    assignees, watchers, tags and comment counts are each loaded once for the whole page.
+    """
+    if not todos:
+        return []
+    todo_ids = [todo.id for todo in todos]
+
+    assignees = _users_by_todo(
+        db, task_assignments, todo_ids, task_assignments.c.role == TaskAssignmentRole.ASSIGNEE
+    )
+    watchers = _users_by_todo(db, todo_watchers_association, todo_ids)
+
+    tags: Dict[int, List[str]] = defaultdict(list)
+    for todo_id, name in db.execute(
+        select(todo_tags_association.c.todo_id, Tag.name)
+        .join(Tag, Tag.id == todo_tags_association.c.tag_id)
+        .where(todo_tags_association.c.todo_id.in_(todo_ids))
+        .order_by(todo_tags_association.c.todo_id, Tag.name)
+    ).all():
+        tags[todo_id].append(name)
+
+    comment_counts = dict(db.query(TodoComment.todo_id, func.count(TodoComment.id)).filter(
+        TodoComment.todo_id.in_(todo_ids)
+    ).group_by(TodoComment.todo_id).all())
+
+    return [
+        TodoDetail(
+            id=todo.id,
+            title=todo.title,
+            description=todo.description,
+            status=todo.status,
+            priority=todo.priority,
+            estimated_hours=todo.estimated_hours,
+            due_date=todo.due_date,
+            is_completed=todo.is_completed,
+            user_id=todo.user_id,
+            project_id=todo.project_id,
+            created_at=todo.created_at,
+            updated_at=todo.updated_at,
+            assignees=assignees.get(todo.id, []),
+            watchers=watchers.get(todo.id, []),
+            comment_count=comment_counts.get(todo.id, 0),
+            tags=tags.get(todo.id, [])
+        )
+        for todo in todos
+    ]
+
+
 def get_todo_detail(db: Session, todo: Todo) -> TodoDetail:
     """Creates a TodoDetail object with additional details about the todo."""
-    # Get assignees
-    assignees = []
-    
-    # Get assignees from task_assignments
-    assignee_query = db.query(User).join(
-        task_assignments,
-        User.id == task_assignments.c.user_id
-    ).filter(
-        task_assignments.c.todo_id == todo.id,
-        task_assignments.c.role == TaskAssignmentRole.ASSIGNEE
-    )
-    
-    # Add each user to assignees
-    for user in assignee_query.all():
-        assignees.append(UserBasic(
-            id=user.id,
-            username=user.username,
-            avatar_url=user.avatar_url if hasattr(user, 'avatar_url') else None
-        ))
-    
-    # Get watchers (from both the watchers relationship and task_assignments)
-    watchers = []
-    for watcher in todo.watchers:
-        watchers.append(UserBasic(
-            id=watcher.id,
-            username=watcher.username,
-            avatar_url=watcher.avatar_url if hasattr(watcher, 'avatar_url') else None
-        ))
-    
-    # Count comments
-    comment_count = len(todo.comments) if hasattr(todo, 'comments') and todo.comments is not None else 0
-    
-    # Get tags
-    tags = [tag.name for tag in todo.tags] if hasattr(todo, 'tags') and todo.tags is not None else []
-    
-    # Create and return the detailed todo object
-    return TodoDetail(
-        id=todo.id,
-        title=todo.title,
-        description=todo.description,
-        status=todo.status,
-        priority=todo.priority,
-        estimated_hours=todo.estimated_hours,
-        due_date=todo.due_date,
-        is_completed=todo.is_completed,
-        user_id=todo.user_id,
-        project_id=todo.project_id,
-        created_at=todo.created_at,
-        updated_at=todo.updated_at,
-        assignees=assignees,
-        watchers=watchers,
-        comment_count=comment_count,
-        tags=tags
-    )
+    return get_todo_details(db, [todo])[0]
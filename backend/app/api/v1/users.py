@@ -5,9 +5,10 @@
 - Удаление своей учетной записи.
 """
 #fix
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Query
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, UploadFile, File, Query
 from sqlalchemy.orm import Session
-from typing import List, Union
+from typing import List, Optional, Union
+from datetime import datetime
 import io
 import uuid
 from PIL import Image
@@ -16,23 +17,28 @@ from app.database.connection import get_db
 from app.models.user import User, Education, Experience
 from app.models.skill import Skill
 from app.models.save import SavedPost
-from app.models.post import Post
-from app.models.like import PostLike
-from app.models.comment import PostComment
 from app.models.project import Project
 from app.models.vote import ProjectVote
+from app.models.team import Team
+from app.models.todo import Todo
 from app.schemas.user import UserOut, UserUpdate, EducationCreate, ExperienceCreate, EducationUpdate, ExperienceUpdate, EducationOut, ExperienceOut, AvatarUpdate, StatusUpdate, BasicInfoUpdate, SocialLinksUpdate, ContactInfoUpdate, UserOutWithToken
 from app.schemas.skill import SkillOut
 from app.schemas.project import ProjectOut, TagOut
+from app.schemas.post import SavedPostOut
 from app.api.v1.auth import get_current_user, create_access_token
 from app.core.config import settings
 from app.utils.s3 import s3_service
+from app.services import deletion_service
+from app.services.chat_membership import membership_cache
+from app.services.post_hydration import hydrate_posts, invalidate_post_payloads
 from app.utils.logger import get_logger
-from sqlalchemy import case, func
+from sqlalchemy import case, func, tuple_
 
 router = APIRouter()
 logger = get_logger(__name__)
 
+SAVED_POSTS_PAGE_SIZE = 50  # Размер страницы сохранённых постов при чтении по курсору
+
 @router.get("/", response_model=List[UserOut], summary="Получить список всех пользователей")
 def read_users(db: Session = Depends(get_db)):
     """
@@ -356,14 +362,31 @@ def get_user_skills(
 
 @router.delete("/me", summary="Удалить свою учётную запись")
 def delete_own_profile(
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Позволяет пользователю удалить свою учетную запись.
-    """
-    db.delete(current_user)
-    db.commit()
+    Связанные данные удаляются каскадом в БД; если их очень много,
+    аккаунт сразу отключается, а очистка выполняется в фоне.
+    """
+    user_id = current_user.id
+    # teams.leader_id и todos.user_id не допускают NULL — удаление заблокирует БД
+    if db.query(Team.id).filter(Team.leader_id == user_id).first():
+        raise HTTPException(status_code=409, detail="Передайте руководство командами перед удалением аккаунта")
+    if db.query(Todo.id).filter(Todo.user_id == user_id).first():
+        raise HTTPException(status_code=409, detail="Удалите или передайте свои задачи перед удалением аккаунта")
+
+    conversation_ids = membership_cache.conversation_ids_of(db, user_id)
+    deferred, rows, post_ids = deletion_service.delete_user(db, user_id)
+    # Посты остались без автора — кэшированные payload'ы показывали бы его имя и аватар
+    background_tasks.add_task(invalidate_post_payloads, post_ids)
+    # Удалённый пользователь не должен проходить проверку доступа к чатам из кэша
+    background_tasks.add_task(membership_cache.remove_user, user_id, conversation_ids)
+    if deferred:
+        logger.info(f"User {user_id}: {rows} related rows scheduled for background purge")
+        background_tasks.add_task(deletion_service.purge_user, user_id)
     return {"detail": "Ваш аккаунт был удалён"}
 
 @router.patch("/me/avatar", response_model=UserOut)
@@ -615,36 +638,44 @@ def update_contact_info(
             detail=f"Ошибка при обновлении контактной информации: {str(e)}"
         )
 
-@router.get("/me/saved-posts")
-def get_saved_posts(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    saved_posts = db.query(SavedPost).filter(SavedPost.user_id == current_user.id).join(Post).all()
-    
-    # Format each post with author information
-    formatted_posts = []
-    for saved_post in saved_posts:
-        post = saved_post.post
-        author = db.query(User).filter(User.id == post.author_id).first() if post.author_id else None
-        
-        formatted_post = {
-            "id": post.id,
-            "title": post.title,
-            "content": post.content,
-            "post_type": post.post_type,
-            "author_id": post.author_id,
-            "project_id": post.project_id,
-            "team_id": post.team_id,
-            "tags": [tag.name for tag in post.tags],
-            "author": {
-                "username": author.username if author else "Unknown",
-                "avatar_url": author.avatar_url if author and author.avatar_url else None
-            },
-            "likes_count": db.query(PostLike).filter(PostLike.post_id == post.id).count(),
-            "comments_count": db.query(PostComment).filter(PostComment.post_id == post.id).count(),
-            "saves_count": db.query(SavedPost).filter(SavedPost.post_id == post.id).count()
-        }
-        formatted_posts.append(formatted_post)
-    
-    return formatted_posts
+@router.get("/me/saved-posts", response_model=List[SavedPostOut], summary="Сохранённые посты")
+def get_saved_posts(
+    limit: Optional[int] = Query(None, ge=1, le=100, description=f"по умолчанию {SAVED_POSTS_PAGE_SIZE} при постраничном чтении"),
+    before: Optional[int] = Query(None, ge=1, description="save_id последнего поста предыдущей страницы"),
+    before_saved_at: Optional[datetime] = Query(None, description="saved_at последнего поста предыдущей страницы"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Сохранённые посты от новых к старым (keyset по времени сохранения).
+    Без limit и before возвращается весь список, как раньше.
+    Посты, авторы, теги и счётчики загружаются пакетно, число запросов не зависит от limit.
+    """
+    query = db.query(SavedPost.id, SavedPost.post_id, SavedPost.created_at).filter(
+        SavedPost.user_id == current_user.id
+    )
+    if before is not None:
+        if before_saved_at is None:
+            cursor = db.query(SavedPost.created_at).filter(
+                SavedPost.id == before, SavedPost.user_id == current_user.id
+            ).first()
+            before_saved_at = cursor.created_at if cursor else None
+        if before_saved_at is not None:
+            query = query.filter(tuple_(SavedPost.created_at, SavedPost.id) < tuple_(before_saved_at, before))
+        else:
+            # Сохранение-курсор уже удалено: id растут вместе с created_at
+            query = query.filter(SavedPost.id < before)
+        limit = limit or SAVED_POSTS_PAGE_SIZE
+
+    query = query.order_by(SavedPost.created_at.desc(), SavedPost.id.desc())
+    saves = (query.limit(limit) if limit else query).all()
+    posts = {post.id: post for post in hydrate_posts(db, [save.post_id for save in saves])}
+
+    return [
+        SavedPostOut(**posts[save.post_id].model_dump(), save_id=save.id, saved_at=save.created_at)
+        for save in saves
+        if save.post_id in posts
+    ]
 
 @router.patch("/me/cover-photo", response_model=UserOut)
 async def update_cover_photo(
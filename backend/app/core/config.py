@@ -30,6 +30,11 @@ class Settings(BaseSettings):
 
     REDIS_URL: str = Field("redis://localhost:6379", env="REDIS_URL")
 
+    # Шина доменных событий: "redis" (Redis Streams) или "memory" (тесты)
+    EVENT_BUS_BACKEND: str = Field("redis", env="EVENT_BUS_BACKEND")
+    # Запускать потребителя событий внутри веб-процесса (без отдельного app.event_worker)
+    EVENT_WORKER_IN_PROCESS: bool = Field(True, env="EVENT_WORKER_IN_PROCESS")
+
     ELASTICSEARCH_URL: str = Field("http://127.0.0.1:9200", env="ELASTICSEARCH_URL")
     
     N_AWS_ACCESS_KEY_ID: str = Field(..., env="N_AWS_ACCESS_KEY_ID")
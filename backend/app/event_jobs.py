@@ -0,0 +1,31 @@
+"""
+Обслуживание outbox (потребитель делает то же раз в час; задачу можно
+запускать по cron, если потребитель работает не всегда):
+
+    python -m app.event_jobs               # опубликованные старше 24 часов
+    python -m app.event_jobs --hours 6
+"""
+import argparse
+
+from app.database.connection import SessionLocal
+from app.events import outbox
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prune published outbox events")
+    parser.add_argument("--hours", type=int, default=outbox.PUBLISHED_RETENTION_HOURS,
+                        help="возраст опубликованных событий для удаления")
+    parser.add_argument("--chunk", type=int, default=outbox.PRUNE_CHUNK,
+                        help="строк за одну транзакцию")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        pruned = outbox.prune_published(db, args.hours, args.chunk)
+        print(f"outbox: pruned {pruned} published events")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
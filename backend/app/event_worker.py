@@ -0,0 +1,32 @@
+"""
+Воркер доменных событий (шина + outbox):
+
+    python -m app.event_worker
+    python -m app.event_worker --batch-size 500
+
+Можно запустить несколько экземпляров — они делят поток через consumer group.
+"""
+import argparse
+import asyncio
+import signal
+
+from app.events.consumer import BATCH_SIZE, run_consumer
+
+
+async def run(batch_size: int):
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    await run_consumer(stop, batch_size)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Domain event worker")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="событий за одно чтение шины")
+    args = parser.parse_args()
+    asyncio.run(run(args.batch_size))
+
+
+if __name__ == "__main__":
+    main()
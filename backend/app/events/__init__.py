@@ -0,0 +1,48 @@
+"""
+Асинхронная шина доменных событий для побочных эффектов записей.
+
+    from app.events import emit, PostLiked
+    emit(db, background_tasks, PostLiked(post_id=1, user_id=2, delta=1))
+    db.commit()
+
+Подробнее: outbox.py (публикация после коммита), bus.py (Redis Streams /
+in-memory), handlers.py (обработчики), consumer.py (цикл воркера).
+"""
+from app.events.bus import (
+    Delivery,
+    EventBus,
+    InMemoryEventBus,
+    RedisStreamsEventBus,
+    envelope,
+    get_event_bus,
+    set_event_bus,
+)
+from app.events.outbox import emit, relay_outbox
+from app.events.types import (
+    ApplicationDecided,
+    DomainEvent,
+    PostCommented,
+    PostLiked,
+    PostSaved,
+    ProjectCommented,
+    ProjectVoted,
+)
+
+__all__ = [
+    "Delivery",
+    "EventBus",
+    "InMemoryEventBus",
+    "RedisStreamsEventBus",
+    "envelope",
+    "get_event_bus",
+    "set_event_bus",
+    "emit",
+    "relay_outbox",
+    "DomainEvent",
+    "ApplicationDecided",
+    "PostCommented",
+    "PostLiked",
+    "PostSaved",
+    "ProjectCommented",
+    "ProjectVoted",
+]
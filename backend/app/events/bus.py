@@ -0,0 +1,212 @@
+"""
+Шина доменных событий: Redis Streams (по умолчанию) и in-memory (тесты).
+
+Redis Streams: одно событие — одна запись XADD в поток events:domain.
+Потребители читают поток через consumer group (XREADGROUP), обрабатывают
+пачку и подтверждают её XACK. Необработанные записи упавшего потребителя
+перехватываются XAUTOCLAIM после CLAIM_IDLE_MS. Доставка — at-least-once.
+
+У каждого события есть event_id (id строки outbox), одинаковый при всех
+повторных доставках. Шина хранит, какие event_id уже обработал каждый
+обработчик (unprocessed / mark_processed), и dispatch не передаёт
+обработчику событие повторно.
+"""
+import asyncio
+import json
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import defaultdict, deque
+from typing import Deque, Dict, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+from app.core.config import settings
+from app.events.types import DomainEvent, from_record
+from app.utils.logger import get_logger
+from app.utils.redis_client import get_redis
+
+logger = get_logger(__name__)
+
+STREAM = "events:domain"
+GROUP = "backend"
+STREAM_MAX_LEN = 100000
+CLAIM_IDLE_MS = 60000
+PROCESSED_KEY = "events:processed:{handler}"
+PROCESSED_TTL_SECONDS = 24 * 3600  # Сколько помним обработанные event_id
+
+# (event_id, событие) — то, что публикуется
+Envelope = Tuple[str, DomainEvent]
+
+
+class Delivery(NamedTuple):
+    delivery_id: str  # id записи в шине, для ack
+    event_id: str     # стабильный id события, для дедупликации
+    event: DomainEvent
+
+
+def envelope(event: DomainEvent) -> Envelope:
+    """Событие с новым event_id (публикация в обход outbox)."""
+    return uuid.uuid4().hex, event
+
+
+class EventBus(ABC):
+    @abstractmethod
+    async def publish(self, envelopes: Sequence[Envelope]) -> None:
+        ...
+
+    @abstractmethod
+    async def read_batch(self, consumer: str, count: int, block_ms: int) -> List[Delivery]:
+        ...
+
+    @abstractmethod
+    async def ack(self, delivery_ids: Sequence[str]) -> None:
+        ...
+
+    @abstractmethod
+    async def unprocessed(self, handler: str, event_ids: Sequence[str]) -> Set[str]:
+        """event_id из списка, которые обработчик ещё не обработал."""
+
+    @abstractmethod
+    async def mark_processed(self, handler: str, event_ids: Sequence[str]) -> None:
+        ...
+
+
+class InMemoryEventBus(EventBus):
+    """Очередь в памяти процесса: для тестов и локального запуска без Redis."""
+
+    def __init__(self):
+        self._queue: Deque[Delivery] = deque()
+        self._counter = 0
+        self.acked: List[str] = []
+        self.processed: Dict[str, Set[str]] = defaultdict(set)
+
+    async def publish(self, envelopes: Sequence[Envelope]) -> None:
+        for event_id, event in envelopes:
+            self._counter += 1
+            self._queue.append(Delivery(str(self._counter), event_id, event))
+
+    def redeliver(self, deliveries: Sequence[Delivery]) -> None:
+        """Возвращает доставки в очередь (имитация повторной доставки в тестах)."""
+        self._queue.extend(deliveries)
+
+    async def read_batch(self, consumer: str, count: int, block_ms: int) -> List[Delivery]:
+        if not self._queue:
+            await asyncio.sleep(block_ms / 1000)
+        batch = []
+        while self._queue and len(batch) < count:
+            batch.append(self._queue.popleft())
+        return batch
+
+    async def ack(self, delivery_ids: Sequence[str]) -> None:
+        self.acked.extend(delivery_ids)
+
+    async def unprocessed(self, handler: str, event_ids: Sequence[str]) -> Set[str]:
+        return set(event_ids) - self.processed[handler]
+
+    async def mark_processed(self, handler: str, event_ids: Sequence[str]) -> None:
+        self.processed[handler].update(event_ids)
+
+
+class RedisStreamsEventBus(EventBus):
+    def __init__(self, stream: str = STREAM, group: str = GROUP):
+        self.stream = stream
+        self.group = group
+        self._group_ready = False
+
+    async def publish(self, envelopes: Sequence[Envelope]) -> None:
+        if not envelopes:
+            return
+        async with get_redis() as redis:
+            async with redis.pipeline(transaction=False) as pipe:
+                for event_id, event in envelopes:
+                    pipe.xadd(
+                        self.stream,
+                        {"id": event_id, "type": event.name, "payload": json.dumps(event.to_payload())},
+                        maxlen=STREAM_MAX_LEN,
+                        approximate=True
+                    )
+                await pipe.execute()
+
+    async def _ensure_group(self, redis) -> None:
+        if self._group_ready:
+            return
+        try:
+            await redis.xgroup_create(self.stream, self.group, id="0", mkstream=True)
+        except Exception as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+        self._group_ready = True
+
+    async def _decode(self, redis, entries) -> List[Delivery]:
+        deliveries, broken = [], []
+        for entry_id, values in entries:
+            try:
+                event = from_record(values["type"], json.loads(values["payload"]))
+                deliveries.append(Delivery(entry_id, values.get("id", entry_id), event))
+            except (KeyError, TypeError, ValueError) as e:
+                # Повтор не поможет — подтверждаем, чтобы запись не перехватывалась вечно
+                logger.error(f"Dropping malformed event {entry_id}: {e}")
+                broken.append(entry_id)
+        if broken:
+            await redis.xack(self.stream, self.group, *broken)
+        return deliveries
+
+    async def read_batch(self, consumer: str, count: int, block_ms: int) -> List[Delivery]:
+        async with get_redis() as redis:
+            await self._ensure_group(redis)
+            # Сначала забираем зависшие у упавших потребителей записи
+            claimed = await redis.xautoclaim(
+                self.stream, self.group, consumer, CLAIM_IDLE_MS, start_id="0-0", count=count
+            )
+            if claimed and claimed[1]:
+                return await self._decode(redis, claimed[1])
+
+            response = await redis.xreadgroup(
+                self.group, consumer, {self.stream: ">"}, count=count, block=block_ms
+            )
+            deliveries: List[Delivery] = []
+            for _, entries in response or []:
+                deliveries.extend(await self._decode(redis, entries))
+            return deliveries
+
+    async def ack(self, delivery_ids: Sequence[str]) -> None:
+        if not delivery_ids:
+            return
+        async with get_redis() as redis:
+            await redis.xack(self.stream, self.group, *delivery_ids)
+
+    # Обработанные event_id: ZSET на обработчик, score — время обработки
+
+    async def unprocessed(self, handler: str, event_ids: Sequence[str]) -> Set[str]:
+        if not event_ids:
+            return set()
+        async with get_redis() as redis:
+            scores = await redis.zmscore(PROCESSED_KEY.format(handler=handler), list(event_ids))
+        return {event_id for event_id, score in zip(event_ids, scores) if score is None}
+
+    async def mark_processed(self, handler: str, event_ids: Sequence[str]) -> None:
+        if not event_ids:
+            return
+        key = PROCESSED_KEY.format(handler=handler)
+        now = time.time()
+        async with get_redis() as redis:
+            async with redis.pipeline(transaction=False) as pipe:
+                pipe.zadd(key, {event_id: now for event_id in event_ids})
+                pipe.zremrangebyscore(key, "-inf", now - PROCESSED_TTL_SECONDS)
+                await pipe.execute()
+
+
+_bus: Optional[EventBus] = None
+
+
+def get_event_bus() -> EventBus:
+    """Шина процесса; бэкенд задаётся EVENT_BUS_BACKEND (redis | memory)."""
+    global _bus
+    if _bus is None:
+        _bus = InMemoryEventBus() if settings.EVENT_BUS_BACKEND == "memory" else RedisStreamsEventBus()
+    return _bus
+
+
+def set_event_bus(bus: EventBus) -> None:
+    """Подменяет шину (тесты)."""
+    global _bus
+    _bus = bus
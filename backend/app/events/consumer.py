@@ -0,0 +1,66 @@
+"""
+Цикл потребителя: релей outbox + чтение шины пачками + dispatch + ack.
+
+Запускается отдельным процессом (python -m app.event_worker) или внутри
+веб-процесса при EVENT_WORKER_IN_PROCESS=true. Несколько экземпляров
+работают в одной consumer group и делят поток между собой.
+"""
+import asyncio
+import os
+import socket
+import time
+
+from starlette.concurrency import run_in_threadpool
+
+from app.events.bus import get_event_bus
+from app.events.handlers import dispatch
+from app.database.connection import SessionLocal
+from app.events.outbox import PRUNE_INTERVAL_SECONDS, prune_published, relay_outbox
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+BATCH_SIZE = 100
+BLOCK_MS = 1000
+RETRY_DELAY_SECONDS = 2.0
+
+
+def consumer_name() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+def prune_outbox() -> None:
+    db = SessionLocal()
+    try:
+        pruned = prune_published(db)
+        if pruned:
+            logger.info(f"Outbox: pruned {pruned} published events")
+    finally:
+        db.close()
+
+
+async def run_consumer(stop: asyncio.Event, batch_size: int = BATCH_SIZE) -> None:
+    bus = get_event_bus()
+    name = consumer_name()
+    logger.info(f"Event consumer {name} started")
+    next_prune = time.monotonic()
+    while not stop.is_set():
+        try:
+            # Подбираем события, которые не опубликовала фоновая задача запроса
+            await relay_outbox()
+            if time.monotonic() >= next_prune:
+                next_prune = time.monotonic() + PRUNE_INTERVAL_SECONDS
+                await run_in_threadpool(prune_outbox)
+
+            deliveries = await bus.read_batch(name, batch_size, BLOCK_MS)
+            if not deliveries:
+                continue
+            await dispatch(deliveries, bus)
+            await bus.ack([delivery.delivery_id for delivery in deliveries])
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Пачка остаётся в pending и будет перехвачена повторно
+            logger.error(f"Event consumer {name} failed on a batch: {e}")
+            await asyncio.sleep(RETRY_DELAY_SECONDS)
+    logger.info(f"Event consumer {name} stopped")
@@ -0,0 +1,81 @@
+"""
+Обработчики доменных событий. Каждый получает пачку событий своих типов
+(из одного чтения шины), поэтому может агрегировать их перед записью.
+
+Исключение в обработчике оставляет пачку неподтверждённой — она будет
+доставлена повторно. Чтобы повтор не применялся дважды (например, двойной
+счёт в трендах), dispatch запоминает обработанные event_id отдельно для
+каждого обработчика и пропускает их при повторной доставке.
+"""
+from collections import defaultdict
+from typing import Awaitable, Callable, Dict, List, Sequence, Type
+
+from app.events.bus import Delivery, EventBus
+from app.events.types import (
+    ApplicationDecided,
+    DomainEvent,
+    PostCommented,
+    PostLiked,
+    PostSaved,
+    ProjectCommented,
+    ProjectVoted,
+)
+from app.services import trending_service
+from app.services.trending_service import Signal
+from app.services.feed_service import invalidate_user_feeds
+from app.services.notification_stream import publish_created
+
+Handler = Callable[[List[DomainEvent]], Awaitable[None]]
+
+HANDLERS: Dict[str, List[Handler]] = defaultdict(list)
+
+
+def handles(*event_types: Type[DomainEvent]):
+    def decorator(handler: Handler) -> Handler:
+        for event_type in event_types:
+            HANDLERS[event_type.name].append(handler)
+        return handler
+    return decorator
+
+
+async def dispatch(deliveries: Sequence[Delivery], bus: EventBus) -> None:
+    """
+    Раздаёт пачку обработчикам; каждый обработчик вызывается один раз со всеми
+    своими ещё не обработанными им событиями (дубликаты event_id отбрасываются).
+    """
+    batches: Dict[Handler, Dict[str, DomainEvent]] = defaultdict(dict)
+    for delivery in deliveries:
+        for handler in HANDLERS.get(delivery.event.name, ()):
+            batches[handler].setdefault(delivery.event_id, delivery.event)
+    for handler, batch in batches.items():
+        pending = await bus.unprocessed(handler.__name__, list(batch))
+        if not pending:
+            continue
+        await handler([event for event_id, event in batch.items() if event_id in pending])
+        await bus.mark_processed(handler.__name__, list(pending))
+
+
+@handles(PostLiked, PostSaved, PostCommented, ProjectVoted, ProjectCommented)
+async def update_trending(events: List[DomainEvent]) -> None:
+    # Тренды учитывают только положительные сигналы, отмены не вычитаются;
+    # повторный лайк/сохранение/upvote того же пользователя не учитывается
+    signals: List[Signal] = []
+    for event in events:
+        if isinstance(event, PostLiked) and event.delta > 0:
+            signals.append(Signal("post_like", event.post_id, event.user_id))
+        elif isinstance(event, PostSaved) and event.delta > 0:
+            signals.append(Signal("post_save", event.post_id, event.user_id))
+        elif isinstance(event, PostCommented):
+            signals.append(Signal("post_comment", event.post_id, event.user_id))
+        elif isinstance(event, ProjectVoted) and event.upvoted:
+            signals.append(Signal("project_vote", event.project_id, event.user_id))
+        elif isinstance(event, ProjectCommented):
+            signals.append(Signal("project_comment", event.project_id, event.user_id))
+    await trending_service.record_events(signals)
+
+
+@handles(ApplicationDecided)
+async def deliver_application_decisions(events: List[DomainEvent]) -> None:
+    # Лента нового участника теперь включает посты проекта
+    await invalidate_user_feeds({event.user_id for event in events if event.accepted})
+    await publish_created([event.notification_id for event in events])
@@ -0,0 +1,113 @@
+"""
+Transactional outbox: событие пишется в outbox_events в той же транзакции,
+что и изменение данных, и публикуется в шину только после коммита.
+
+    emit(db, background_tasks, PostLiked(...))  # до db.commit()
+
+emit добавляет строку в сессию и ставит relay_outbox фоновой задачей.
+Если публикация не удалась (Redis недоступен, процесс упал), строки
+остаются неопубликованными и их подберёт воркер (app.event_worker).
+id строки outbox становится event_id события в шине.
+
+Опубликованные строки удаляет prune_published: её вызывает потребитель раз
+в PRUNE_INTERVAL_SECONDS и задача app.event_jobs. Они хранятся
+PUBLISHED_RETENTION_HOURS — столько же, сколько шина помнит обработанные
+event_id, — чтобы их можно было посмотреть при разборе проблем.
+"""
+from datetime import datetime, timedelta
+from typing import List, Optional, Sequence
+
+from fastapi import BackgroundTasks
+from sqlalchemy import delete, select, update
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.database.connection import SessionLocal
+from app.events.bus import get_event_bus
+from app.events.types import DomainEvent, from_record
+from app.models.outbox import OutboxEvent
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+RELAY_BATCH = 500
+PUBLISHED_RETENTION_HOURS = 24
+PRUNE_CHUNK = 5000
+PRUNE_INTERVAL_SECONDS = 3600
+
+
+def add_event(db: Session, event: DomainEvent) -> None:
+    db.add(OutboxEvent(event_type=event.name, payload=event.to_payload()))
+
+
+def emit(db: Session, background_tasks: Optional[BackgroundTasks], *events: DomainEvent) -> None:
+    """Записывает события в outbox текущей транзакции и планирует их публикацию."""
+    for event in events:
+        add_event(db, event)
+    if background_tasks is not None:
+        background_tasks.add_task(relay_outbox)
+
+
+def _lock_pending(db: Session, limit: int) -> List[OutboxEvent]:
+    return db.query(OutboxEvent).filter(OutboxEvent.published_at.is_(None))\
+        .order_by(OutboxEvent.id).limit(limit).with_for_update(skip_locked=True).all()
+
+
+def _mark_published(db: Session, ids: Sequence[int]) -> None:
+    db.execute(
+        update(OutboxEvent).where(OutboxEvent.id.in_(ids))
+        .values(published_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+
+
+def prune_published(db: Session, retention_hours: int = PUBLISHED_RETENTION_HOURS, chunk: int = PRUNE_CHUNK) -> int:
+    """
+    Удаляет события, опубликованные раньше retention_hours назад, пачками по
+    chunk с коммитом после каждой. Возвращает количество удалённых строк.
+    """
+    cutoff = datetime.utcnow() - timedelta(hours=retention_hours)
+    total = 0
+    while True:
+        # Старые строки опубликованы первыми: обход по id останавливается быстро
+        ids = select(OutboxEvent.id).where(OutboxEvent.published_at < cutoff)\
+            .order_by(OutboxEvent.id).limit(chunk).scalar_subquery()
+        deleted = db.execute(
+            delete(OutboxEvent).where(OutboxEvent.id.in_(ids)).execution_options(synchronize_session=False)
+        ).rowcount
+        db.commit()
+        total += deleted
+        if deleted < chunk:
+            return total
+
+
+async def relay_outbox(limit: int = RELAY_BATCH) -> int:
+    """
+    Публикует неопубликованные события пачкой. FOR UPDATE SKIP LOCKED позволяет
+    нескольким релеям работать параллельно без двойной публикации одной пачки.
+    Запросы к БД выполняются в пуле потоков, цикл событий не блокируется.
+    """
+    db = SessionLocal()
+    try:
+        rows = await run_in_threadpool(_lock_pending, db, limit)
+        if not rows:
+            await run_in_threadpool(db.rollback)
+            return 0
+
+        envelopes = []
+        for row in rows:
+            try:
+                envelopes.append((str(row.id), from_record(row.event_type, row.payload)))
+            except (KeyError, TypeError) as e:
+                logger.error(f"Outbox event {row.id} ({row.event_type}) cannot be decoded: {e}")
+        await get_event_bus().publish(envelopes)
+
+        await run_in_threadpool(_mark_published, db, [row.id for row in rows])
+        return len(rows)
+    except Exception as e:
+        await run_in_threadpool(db.rollback)
+        logger.warning(f"Outbox relay failed, events stay pending: {e}")
+        return 0
+    finally:
+        await run_in_threadpool(db.close)
@@ -0,0 +1,91 @@
+"""
+Типизированные доменные события.
+
+Событие — неизменяемый dataclass с уникальным именем `name`; в шину и outbox
+оно попадает как (name, payload-словарь) и восстанавливается через from_record.
+"""
+from dataclasses import asdict, dataclass, fields
+from typing import ClassVar, Dict, Type
+
+
+@dataclass(frozen=True)
+class DomainEvent:
+    name: ClassVar[str] = ""
+
+    def to_payload(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_payload(cls, payload: dict) -> "DomainEvent":
+        known = {f.name for f in fields(cls)}
+        return cls(**{key: value for key, value in payload.items() if key in known})
+
+
+EVENT_TYPES: Dict[str, Type[DomainEvent]] = {}
+
+
+def register(cls: Type[DomainEvent]) -> Type[DomainEvent]:
+    if cls.name in EVENT_TYPES:
+        raise ValueError(f"Duplicate event name: {cls.name}")
+    EVENT_TYPES[cls.name] = cls
+    return cls
+
+
+def from_record(name: str, payload: dict) -> DomainEvent:
+    return EVENT_TYPES[name].from_payload(payload)
+
+
+@register
+@dataclass(frozen=True)
+class PostLiked(DomainEvent):
+    name: ClassVar[str] = "post.liked"
+    post_id: int
+    user_id: int
+    delta: int  # +1 лайк, -1 снятие лайка
+
+
+@register
+@dataclass(frozen=True)
+class PostSaved(DomainEvent):
+    name: ClassVar[str] = "post.saved"
+    post_id: int
+    user_id: int
+    delta: int
+
+
+@register
+@dataclass(frozen=True)
+class PostCommented(DomainEvent):
+    name: ClassVar[str] = "post.commented"
+    post_id: int
+    user_id: int
+    comment_id: int
+
+
+@register
+@dataclass(frozen=True)
+class ProjectVoted(DomainEvent):
+    name: ClassVar[str] = "project.voted"
+    project_id: int
+    user_id: int
+    delta: int  # изменение суммы голосов: ±1 или ±2 при смене голоса
+    upvoted: bool = False  # голос стал upvote (новый или смена downvote)
+
+
+@register
+@dataclass(frozen=True)
+class ProjectCommented(DomainEvent):
+    name: ClassVar[str] = "project.commented"
+    project_id: int
+    user_id: int
+    comment_id: int
+
+
+@register
+@dataclass(frozen=True)
+class ApplicationDecided(DomainEvent):
+    name: ClassVar[str] = "project.application_decided"
+    project_id: int
+    user_id: int
+    accepted: bool
+    notification_id: int
@@ -5,8 +5,8 @@ from app.api.v1 import todos, auth, chat_ws, projects, skills, teams, posts, use
 from app.api.v1 import chats # Импортируем новые модули для чата и загрузок
 from app.api.v1 import notifications # Import notifications router
 from app.core.config import settings
-from slowapi import Limiter
-from slowapi.util import get_remote_address
+from slowapi import _rate_limit_exceeded_handler
+from slowapi.errors import RateLimitExceeded
 from app.api.v1 import resume as resumes_v1
 from app.api.v1 import graph as graph_v1 # Импорт нового роутера
 from fastapi.responses import RedirectResponse
@@ -14,6 +14,8 @@ from sqlalchemy.orm import Session
 from app.database.connection import get_db
 from app.utils.auth import handle_google_callback, handle_github_callback, oauth
 from app.models.user import User
+import asyncio
+import time
 import logging
 
 # Configure logging
@@ -42,17 +44,26 @@ def create_app() -> FastAPI:
     # Добавляем SessionMiddleware (обязательно для OAuth)
     app.add_middleware(SessionMiddleware, secret_key=settings.SECRET_KEY)
 
-    # Настройка slowapi для ограничения скорости запросов
-    limiter = Limiter(key_func=get_remote_address)
-    # app.state — это атрибут FastAPI, используемый для хранения данных (не папка)
-    app.state.limiter = limiter
+    # slowapi: лимиты объявлены декораторами @limiter.limit в роутерах;
+    # обработчику 429 нужен тот же экземпляр в app.state
+    app.state.limiter = auth.limiter
+    app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 
-    # Пример глобального middleware для slowapi (добавляет заголовки лимита)
     @app.middleware("http")
     async def add_rate_limit_headers(request, call_next):
+        """
+        Заголовки X-RateLimit-* для эндпоинтов с лимитом. Декоратор slowapi
+        сохраняет сработавший лимит в request.state.view_rate_limit; остаток
+        и время сброса берём из того же хранилища счётчиков.
+        """
         response = await call_next(request)
-        # Можно добавить реальные значения из limiter, например:
-        response.headers["X-RateLimit-Remaining"] = "some_value"
+        view_rate_limit = getattr(request.state, "view_rate_limit", None)
+        if view_rate_limit is not None:
+            limit_item, args = view_rate_limit
+            reset_at, remaining = auth.limiter.limiter.get_window_stats(limit_item, *args)
+            response.headers["X-RateLimit-Limit"] = str(limit_item.amount)
+            response.headers["X-RateLimit-Remaining"] = str(remaining)
+            response.headers["X-RateLimit-Reset"] = str(max(0, int(reset_at - time.time())))
         return response
 
     # Create main API router with /api/v1 prefix
@@ -228,6 +239,21 @@ def create_app() -> FastAPI:
             logger.error(f"Error processing GitHub callback: {e}")
             return RedirectResponse(url=f"{settings.FRONTEND_URL}/login?error=github_callback_error", status_code=status.HTTP_302_FOUND)
 
+    # Потребитель доменных событий (app/events) в фоне веб-процесса
+    if settings.EVENT_WORKER_IN_PROCESS:
+        event_worker = {}
+
+        @app.on_event("startup")
+        async def start_event_consumer():
+            from app.events.consumer import run_consumer
+            event_worker["stop"] = asyncio.Event()
+            event_worker["task"] = asyncio.create_task(run_consumer(event_worker["stop"]))
+
+        @app.on_event("shutdown")
+        async def stop_event_consumer():
+            event_worker["stop"].set()
+            event_worker["task"].cancel()
+
     return app
 
 
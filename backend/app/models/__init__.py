@@ -9,7 +9,7 @@ from .post import Post
 from .tag import Tag
 from .skill_category import SkillCategory  # Import SkillCategory first
 from .skill import Skill  # Then import Skill
-from .chat import Conversation, Message
+from .chat import Conversation, Message, ConversationReadState
 from .request import Request
 from .review import Review
 from .recommendation import Recommendation
@@ -19,12 +19,14 @@ from .save import SavedPost
 from .vote import ProjectVote
 from .blacklisted_token import BlacklistedToken
 from .todo_comment import TodoComment
+from .outbox import OutboxEvent
 
 
 # Import Many-to-Many association tables separately to avoid circular dependencies
 from .relations.associations import (
     conversation_participants,
     post_tags_association,
+    tag_followers,
     project_applications,
     project_members_association,
     project_skills_association,
@@ -53,6 +55,7 @@ __all__ = [
     "Conversation",
     #ConversationParticipant",
     "Message",
+    "ConversationReadState",
     "Post",
     "PostComment",
     "PostLike",
@@ -69,8 +72,10 @@ __all__ = [
     "Team",
     "User",
     "BlacklistedToken",
+    "OutboxEvent",
     "conversation_participants",
     "post_tags_association",
+    "tag_followers",
     "project_applications",
     "project_members_association",
     "project_skills_association",
@@ -1,5 +1,7 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean
+from hashlib import md5
+from typing import Iterable
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean, Index, text
 from sqlalchemy.orm import relationship
 from app.models.base import Base
 from app.models.relations.associations import conversation_participants
@@ -18,6 +20,18 @@ class Conversation(Base):
     type = Column(String, nullable=False, default=ConversationType.DIRECT.value)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # md5 of the sorted participant ids; identifies a direct conversation by its members
+    participant_key = Column(String(32), nullable=True)
+
+    # One direct conversation per participant set
+    __table_args__ = (
+        Index(
+            "uq_conversations_direct_participant_key",
+            "participant_key",
+            unique=True,
+            postgresql_where=text("type = 'direct'")
+        ),
+    )
 
     # Relationships
     participants = relationship(
@@ -34,6 +48,12 @@ class Conversation(Base):
         order_by="Message.timestamp.desc()"
     )
 
+    @staticmethod
+    def make_participant_key(user_ids: Iterable[int]) -> str:
+        """Canonical key of a participant set (matches md5(string_agg(...)) in SQL)"""
+        joined = ",".join(str(user_id) for user_id in sorted(set(user_ids)))
+        return md5(joined.encode()).hexdigest()
+
     @property
     def last_message(self):
         """Return the most recent message in this conversation"""
@@ -62,4 +82,18 @@ class Message(Base):
 
     # Relationships
     conversation = relationship("Conversation", back_populates="messages")
-    sender = relationship("User", back_populates="messages", lazy="joined") 
\ No newline at end of file
+    sender = relationship("User", back_populates="messages", lazy="joined")
+
+    # Keyset pagination of message history walks (conversation_id, id)
+    __table_args__ = (
+        Index("ix_messages_conversation_id_id", "conversation_id", "id"),
+    ) 
+
+class ConversationReadState(Base):
+    """Per-user read watermark: everything up to last_read_message_id is read"""
+    __tablename__ = "conversation_read_states"
+
+    conversation_id = Column(Integer, ForeignKey("conversations.id", ondelete="CASCADE"), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    last_read_message_id = Column(Integer, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
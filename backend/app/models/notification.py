@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
@@ -19,4 +19,24 @@ class Notification(Base):
 
     # Relationships 
     user = relationship("User", back_populates="notifications") 
-    project = relationship("Project") 
\ No newline at end of file
+    project = relationship("Project")
+
+    __table_args__ = (
+        # Cursor pagination of /notifications/me: newest first
+        Index("ix_notifications_user_id_created_at_id", "user_id", created_at.desc(), id.desc()),
+    )
+
+
+class ArchivedNotification(Base):
+    """Old read notifications moved out of the hot table by app.notification_jobs."""
+    __tablename__ = "notifications_archive"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    type = Column(String(50), nullable=False)
+    title = Column(String(255), nullable=False)
+    message = Column(Text, nullable=False)
+    project_id = Column(Integer, nullable=True)
+    created_at = Column(DateTime, nullable=True)
+    read_at = Column(DateTime, nullable=True)
+    archived_at = Column(DateTime, default=datetime.now, nullable=False)
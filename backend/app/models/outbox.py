@@ -0,0 +1,25 @@
+from datetime import datetime
+
+from sqlalchemy import BigInteger, Column, DateTime, Index, String, text
+from sqlalchemy.dialects.postgresql import JSONB
+
+from .base import Base
+
+
+class OutboxEvent(Base):
+    """
+    Доменное событие, записанное в той же транзакции, что и изменение данных.
+    Публикуется в шину после коммита (app.events.outbox.relay_outbox).
+    """
+    __tablename__ = "outbox_events"
+
+    id = Column(BigInteger, primary_key=True)
+    event_type = Column(String(100), nullable=False)
+    payload = Column(JSONB, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    published_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        # Релей выбирает только неопубликованные события
+        Index("ix_outbox_events_unpublished", "id", postgresql_where=text("published_at IS NULL")),
+    )
@@ -10,17 +10,17 @@ class Post(Base):
     title = Column(String, nullable=False)
     content = Column(Text, nullable=False)
     post_type = Column(String, nullable=False)  # "news", "project", "team"
-    author_id = Column(Integer, ForeignKey("users.id"), nullable=True)
-    project_id = Column(Integer, ForeignKey("projects.id"), nullable=True)
-    team_id = Column(Integer, ForeignKey("teams.id"), nullable=True)
+    author_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), nullable=True)
+    team_id = Column(Integer, ForeignKey("teams.id", ondelete="CASCADE"), nullable=True)
 
     author = relationship("User", back_populates="posts")
     project = relationship("Project", back_populates="posts")
     team = relationship("Team", back_populates="posts")
     
     tags = relationship("Tag", secondary=post_tags_association, back_populates="posts")
-    comments = relationship("PostComment", back_populates="post", cascade="all, delete-orphan")  # 🔹 Corrected reference
-    saved_by = relationship("SavedPost", back_populates="post", cascade="all, delete-orphan")
+    comments = relationship("PostComment", back_populates="post", cascade="all, delete-orphan", passive_deletes=True)  # 🔹 Corrected reference
+    saved_by = relationship("SavedPost", back_populates="post", cascade="all, delete-orphan", passive_deletes=True)
 
     def __repr__(self):
         return f"<Post id={self.id} title={self.title} type={self.post_type}>"
@@ -28,12 +28,12 @@ class Project(Base):
     applicants = relationship("User", secondary=project_applications, back_populates="applied_projects")
 
     # ✅ A project can have multiple posts
-    posts = relationship("Post", back_populates="project", cascade="all, delete")
+    posts = relationship("Post", back_populates="project", cascade="all, delete", passive_deletes=True)
     
-    comments = relationship("ProjectComment", back_populates="project", cascade="all, delete-orphan")
+    comments = relationship("ProjectComment", back_populates="project", cascade="all, delete-orphan", passive_deletes=True)
     
     # ✅ Project tasks/todos
-    todos = relationship("Todo", back_populates="project", cascade="all, delete-orphan")
+    todos = relationship("Todo", back_populates="project", cascade="all, delete-orphan", passive_deletes=True)
 
     def __repr__(self):
         return f"<Project id={self.id} name={self.name} owner_id={self.owner_id}>"
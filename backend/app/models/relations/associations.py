@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Boolean, ForeignKey, Table, String, DateTime, func
+from sqlalchemy import Column, Integer, Boolean, ForeignKey, Table, String, DateTime, Index, func
 from app.models.base import Base
 
 # ✅ Many-to-Many: Skills ↔ Skill Categories
@@ -14,8 +14,8 @@ skill_mappings = Table(
 user_teams_association = Table(
     "user_teams",
     Base.metadata,
-    Column("user_id", Integer, ForeignKey("users.id"), primary_key=True),
-    Column("team_id", Integer, ForeignKey("teams.id"), primary_key=True),
+    Column("user_id", Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+    Column("team_id", Integer, ForeignKey("teams.id", ondelete="CASCADE"), primary_key=True),
     Column("is_admin", Boolean, default=False, nullable=False),
     extend_existing=True
 )
@@ -74,6 +74,15 @@ post_tags_association = Table(
     extend_existing=True
 )
 
+# Many-to-Many: User ↔ Tags (followed tags, used by the home feed)
+tag_followers = Table(
+    "tag_followers",
+    Base.metadata,
+    Column("user_id", Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+    Column("tag_id", Integer, ForeignKey("tags.id", ondelete="CASCADE"), primary_key=True, index=True),
+    extend_existing=True
+)
+
 # Many-to-Many: User ↔ Conversations
 conversation_participants = Table(
     "conversation_participants",
@@ -108,5 +117,7 @@ task_assignments = Table(
     Column("todo_id", Integer, ForeignKey("todos.id", ondelete="CASCADE"), primary_key=True),
     Column("user_id", Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
     Column("role", String, default="assignee", primary_key=True),  # 'assignee', 'reviewer', 'watcher'
-    Column("assigned_at", DateTime, default=func.now())
+    Column("assigned_at", DateTime, default=func.now()),
+    # "My todos" filter looks up assignments by user
+    Index("ix_task_assignments_user_id_todo_id", "user_id", "todo_id")
 ) 
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, DateTime, Index, Integer, ForeignKey, UniqueConstraint, func
 from sqlalchemy.orm import relationship
 from .base import Base
 
@@ -8,8 +8,13 @@ class SavedPost(Base):
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     post_id = Column(Integer, ForeignKey("posts.id", ondelete="CASCADE"), nullable=False)
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
 
     post = relationship("Post", back_populates="saved_by")
     user = relationship("User", back_populates="saved_posts")
 
-    __table_args__ = (UniqueConstraint("user_id", "post_id", name="unique_post_save"),)
\ No newline at end of file
+    __table_args__ = (
+        UniqueConstraint("user_id", "post_id", name="unique_post_save"),
+        # Keyset pagination of /users/me/saved-posts by save time
+        Index("ix_saved_posts_user_id_created_at_id", "user_id", "created_at", "id"),
+    )
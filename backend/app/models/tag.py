@@ -1,7 +1,7 @@
 from sqlalchemy import Column, Integer, String, Table, ForeignKey
 from sqlalchemy.orm import relationship
 from .base import Base
-from .relations.associations import project_tags_association, post_tags_association, todo_tags_association
+from .relations.associations import project_tags_association, post_tags_association, todo_tags_association, tag_followers
 
 class Tag(Base):
     __tablename__ = "tags"
@@ -30,5 +30,12 @@ class Tag(Base):
         back_populates="tags"
     )
 
+    # Пользователи, подписанные на тег (лента)
+    followers = relationship(
+        "User",
+        secondary=tag_followers,
+        back_populates="followed_tags"
+    )
+
     def __repr__(self):
         return f"<Tag id={self.id} name={self.name}>"
@@ -13,7 +13,7 @@ class Team(Base):
 
     leader = relationship("User", backref="led_teams")  # Relationship to the leader
     members = relationship("User", secondary=user_teams_association, back_populates="teams")
-    posts = relationship("Post", back_populates="team", cascade="all, delete")
+    posts = relationship("Post", back_populates="team", cascade="all, delete", passive_deletes=True)
 
     def __repr__(self):
         return f"<Team id={self.id} name={self.name}>"
\ No newline at end of file
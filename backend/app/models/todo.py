@@ -1,7 +1,7 @@
 # app/models/todo.py
 
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, Float, DateTime, Enum
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, Float, DateTime, Enum, Index
 from sqlalchemy.orm import relationship
 from .base import Base
 from .relations.associations import todo_tags_association, todo_watchers_association
@@ -42,6 +42,11 @@ class Todo(Base):
     # Project association
     project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), nullable=True)
 
+    __table_args__ = (
+        # Listing of project todos: WHERE project_id = ? ORDER BY created_at DESC
+        Index("ix_todos_project_id_created_at", "project_id", "created_at"),
+    )
+
     # Relationships
     user = relationship("User", back_populates="todos")
     project = relationship("Project", back_populates="todos")
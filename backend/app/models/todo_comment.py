@@ -16,7 +16,7 @@ class TodoComment(Base):
     content = Column(Text, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow())
 
-    author_id = Column(Integer, ForeignKey("users.id"))
+    author_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"))
     todo_id = Column(Integer, ForeignKey("todos.id"))
 
     # Обратные связи
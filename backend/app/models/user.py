@@ -4,7 +4,7 @@ from sqlalchemy import Column, Integer, String, ForeignKey, Table, Text, Date, I
 from sqlalchemy.orm import relationship
 from .base import Base
 from .relations.associations import user_teams_association, project_members_association, project_applications, \
-    user_skills_association, conversation_participants, todo_watchers_association, todo_tags_association
+    user_skills_association, conversation_participants, todo_watchers_association, todo_tags_association, tag_followers
 from sqlalchemy import Column, DateTime
 from datetime import datetime
 # from app import enums as MyEnum
@@ -63,6 +63,7 @@ class User(Base):
     applied_projects = relationship("Project", secondary=project_applications, back_populates="applicants")
     posts = relationship("Post", back_populates="author")
     skills = relationship("Skill", secondary=user_skills_association, back_populates="users")
+    followed_tags = relationship("Tag", secondary=tag_followers, back_populates="followers")
     education = relationship("Education", back_populates="user", cascade="all, delete-orphan")
     experience = relationship("Experience", back_populates="user", cascade="all, delete-orphan")
     conversations = relationship("Conversation", secondary=conversation_participants, back_populates="participants")
@@ -100,7 +101,7 @@ class User(Base):
 class Education(Base):
     __tablename__ = "education"
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"))
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"))
     institution = Column(String(255), nullable=False)
     degree = Column(String(255), nullable=False)
     field_of_study = Column(String(255), nullable=True)
@@ -115,7 +116,7 @@ class Education(Base):
 class Experience(Base):
     __tablename__ = "experience"
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"))
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"))
     company = Column(String(255), nullable=False)
     role = Column(String(255), nullable=False)
     start_year = Column(Date, nullable=False)
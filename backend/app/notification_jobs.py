@@ -0,0 +1,30 @@
+"""
+Архивация уведомлений (запускать по cron, например раз в сутки):
+
+    python -m app.notification_jobs              # прочитанные старше 90 дней
+    python -m app.notification_jobs --days 30
+"""
+import argparse
+
+from app.database.connection import SessionLocal
+from app.services import notification_service
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Archive old read notifications")
+    parser.add_argument("--days", type=int, default=notification_service.RETENTION_DAYS,
+                        help="возраст прочитанных уведомлений для архивации")
+    parser.add_argument("--chunk", type=int, default=notification_service.ARCHIVE_CHUNK,
+                        help="строк за одну транзакцию")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        moved = notification_service.archive_read_notifications(db, args.days, args.chunk)
+        print(f"notifications: archived {moved} rows")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
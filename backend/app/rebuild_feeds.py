@@ -0,0 +1,37 @@
+"""
+Пересборка персональных лент в Redis из БД.
+
+    python -m app.rebuild_feeds              # все пользователи
+    python -m app.rebuild_feeds --user-id 42 # один пользователь
+"""
+import argparse
+import asyncio
+
+from app.database.connection import SessionLocal
+from app.models.user import User
+from app.services.feed_service import rebuild_user_feed
+from app.utils.redis_client import get_redis
+
+
+async def rebuild(user_ids=None):
+    db = SessionLocal()
+    try:
+        if not user_ids:
+            user_ids = [user_id for (user_id,) in db.query(User.id).order_by(User.id).all()]
+        async with get_redis() as redis:
+            for user_id in user_ids:
+                sources, count = await rebuild_user_feed(db, user_id, redis)
+                print(f"user {user_id}: {count} posts, {len(sources)} sources")
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild home feeds")
+    parser.add_argument("--user-id", type=int, action="append", help="можно указать несколько раз")
+    args = parser.parse_args()
+    asyncio.run(rebuild(args.user_id))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
-from pydantic import BaseModel
+from datetime import datetime
+from pydantic import BaseModel, Field
 from typing import Optional, List, Dict
 
 class PostBase(BaseModel):
@@ -27,4 +28,22 @@ class PostOut(BaseModel):
     saves_count: int = 0
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+class SavedPostOut(PostOut):
+    save_id: int  # Курсор для следующей страницы (?before=save_id)
+    saved_at: datetime
+
+
+class PostHydrateRequest(BaseModel):
+    post_ids: List[int] = Field(..., max_length=200)
+    use_cache: bool = True
+
+class PostHydratedOut(PostOut):
+    is_liked: bool = False
+    is_saved: bool = False
+
+class PostHydrateResponse(BaseModel):
+    items: List[PostHydratedOut]
+    missing: List[int] = []
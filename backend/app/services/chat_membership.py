@@ -0,0 +1,181 @@
+"""
+Кэш участников чатов: conversation_id -> frozenset(user_id).
+
+Проверка доступа к чату (WebSocket и REST) больше не загружает Conversation
+со всеми участниками и сообщениями. Порядок поиска:
+  1. локальный кэш процесса (LRU с коротким TTL);
+  2. Redis-множество chat:members:{conversation_id} (общий для всех воркеров);
+  3. один SELECT по conversation_participants.
+
+При изменении состава участников нужно вызвать invalidate() или prime(),
+при выходе пользователя из чатов или удалении аккаунта — remove_user().
+Локальный TTL ограничивает устаревание в остальных воркерах.
+"""
+import time
+from collections import OrderedDict
+from typing import FrozenSet, Iterable, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.database.connection import SessionLocal
+from app.models.relations.associations import conversation_participants
+from app.utils.logger import get_logger
+from app.utils.redis_client import get_redis
+
+logger = get_logger(__name__)
+
+REDIS_KEY_PREFIX = "chat:members:"
+
+
+class ConversationMembershipCache:
+    """Двухуровневый кэш участников чатов (память процесса + Redis)."""
+
+    def __init__(self, local_ttl: float = 30.0, redis_ttl: int = 3600, max_entries: int = 10000):
+        self.local_ttl = local_ttl
+        self.redis_ttl = redis_ttl
+        self.max_entries = max_entries
+        # conversation_id -> (expires_at, members)
+        self._local: "OrderedDict[int, Tuple[float, FrozenSet[int]]]" = OrderedDict()
+
+    # ---------------------- Локальный уровень ----------------------
+
+    def get_local(self, conversation_id: int) -> Optional[FrozenSet[int]]:
+        """Возвращает участников из памяти процесса или None, если записи нет/истекла."""
+        entry = self._local.get(conversation_id)
+        if entry is None:
+            return None
+        expires_at, members = entry
+        if expires_at < time.monotonic():
+            del self._local[conversation_id]
+            return None
+        self._local.move_to_end(conversation_id)
+        return members
+
+    def _store_local(self, conversation_id: int, members: FrozenSet[int]) -> None:
+        self._local[conversation_id] = (time.monotonic() + self.local_ttl, members)
+        self._local.move_to_end(conversation_id)
+        while len(self._local) > self.max_entries:
+            self._local.popitem(last=False)
+
+    # ---------------------- Redis ----------------------
+
+    async def _get_redis_members(self, conversation_id: int) -> Optional[FrozenSet[int]]:
+        try:
+            async with get_redis() as redis:
+                raw = await redis.smembers(f"{REDIS_KEY_PREFIX}{conversation_id}")
+        except Exception as e:
+            logger.warning(f"Membership cache: Redis read failed for C:{conversation_id}: {e}")
+            return None
+        if not raw:
+            return None
+        return frozenset(int(user_id) for user_id in raw)
+
+    async def _store_redis(self, conversation_id: int, members: FrozenSet[int]) -> None:
+        key = f"{REDIS_KEY_PREFIX}{conversation_id}"
+        try:
+            async with get_redis() as redis:
+                async with redis.pipeline(transaction=True) as pipe:
+                    pipe.delete(key)
+                    pipe.sadd(key, *members)
+                    pipe.expire(key, self.redis_ttl)
+                    await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Membership cache: Redis write failed for C:{conversation_id}: {e}")
+
+    # ---------------------- Публичный API ----------------------
+
+    @staticmethod
+    def load_members(db: Session, conversation_id: int) -> FrozenSet[int]:
+        """Читает участников чата одним запросом к таблице связей."""
+        rows = db.execute(
+            select(conversation_participants.c.user_id)
+            .where(conversation_participants.c.conversation_id == conversation_id)
+        ).scalars().all()
+        return frozenset(rows)
+
+    @classmethod
+    def _load_members_own_session(cls, conversation_id: int) -> FrozenSet[int]:
+        """Читает участников в собственной короткой сессии (для WebSocket)."""
+        db = SessionLocal()
+        try:
+            return cls.load_members(db, conversation_id)
+        finally:
+            db.close()
+
+    @staticmethod
+    def conversation_ids_of(db: Session, user_id: int) -> List[int]:
+        """Чаты, в которых состоит пользователь (для remove_user)."""
+        return list(db.execute(
+            select(conversation_participants.c.conversation_id)
+            .where(conversation_participants.c.user_id == user_id)
+        ).scalars().all())
+
+    async def get_members(self, db: Optional[Session], conversation_id: int) -> FrozenSet[int]:
+        """
+        Возвращает участников чата, заполняя кэши при промахе.
+        Без db (WebSocket) промах читается в отдельной сессии в пуле потоков,
+        чтобы соединение с БД не удерживалось на время жизни сокета.
+        """
+        members = self.get_local(conversation_id)
+        if members is not None:
+            return members
+
+        members = await self._get_redis_members(conversation_id)
+        if members is None:
+            if db is None:
+                members = await run_in_threadpool(self._load_members_own_session, conversation_id)
+            else:
+                members = self.load_members(db, conversation_id)
+            if not members:
+                # Несуществующие/пустые чаты не кэшируем
+                return members
+            await self._store_redis(conversation_id, members)
+
+        self._store_local(conversation_id, members)
+        return members
+
+    async def is_member(self, db: Optional[Session], conversation_id: int, user_id: int) -> bool:
+        """Проверяет, состоит ли пользователь в чате."""
+        return user_id in await self.get_members(db, conversation_id)
+
+    async def prime(self, conversation_id: int, user_ids: Iterable[int]) -> None:
+        """Записывает актуальный состав участников (после создания/изменения чата)."""
+        members = frozenset(user_ids)
+        self._store_local(conversation_id, members)
+        if members:
+            await self._store_redis(conversation_id, members)
+
+    async def invalidate(self, conversation_id: int) -> None:
+        """Сбрасывает запись о чате в памяти процесса и в Redis."""
+        self._local.pop(conversation_id, None)
+        try:
+            async with get_redis() as redis:
+                await redis.delete(f"{REDIS_KEY_PREFIX}{conversation_id}")
+        except Exception as e:
+            logger.warning(f"Membership cache: Redis invalidate failed for C:{conversation_id}: {e}")
+
+    async def remove_user(self, user_id: int, conversation_ids: Iterable[int]) -> None:
+        """
+        Убирает пользователя из закэшированных составов чатов
+        (выход из чата, удаление аккаунта). Идентификаторы чатов нужно
+        собрать через conversation_ids_of() до удаления строк связей.
+        """
+        conversation_ids = list(conversation_ids)
+        if not conversation_ids:
+            return
+        for conversation_id in conversation_ids:
+            self._local.pop(conversation_id, None)
+        try:
+            async with get_redis() as redis:
+                async with redis.pipeline(transaction=True) as pipe:
+                    for conversation_id in conversation_ids:
+                        pipe.srem(f"{REDIS_KEY_PREFIX}{conversation_id}", user_id)
+                    await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Membership cache: Redis eviction failed for U:{user_id}: {e}")
+
+
+# Единственный экземпляр на процесс
+membership_cache = ConversationMembershipCache()
@@ -0,0 +1,190 @@
+"""
+Массовое удаление постов и аккаунтов без загрузки связанных строк в сессию.
+
+Зависимые строки (лайки, комментарии, сохранения, уведомления, участие в
+командах и проектах...) удаляются на уровне БД через ON DELETE CASCADE,
+а messages.sender_id и todo_comments.author_id обнуляет ON DELETE SET NULL,
+поэтому удаление поста или пользователя — один DELETE ... WHERE id = :id.
+
+Если у пользователя слишком много зависимых строк, один каскадный DELETE
+держал бы блокировки на время всего запроса. Тогда аккаунт сразу
+обезличивается (email/username/пароль/google_id), чтобы им нельзя было войти,
+а строки удаляются фоновой задачей пачками по CHUNK_SIZE с коммитом после
+каждой пачки; сам пользователь удаляется последним.
+
+Функции, меняющие или удаляющие посты, возвращают их id: вызывающий код
+сбрасывает по ним кэш payload (post:payload:{id}), иначе /posts/hydrate
+ещё PAYLOAD_TTL_SECONDS отдавал бы удалённые посты и данные удалённых авторов.
+"""
+from typing import Dict, List, Tuple
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.orm import Session
+
+from app.database.connection import SessionLocal
+from app.models.chat import Message
+from app.models.comment import PostComment, ProjectComment
+from app.models.like import PostLike
+from app.models.notification import Notification
+from app.models.post import Post
+from app.models.project import Project
+from app.models.save import SavedPost
+from app.models.team import Team
+from app.models.user import User
+from app.models.vote import ProjectVote
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+CHUNK_SIZE = 2000             # Строк на один DELETE в фоне
+BACKGROUND_THRESHOLD = 10000  # Начиная с этого числа зависимых строк удаление уходит в фон
+
+# Самые объёмные таблицы с владельцем user_id; остальное снимет каскад
+USER_ROW_TABLES = (PostLike, SavedPost, PostComment, ProjectComment, ProjectVote, Notification)
+
+
+def delete_in_chunks(db: Session, model, condition, chunk_size: int = CHUNK_SIZE) -> int:
+    """
+    DELETE ... WHERE id IN (SELECT id ... LIMIT chunk_size) в цикле,
+    с коммитом после каждой пачки. Возвращает количество удалённых строк.
+    """
+    total = 0
+    while True:
+        ids = select(model.id).where(condition).limit(chunk_size).scalar_subquery()
+        deleted = db.execute(
+            delete(model).where(model.id.in_(ids)).execution_options(synchronize_session=False)
+        ).rowcount
+        db.commit()
+        total += deleted
+        if deleted < chunk_size:
+            return total
+
+
+# ---------------------- Посты ----------------------
+
+def delete_post(db: Session, post_id: int) -> bool:
+    """Удаляет пост; лайки, комментарии, сохранения и теги снимает каскад в БД."""
+    deleted = db.execute(
+        delete(Post).where(Post.id == post_id).execution_options(synchronize_session=False)
+    ).rowcount
+    db.commit()
+    return bool(deleted)
+
+
+def _delete_posts(db: Session, condition) -> List[int]:
+    """DELETE ... RETURNING id: посты, которые иначе снял бы каскад без следа."""
+    return list(db.execute(
+        delete(Post).where(condition).returning(Post.id).execution_options(synchronize_session=False)
+    ).scalars())
+
+
+def delete_project(db: Session, project: Project) -> List[int]:
+    """Удаляет проект вместе с его постами. Возвращает id удалённых постов."""
+    post_ids = _delete_posts(db, Post.project_id == project.id)
+    db.delete(project)
+    db.commit()
+    return post_ids
+
+
+def delete_team(db: Session, team: Team) -> List[int]:
+    """Удаляет команду вместе с её постами. Возвращает id удалённых постов."""
+    post_ids = _delete_posts(db, Post.team_id == team.id)
+    db.delete(team)
+    db.commit()
+    return post_ids
+
+
+# ---------------------- Пользователи ----------------------
+
+def count_user_rows(db: Session, user_id: int) -> Dict[str, int]:
+    counts = {}
+    for model in USER_ROW_TABLES:
+        counts[model.__tablename__] = db.execute(
+            select(func.count()).select_from(model).where(model.user_id == user_id)
+        ).scalar_one()
+    # Сообщения не удаляются, но SET NULL по каждому тоже держит блокировки
+    counts[Message.__tablename__] = db.execute(
+        select(func.count()).select_from(Message).where(Message.sender_id == user_id)
+    ).scalar_one()
+    return counts
+
+
+def _detach_user(db: Session, user_id: int) -> List[int]:
+    """
+    Ссылки, которые ORM раньше обнуляла при удалении пользователя:
+    посты и проекты остаются, но без автора/владельца.
+    Возвращает id постов, потерявших автора.
+    """
+    post_ids = list(db.execute(
+        update(Post).where(Post.author_id == user_id).values(author_id=None)
+        .returning(Post.id).execution_options(synchronize_session=False)
+    ).scalars())
+    db.execute(
+        update(Project).where(Project.owner_id == user_id).values(owner_id=None)
+        .execution_options(synchronize_session=False)
+    )
+    return post_ids
+
+
+def _delete_user_row(db: Session, user_id: int) -> None:
+    db.execute(delete(User).where(User.id == user_id).execution_options(synchronize_session=False))
+
+
+def _anonymize_user(db: Session, user_id: int) -> None:
+    """Отключает вход до завершения фоновой очистки и освобождает email/username."""
+    db.execute(
+        update(User).where(User.id == user_id).values(
+            email=f"deleted-{user_id}@deleted.invalid",
+            username=f"deleted-{user_id}",
+            hashed_password=None,
+            google_id=None,
+            google_refresh_token=None,
+            status="deleted",
+        ).execution_options(synchronize_session=False)
+    )
+
+
+def delete_user(db: Session, user_id: int) -> Tuple[bool, int, List[int]]:
+    """
+    Удаляет аккаунт. Возвращает (deferred, rows, post_ids): deferred=True, если
+    зависимых строк больше BACKGROUND_THRESHOLD и нужно вызвать purge_user в фоне;
+    post_ids — посты пользователя, оставшиеся без автора.
+    """
+    rows = sum(count_user_rows(db, user_id).values())
+    post_ids = _detach_user(db, user_id)
+    if rows > BACKGROUND_THRESHOLD:
+        _anonymize_user(db, user_id)
+        db.commit()
+        return True, rows, post_ids
+
+    _delete_user_row(db, user_id)
+    db.commit()
+    return False, rows, post_ids
+
+
+def purge_user(user_id: int) -> None:
+    """
+    Фоновая задача: удаляет строки пользователя пачками, затем самого пользователя.
+    Открывает собственную сессию, т.к. выполняется после ответа клиенту.
+    """
+    db = SessionLocal()
+    try:
+        purged: List[str] = []
+        for model in USER_ROW_TABLES:
+            count = delete_in_chunks(db, model, model.user_id == user_id)
+            purged.append(f"{model.__tablename__}={count}")
+        # Сообщения не удаляются: sender_id обнуляет ON DELETE SET NULL, но тоже пачками
+        while db.execute(
+            update(Message).where(
+                Message.id.in_(select(Message.id).where(Message.sender_id == user_id).limit(CHUNK_SIZE).scalar_subquery())
+            ).values(sender_id=None).execution_options(synchronize_session=False)
+        ).rowcount:
+            db.commit()
+        _delete_user_row(db, user_id)
+        db.commit()
+        logger.info(f"User {user_id} purged: {', '.join(purged)}")
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Purge of user {user_id} failed: {e}")
+    finally:
+        db.close()
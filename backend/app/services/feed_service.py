@@ -0,0 +1,326 @@
+"""
+Персональная лента: посты из моих проектов, команд и подписанных тегов.
+
+Хранение (Redis):
+  feed:user:{user_id}            ZSET post_id -> post_id (id монотонно растёт)
+  feed:sources:{user_id}         SET источников пользователя ("project:1"), живёт вместе с лентой
+  feed:source:{kind}:{source_id} ZSET последних постов источника (project/team/tag)
+  feed:pull_sources              SET источников с огромной аудиторией ("project:1")
+
+Запись (fan-out-on-write): после create_post пост добавляется в ленты всех
+участников проекта/команды и подписчиков тегов — но только в уже прогретые
+ленты (холодные соберутся из БД при первом чтении). Если аудитория источника
+больше HIGH_FANOUT_THRESHOLD, источник помечается как pull: его посты не
+рассылаются, а подмешиваются при чтении из feed:source:*.
+
+Чтение: ZREVRANGEBYSCORE по ленте + pull-источники + один пакетный hydrate.
+Источники пользователя кэшируются рядом с лентой, так что прогретое чтение
+не обращается к БД. Если при пересборке в ленту попали все посты (меньше
+FEED_MAX_LEN), в ZSET пишется маркер COMPLETE, и короткая страница означает
+конец ленты; без маркера (кэш обрезан) хвост дочитывается из БД.
+Запросы к БД выполняются в пуле потоков.
+При недоступности Redis лента собирается напрямую из БД.
+"""
+from typing import Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import or_, select, union
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.database.connection import SessionLocal
+from app.models.post import Post
+from app.models.project import Project
+from app.models.relations.associations import (
+    post_tags_association,
+    project_members_association,
+    tag_followers,
+    user_teams_association,
+)
+from app.utils.logger import get_logger
+from app.utils.redis_client import get_redis
+
+logger = get_logger(__name__)
+
+FEED_KEY = "feed:user:{user_id}"
+SOURCES_KEY = "feed:sources:{user_id}"
+SOURCE_KEY = "feed:source:{kind}:{source_id}"
+PULL_SOURCES_KEY = "feed:pull_sources"
+
+FEED_MAX_LEN = 500            # Сколько id держим в ленте пользователя
+SOURCE_MAX_LEN = 200          # Сколько id держим в ленте источника
+FEED_TTL_SECONDS = 3 * 24 * 3600  # Неактивные ленты истекают и пересобираются
+HIGH_FANOUT_THRESHOLD = 2000  # Аудитория, начиная с которой источник читается pull-моделью
+FANOUT_CHUNK = 500            # Ключей на один вызов Lua-скрипта
+
+# Сторож пустой ленты: отличает "лента пуста" от "лента не прогрета"
+SENTINEL = "0"
+# Маркер "в ленте все посты пользователя": score -1, т.е. ниже всех постов и
+# сторожа, поэтому обрезка FANOUT_LUA удаляет его первым, как только лента
+# достигает FEED_MAX_LEN и перестаёт быть полной
+COMPLETE = "complete"
+
+# Добавляет пост только в существующие ленты и обрезает их до лимита
+FANOUT_LUA = """
+local added = 0
+for i, key in ipairs(KEYS) do
+    if redis.call('EXISTS', key) == 1 then
+        redis.call('ZADD', key, ARGV[1], ARGV[1])
+        redis.call('ZREMRANGEBYRANK', key, 0, -(tonumber(ARGV[2]) + 1))
+        added = added + 1
+    end
+end
+return added
+"""
+
+Source = Tuple[str, int]
+
+
+def feed_key(user_id: int) -> str:
+    return FEED_KEY.format(user_id=user_id)
+
+
+def sources_key(user_id: int) -> str:
+    return SOURCES_KEY.format(user_id=user_id)
+
+
+def source_key(source: Source) -> str:
+    return SOURCE_KEY.format(kind=source[0], source_id=source[1])
+
+
+def source_name(source: Source) -> str:
+    return f"{source[0]}:{source[1]}"
+
+
+def parse_source(name: str) -> Source:
+    kind, source_id = name.split(":", 1)
+    return kind, int(source_id)
+
+
+# ---------------------- Запросы к БД ----------------------
+
+def post_sources(db: Session, post: Post) -> List[Source]:
+    sources: List[Source] = []
+    if post.project_id:
+        sources.append(("project", post.project_id))
+    if post.team_id:
+        sources.append(("team", post.team_id))
+    tag_ids = db.execute(
+        select(post_tags_association.c.tag_id).where(post_tags_association.c.post_id == post.id)
+    ).scalars().all()
+    sources.extend(("tag", tag_id) for tag_id in tag_ids)
+    return sources
+
+
+def source_audience(db: Session, source: Source) -> Set[int]:
+    """Пользователи, в ленту которых попадают посты источника."""
+    kind, source_id = source
+    if kind == "project":
+        stmt = union(
+            select(project_members_association.c.user_id)
+            .where(project_members_association.c.project_id == source_id),
+            select(Project.owner_id).where(Project.id == source_id, Project.owner_id.isnot(None)),
+        )
+    elif kind == "team":
+        stmt = select(user_teams_association.c.user_id).where(user_teams_association.c.team_id == source_id)
+    else:
+        stmt = select(tag_followers.c.user_id).where(tag_followers.c.tag_id == source_id)
+    return set(db.execute(stmt).scalars().all())
+
+
+def user_sources(db: Session, user_id: int) -> List[Source]:
+    """Проекты (участник или владелец), команды и теги, на которые подписан пользователь."""
+    project_ids = db.execute(union(
+        select(project_members_association.c.project_id)
+        .where(project_members_association.c.user_id == user_id),
+        select(Project.id).where(Project.owner_id == user_id),
+    )).scalars().all()
+    team_ids = db.execute(
+        select(user_teams_association.c.team_id).where(user_teams_association.c.user_id == user_id)
+    ).scalars().all()
+    tag_ids = db.execute(
+        select(tag_followers.c.tag_id).where(tag_followers.c.user_id == user_id)
+    ).scalars().all()
+    return (
+        [("project", i) for i in project_ids]
+        + [("team", i) for i in team_ids]
+        + [("tag", i) for i in tag_ids]
+    )
+
+
+def load_timeline_from_db(
+    db: Session,
+    user_id: int,
+    limit: int,
+    before_id: Optional[int] = None,
+    sources: Optional[List[Source]] = None,
+) -> List[int]:
+    """Pull-модель целиком из БД: используется для прогрева и как запасной путь."""
+    if sources is None:
+        sources = user_sources(db, user_id)
+    project_ids = [i for kind, i in sources if kind == "project"]
+    team_ids = [i for kind, i in sources if kind == "team"]
+    tag_ids = [i for kind, i in sources if kind == "tag"]
+
+    conditions = [Post.author_id == user_id]
+    if project_ids:
+        conditions.append(Post.project_id.in_(project_ids))
+    if team_ids:
+        conditions.append(Post.team_id.in_(team_ids))
+    if tag_ids:
+        conditions.append(Post.id.in_(
+            select(post_tags_association.c.post_id).where(post_tags_association.c.tag_id.in_(tag_ids))
+        ))
+
+    query = db.query(Post.id).filter(or_(*conditions))
+    if before_id is not None:
+        query = query.filter(Post.id < before_id)
+    return [post_id for (post_id,) in query.order_by(Post.id.desc()).limit(limit).all()]
+
+
+# ---------------------- Запись ----------------------
+
+async def fan_out_post(post_id: int) -> None:
+    """
+    Фоновая задача после create_post: раскладывает пост по лентам.
+    Открывает собственную сессию, т.к. выполняется после ответа клиенту.
+    """
+    db = SessionLocal()
+    try:
+        post = db.query(Post).filter(Post.id == post_id).first()
+        if not post:
+            return
+        sources = post_sources(db, post)
+
+        audience: Set[int] = {post.author_id} if post.author_id else set()
+        pull_sources: List[Source] = []
+        for source in sources:
+            members = source_audience(db, source)
+            if len(members) > HIGH_FANOUT_THRESHOLD:
+                pull_sources.append(source)
+            else:
+                audience |= members
+    finally:
+        db.close()
+
+    try:
+        async with get_redis() as redis:
+            async with redis.pipeline(transaction=False) as pipe:
+                for source in sources:
+                    key = source_key(source)
+                    pipe.zadd(key, {str(post_id): post_id})
+                    pipe.zremrangebyrank(key, 0, -(SOURCE_MAX_LEN + 1))
+                if pull_sources:
+                    pipe.sadd(PULL_SOURCES_KEY, *[source_name(s) for s in pull_sources])
+                await pipe.execute()
+
+            script = redis.register_script(FANOUT_LUA)
+            keys = [feed_key(user_id) for user_id in audience]
+            delivered = 0
+            for i in range(0, len(keys), FANOUT_CHUNK):
+                delivered += await script(keys=keys[i:i + FANOUT_CHUNK], args=[post_id, FEED_MAX_LEN])
+        logger.info(f"Feed fan-out: post {post_id} -> {delivered} warm feeds, {len(pull_sources)} pull sources")
+    except Exception as e:
+        # Ленты восстановятся из БД при следующем прогреве
+        logger.warning(f"Feed fan-out failed for post {post_id}: {e}")
+
+
+def load_feed_snapshot(db: Session, user_id: int) -> Tuple[List[Source], List[int]]:
+    """Источники пользователя и последние FEED_MAX_LEN постов ленты."""
+    sources = user_sources(db, user_id)
+    return sources, load_timeline_from_db(db, user_id, FEED_MAX_LEN, sources=sources)
+
+
+async def rebuild_user_feed(db: Session, user_id: int, redis=None) -> Tuple[List[Source], int]:
+    """Пересобирает ленту и список источников пользователя из БД. Возвращает (источники, количество постов)."""
+    sources, post_ids = await run_in_threadpool(load_feed_snapshot, db, user_id)
+    mapping = {str(post_id): post_id for post_id in post_ids}
+    mapping[SENTINEL] = 0
+    if len(post_ids) < FEED_MAX_LEN:
+        mapping[COMPLETE] = -1
+    source_names = [source_name(source) for source in sources] + [SENTINEL]
+
+    async def write(client):
+        key = feed_key(user_id)
+        key_sources = sources_key(user_id)
+        async with client.pipeline(transaction=True) as pipe:
+            pipe.delete(key, key_sources)
+            pipe.zadd(key, mapping)
+            pipe.sadd(key_sources, *source_names)
+            pipe.expire(key, FEED_TTL_SECONDS)
+            pipe.expire(key_sources, FEED_TTL_SECONDS)
+            await pipe.execute()
+
+    if redis is not None:
+        await write(redis)
+    else:
+        async with get_redis() as client:
+            await write(client)
+    return sources, len(post_ids)
+
+
+async def invalidate_user_feeds(user_ids: Iterable[int]) -> None:
+    """Сбрасывает ленты и списки источников (смена членства/подписок); пересоберутся при чтении."""
+    keys = [key for user_id in user_ids for key in (feed_key(user_id), sources_key(user_id))]
+    if not keys:
+        return
+    try:
+        async with get_redis() as redis:
+            await redis.delete(*keys)
+    except Exception as e:
+        logger.warning(f"Feed invalidation failed for {len(keys)} users: {e}")
+
+
+# ---------------------- Чтение ----------------------
+
+async def read_feed_ids(db: Session, user_id: int, limit: int, before_id: Optional[int] = None) -> List[int]:
+    """Возвращает до limit id постов ленты (по убыванию), строго меньше before_id."""
+    max_score = f"({before_id}" if before_id is not None else "+inf"
+    try:
+        async with get_redis() as redis:
+            key = feed_key(user_id)
+            key_sources = sources_key(user_id)
+            async with redis.pipeline(transaction=False) as pipe:
+                pipe.exists(key)
+                pipe.smembers(key_sources)
+                pipe.zscore(key, COMPLETE)
+                feed_exists, cached_sources, complete_score = await pipe.execute()
+            if not feed_exists or not cached_sources:
+                sources, count = await rebuild_user_feed(db, user_id, redis)
+                complete = count < FEED_MAX_LEN
+            else:
+                sources = [parse_source(name) for name in cached_sources if name != SENTINEL]
+                complete = complete_score is not None
+
+            pushed = await redis.zrevrangebyscore(key, max_score, f"({SENTINEL}", start=0, num=limit)
+            async with redis.pipeline(transaction=False) as pipe:
+                pipe.expire(key, FEED_TTL_SECONDS)
+                pipe.expire(key_sources, FEED_TTL_SECONDS)
+                await pipe.execute()
+
+            # Подмешиваем посты pull-источников пользователя
+            pulled: List[str] = []
+            if sources:
+                async with redis.pipeline(transaction=False) as pipe:
+                    for source in sources:
+                        pipe.sismember(PULL_SOURCES_KEY, source_name(source))
+                    flags = await pipe.execute()
+                pull = [source for source, flag in zip(sources, flags) if flag]
+                if pull:
+                    async with redis.pipeline(transaction=False) as pipe:
+                        for source in pull:
+                            pipe.zrevrangebyscore(source_key(source), max_score, "-inf", start=0, num=limit)
+                        for ids in await pipe.execute():
+                            pulled.extend(ids)
+    except Exception as e:
+        logger.warning(f"Feed read from Redis failed for user {user_id}, using DB: {e}")
+        return await run_in_threadpool(load_timeline_from_db, db, user_id, limit, before_id)
+
+    post_ids = sorted({int(i) for i in pushed} | {int(i) for i in pulled}, reverse=True)[:limit]
+
+    # Обрезанный кэш хранит только последние FEED_MAX_LEN постов — глубже дочитываем из БД
+    if len(post_ids) < limit and not complete:
+        floor = post_ids[-1] if post_ids else before_id
+        post_ids.extend(await run_in_threadpool(
+            load_timeline_from_db, db, user_id, limit - len(post_ids), floor, sources
+        ))
+    return post_ids
@@ -0,0 +1,101 @@
+"""
+Уведомления: счётчик непрочитанных, массовые операции и архивация.
+
+Счётчик непрочитанных кэшируется в Redis (notifications:unread:{user_id})
+по схеме cache-aside: при промахе считается одним COUNT по индексу
+(user_id, created_at, id), любое изменение (новое уведомление, прочтение)
+просто удаляет ключ. При недоступности Redis счётчик читается из БД.
+
+Архивация (app.notification_jobs) переносит прочитанные уведомления старше
+RETENTION_DAYS в notifications_archive пачками: DELETE ... RETURNING и
+INSERT в одном выражении, без загрузки строк в приложение.
+"""
+from datetime import datetime, timedelta
+from typing import Iterable
+
+from sqlalchemy import func, text, update
+from sqlalchemy.orm import Session
+
+from app.models.notification import Notification
+from app.utils.logger import get_logger
+from app.utils.redis_client import get_redis
+
+logger = get_logger(__name__)
+
+UNREAD_KEY = "notifications:unread:{user_id}"
+UNREAD_TTL_SECONDS = 300  # Ограничивает устаревание, если инвалидация не дошла
+RETENTION_DAYS = 90
+ARCHIVE_CHUNK = 5000
+
+ARCHIVE_SQL = text("""
+    WITH moved AS (
+        DELETE FROM notifications
+        WHERE id IN (
+            SELECT id FROM notifications
+            WHERE read = true AND created_at < :cutoff
+            LIMIT :chunk
+        )
+        RETURNING id, user_id, type, title, message, project_id, created_at, read_at
+    )
+    INSERT INTO notifications_archive (id, user_id, type, title, message, project_id, created_at, read_at)
+    SELECT id, user_id, type, title, message, project_id, created_at, read_at FROM moved
+""")
+
+
+def unread_key(user_id: int) -> str:
+    return UNREAD_KEY.format(user_id=user_id)
+
+
+def count_unread(db: Session, user_id: int) -> int:
+    return db.query(func.count(Notification.id)).filter(
+        Notification.user_id == user_id, Notification.read == False
+    ).scalar()
+
+
+async def get_unread_count(db: Session, user_id: int) -> int:
+    try:
+        async with get_redis() as redis:
+            cached = await redis.get(unread_key(user_id))
+            if cached is not None:
+                return int(cached)
+            count = count_unread(db, user_id)
+            await redis.setex(unread_key(user_id), UNREAD_TTL_SECONDS, count)
+            return count
+    except Exception as e:
+        logger.warning(f"Unread counter cache unavailable for user {user_id}: {e}")
+        return count_unread(db, user_id)
+
+
+async def invalidate_unread(user_ids: Iterable[int]) -> None:
+    keys = [unread_key(user_id) for user_id in user_ids]
+    if not keys:
+        return
+    try:
+        async with get_redis() as redis:
+            await redis.delete(*keys)
+    except Exception as e:
+        logger.warning(f"Unread counter invalidation failed for {len(keys)} users: {e}")
+
+
+def mark_all_read(db: Session, user_id: int) -> int:
+    """Один UPDATE ... WHERE user_id = ? AND read = false; возвращает число строк."""
+    result = db.execute(
+        update(Notification)
+        .where(Notification.user_id == user_id, Notification.read == False)
+        .values(read=True, read_at=datetime.now())
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return result.rowcount
+
+
+def archive_read_notifications(db: Session, retention_days: int = RETENTION_DAYS, chunk: int = ARCHIVE_CHUNK) -> int:
+    """Переносит прочитанные уведомления старше retention_days в архив; коммит после каждой пачки."""
+    cutoff = datetime.now() - timedelta(days=retention_days)
+    total = 0
+    while True:
+        moved = db.execute(ARCHIVE_SQL, {"cutoff": cutoff, "chunk": chunk}).rowcount
+        db.commit()
+        total += moved
+        if moved < chunk:
+            return total
@@ -0,0 +1,159 @@
+"""
+Доставка уведомлений в реальном времени (SSE /notifications/stream).
+
+После коммита Notification фоновая задача publish_created публикует его в
+канал Redis notifications:user:{user_id}. Каждый процесс держит ровно одно
+pub/sub-соединение (PSUBSCRIBE notifications:user:*) и раскладывает сообщения
+по локальным очередям открытых SSE-потоков пользователя — число соединений
+с Redis не растёт с числом клиентов.
+
+Id события SSE = id уведомления. Клиент, переподключившийся с Last-Event-ID,
+сначала получает из БД всё, что было создано после этого id, затем живой поток.
+Медленный клиент, чья очередь переполнилась, отключается и догоняет так же.
+
+EventSource не умеет передавать заголовки, а JWT в query string оседает в
+логах прокси. Поэтому браузер сначала получает одноразовый тикет
+(POST /notifications/stream-ticket, живёт TICKET_TTL_SECONDS) и открывает
+поток с ним; при каждом переподключении запрашивается новый тикет.
+"""
+import asyncio
+import json
+import secrets
+from collections import defaultdict
+from typing import Dict, List, Optional, Set
+
+from app.database.connection import SessionLocal
+from app.models.notification import Notification
+from app.schemas.notification import NotificationOut
+from app.services.notification_service import invalidate_unread
+from app.utils.logger import get_logger
+from app.utils.redis_client import get_redis
+
+logger = get_logger(__name__)
+
+CHANNEL = "notifications:user:{user_id}"
+CHANNEL_PATTERN = "notifications:user:*"
+QUEUE_SIZE = 100
+REPLAY_LIMIT = 200
+RECONNECT_DELAY_SECONDS = 1.0
+TICKET_KEY = "notifications:ticket:{ticket}"
+TICKET_TTL_SECONDS = 60
+
+# Положено в очередь вместо события: поток должен закрыться (клиент переподключится)
+OVERFLOW = None
+
+
+async def issue_stream_ticket(user_id: int) -> str:
+    """Одноразовый тикет на открытие SSE-потока пользователя."""
+    ticket = secrets.token_urlsafe(32)
+    async with get_redis() as redis:
+        await redis.set(TICKET_KEY.format(ticket=ticket), user_id, ex=TICKET_TTL_SECONDS)
+    return ticket
+
+
+async def redeem_stream_ticket(ticket: str) -> Optional[int]:
+    """user_id тикета; GETDEL гарантирует, что тикет сработает только один раз."""
+    async with get_redis() as redis:
+        user_id = await redis.getdel(TICKET_KEY.format(ticket=ticket))
+    return int(user_id) if user_id is not None else None
+
+
+def serialize(notification: Notification) -> dict:
+    return json.loads(NotificationOut.model_validate(notification).model_dump_json())
+
+
+async def publish_created(notification_ids: List[int]) -> None:
+    """
+    Фоновая задача после коммита: рассылает новые уведомления и сбрасывает
+    счётчики непрочитанных. Открывает собственную сессию.
+    """
+    if not notification_ids:
+        return
+    db = SessionLocal()
+    try:
+        notifications = db.query(Notification).filter(Notification.id.in_(notification_ids)).all()
+        payloads = [(n.user_id, serialize(n)) for n in notifications]
+    finally:
+        db.close()
+
+    await invalidate_unread({user_id for user_id, _ in payloads})
+    try:
+        async with get_redis() as redis:
+            async with redis.pipeline(transaction=False) as pipe:
+                for user_id, payload in payloads:
+                    pipe.publish(CHANNEL.format(user_id=user_id), json.dumps(payload))
+                await pipe.execute()
+    except Exception as e:
+        # Клиенты получат уведомления при переподключении (Last-Event-ID) или из /notifications/me
+        logger.warning(f"Notification publish failed for {notification_ids}: {e}")
+
+
+def load_missed(user_id: int, last_event_id: int) -> List[dict]:
+    """Уведомления пользователя с id > last_event_id, от старых к новым."""
+    db = SessionLocal()
+    try:
+        notifications = db.query(Notification).filter(
+            Notification.user_id == user_id, Notification.id > last_event_id
+        ).order_by(Notification.id).limit(REPLAY_LIMIT).all()
+        return [serialize(n) for n in notifications]
+    finally:
+        db.close()
+
+
+class NotificationHub:
+    """Одна pub/sub-подписка на процесс и локальные очереди SSE-потоков."""
+
+    def __init__(self):
+        self._queues: Dict[int, Set[asyncio.Queue]] = defaultdict(set)
+        self._listener: Optional[asyncio.Task] = None
+
+    def subscribe(self, user_id: int) -> asyncio.Queue:
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen())
+        queue: asyncio.Queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        self._queues[user_id].add(queue)
+        return queue
+
+    def unsubscribe(self, user_id: int, queue: asyncio.Queue) -> None:
+        queues = self._queues.get(user_id)
+        if queues is None:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self._queues[user_id]
+
+    def _dispatch(self, user_id: int, payload: dict) -> None:
+        for queue in list(self._queues.get(user_id, ())):
+            try:
+                queue.put_nowait(payload)
+            except asyncio.QueueFull:
+                # Освобождаем место под сигнал закрытия; пропущенное клиент дочитает по Last-Event-ID
+                queue.get_nowait()
+                queue.put_nowait(OVERFLOW)
+                self.unsubscribe(user_id, queue)
+
+    async def _listen(self) -> None:
+        while self._queues:
+            try:
+                async with get_redis() as redis:
+                    pubsub = redis.pubsub()
+                    await pubsub.psubscribe(CHANNEL_PATTERN)
+                    try:
+                        async for message in pubsub.listen():
+                            if message["type"] != "pmessage":
+                                continue
+                            user_id = int(message["channel"].rsplit(":", 1)[1])
+                            self._dispatch(user_id, json.loads(message["data"]))
+                            if not self._queues:
+                                break
+                    finally:
+                        await pubsub.punsubscribe(CHANNEL_PATTERN)
+                        await pubsub.aclose()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Notification pub/sub listener failed, reconnecting: {e}")
+                await asyncio.sleep(RECONNECT_DELAY_SECONDS)
+
+
+notification_hub = NotificationHub()
@@ -0,0 +1,215 @@
+"""
+Пакетная сборка PostOut по списку id.
+
+Количество запросов фиксировано и не зависит от размера пачки:
+посты + авторы + теги (selectinload), по одному GROUP BY на каждый счётчик
+и по одному запросу на флаги like/save текущего пользователя.
+
+Неизменяемая часть поста (текст, автор, теги) может кэшироваться в Redis
+(post:payload:{id}); счётчики и флаги всегда читаются из БД.
+
+Async-функции выполняют запросы к БД в пуле потоков (run_in_threadpool),
+в цикле событий остаются только обращения к Redis.
+"""
+import json
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session, selectinload
+from starlette.concurrency import run_in_threadpool
+
+from app.models.comment import PostComment
+from app.models.like import PostLike
+from app.models.post import Post
+from app.models.save import SavedPost
+from app.schemas.post import PostHydratedOut, PostOut
+from app.utils.logger import get_logger
+from app.utils.redis_client import get_redis
+
+logger = get_logger(__name__)
+
+PAYLOAD_KEY = "post:payload:{post_id}"
+PAYLOAD_TTL_SECONDS = 600
+
+
+def count_by_post(db: Session, model, post_ids: Sequence[int]) -> Dict[int, int]:
+    """Один GROUP BY post_id для таблицы лайков/комментариев/сохранений."""
+    if not post_ids:
+        return {}
+    rows = db.query(model.post_id, func.count(model.id)).filter(
+        model.post_id.in_(post_ids)
+    ).group_by(model.post_id).all()
+    return {post_id: count for post_id, count in rows}
+
+
+def post_payload(post: Post) -> dict:
+    """Неизменяемая часть PostOut (без счётчиков)."""
+    return {
+        "id": post.id,
+        "title": post.title,
+        "content": post.content,
+        "post_type": post.post_type,
+        "author_id": post.author_id,
+        "project_id": post.project_id,
+        "team_id": post.team_id,
+        "tags": [tag.name for tag in post.tags],
+        "author": {
+            "username": post.author.username if post.author else "Unknown",
+            "avatar_url": post.author.avatar_url if post.author else None,
+            "id": str(post.author.id) if post.author else None
+        },
+    }
+
+
+def build_post_out(post: Post, likes_count: int, comments_count: int, saves_count: int) -> PostOut:
+    return PostOut(
+        **post_payload(post),
+        likes_count=likes_count,
+        comments_count=comments_count,
+        saves_count=saves_count
+    )
+
+
+def load_payloads(db: Session, post_ids: Sequence[int]) -> Dict[int, dict]:
+    if not post_ids:
+        return {}
+    posts = db.query(Post).options(
+        selectinload(Post.author),
+        selectinload(Post.tags)
+    ).filter(Post.id.in_(post_ids)).all()
+    return {post.id: post_payload(post) for post in posts}
+
+
+def hydrate_posts(db: Session, post_ids: Sequence[int]) -> List[PostOut]:
+    """
+    Возвращает PostOut в порядке post_ids; отсутствующие (удалённые) посты пропускаются.
+    """
+    post_ids = list(dict.fromkeys(post_ids))
+    if not post_ids:
+        return []
+
+    payloads = load_payloads(db, post_ids)
+    likes = count_by_post(db, PostLike, post_ids)
+    comments = count_by_post(db, PostComment, post_ids)
+    saves = count_by_post(db, SavedPost, post_ids)
+
+    return [
+        PostOut(
+            **payloads[post_id],
+            likes_count=likes.get(post_id, 0),
+            comments_count=comments.get(post_id, 0),
+            saves_count=saves.get(post_id, 0)
+        )
+        for post_id in post_ids
+        if post_id in payloads
+    ]
+
+
+# ---------------------- Кэш payload ----------------------
+
+async def get_payloads(db: Session, post_ids: Sequence[int], use_cache: bool = True) -> Dict[int, dict]:
+    """payload'ы постов: MGET из Redis, промахи — одним запросом из БД с записью в кэш."""
+    if not use_cache:
+        return await run_in_threadpool(load_payloads, db, post_ids)
+
+    keys = [PAYLOAD_KEY.format(post_id=post_id) for post_id in post_ids]
+    try:
+        async with get_redis() as redis:
+            cached = await redis.mget(keys)
+    except Exception as e:
+        logger.warning(f"Post payload cache unavailable, reading from DB: {e}")
+        return await run_in_threadpool(load_payloads, db, post_ids)
+
+    payloads = {
+        post_id: json.loads(raw)
+        for post_id, raw in zip(post_ids, cached)
+        if raw is not None
+    }
+    misses = [post_id for post_id in post_ids if post_id not in payloads]
+    if not misses:
+        return payloads
+
+    loaded = await run_in_threadpool(load_payloads, db, misses)
+    if loaded:
+        try:
+            async with get_redis() as redis:
+                async with redis.pipeline(transaction=False) as pipe:
+                    for post_id, payload in loaded.items():
+                        pipe.setex(PAYLOAD_KEY.format(post_id=post_id), PAYLOAD_TTL_SECONDS, json.dumps(payload))
+                    await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Post payload cache write failed: {e}")
+    payloads.update(loaded)
+    return payloads
+
+
+async def invalidate_post_payloads(post_ids: Sequence[int]) -> None:
+    if not post_ids:
+        return
+    try:
+        async with get_redis() as redis:
+            await redis.delete(*(PAYLOAD_KEY.format(post_id=post_id) for post_id in post_ids))
+    except Exception as e:
+        logger.warning(f"Post payload invalidation failed for {len(post_ids)} posts: {e}")
+
+
+async def invalidate_post_payload(post_id: int) -> None:
+    await invalidate_post_payloads([post_id])
+
+
+def viewer_flags(db: Session, user_id: int, post_ids: Sequence[int]) -> Tuple[Set[int], Set[int]]:
+    """Посты из post_ids, которые пользователь лайкнул и сохранил."""
+    liked = {post_id for (post_id,) in db.query(PostLike.post_id).filter(
+        PostLike.user_id == user_id, PostLike.post_id.in_(post_ids)
+    ).all()}
+    saved = {post_id for (post_id,) in db.query(SavedPost.post_id).filter(
+        SavedPost.user_id == user_id, SavedPost.post_id.in_(post_ids)
+    ).all()}
+    return liked, saved
+
+
+def load_counters(
+    db: Session,
+    post_ids: Sequence[int],
+    viewer_id: Optional[int]
+) -> Tuple[Dict[int, int], Dict[int, int], Dict[int, int], Set[int], Set[int]]:
+    """Счётчики лайков/комментариев/сохранений и флаги viewer_id одним вызовом в пуле потоков."""
+    likes = count_by_post(db, PostLike, post_ids)
+    comments = count_by_post(db, PostComment, post_ids)
+    saves = count_by_post(db, SavedPost, post_ids)
+    liked, saved = viewer_flags(db, viewer_id, post_ids) if viewer_id and post_ids else (set(), set())
+    return likes, comments, saves, liked, saved
+
+
+async def hydrate_posts_for_viewer(
+    db: Session,
+    post_ids: Sequence[int],
+    viewer_id: Optional[int],
+    use_cache: bool = True
+) -> Tuple[List[PostHydratedOut], List[int]]:
+    """
+    Посты со счётчиками и флагами is_liked/is_saved для viewer_id.
+    Возвращает (посты в порядке post_ids, id отсутствующих постов).
+    """
+    post_ids = list(dict.fromkeys(post_ids))
+    if not post_ids:
+        return [], []
+
+    payloads = await get_payloads(db, post_ids, use_cache)
+    found = [post_id for post_id in post_ids if post_id in payloads]
+    missing = [post_id for post_id in post_ids if post_id not in payloads]
+
+    likes, comments, saves, liked, saved = await run_in_threadpool(load_counters, db, found, viewer_id)
+
+    items = [
+        PostHydratedOut(
+            **payloads[post_id],
+            likes_count=likes.get(post_id, 0),
+            comments_count=comments.get(post_id, 0),
+            saves_count=saves.get(post_id, 0),
+            is_liked=post_id in liked,
+            is_saved=post_id in saved
+        )
+        for post_id in found
+    ]
+    return items, missing
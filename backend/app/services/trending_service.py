@@ -0,0 +1,253 @@
+"""
+Трендовые посты и проекты с экспоненциальным затуханием.
+
+Используется forward decay: событие с весом w в момент t добавляет к счёту
+w * 2 ** ((t - epoch) / HALF_LIFE). Новые события весят больше старых, а
+порядок в ZSET совпадает с порядком "затухших" счётов, поэтому топ-N — это
+обычный ZREVRANGE за O(log n + N), без пересчёта по всей истории.
+
+Учитываются только положительные сигналы (новый лайк, сохранение, upvote,
+комментарий). Отмены не вычитаются: вклад лайка в момент t_like равен
+w * 2 ** ((t_like - epoch) / HALF_LIFE), а вычитание в момент now дало бы
+больший по модулю вклад и отрицательный итог. Время исходного события не
+хранится, поэтому отменённый сигнал просто затухает вместе с остальными;
+точные счёты восстанавливает rebuild из БД.
+
+Лайк, сохранение и голос — переключатели, поэтому каждая тройка
+(событие, сущность, пользователь) учитывается один раз: RECORD_LUA делает
+SADD в trending:seen:... и добавляет вес, только если пользователь там
+ещё не был. Иначе цикл "лайк -> снятие -> лайк" накручивал бы счёт.
+Комментарии учитываются каждый.
+
+Чтобы множитель не переполнился, периодическая задача (app.trending_jobs)
+делает rebase: умножает все счёты на 2 ** (-(now - epoch) / HALF_LIFE)
+через ZUNIONSTORE WEIGHTS и сдвигает epoch на now.
+
+Чтение epoch + ZINCRBY и rebase выполняются Lua-скриптами, т.е. атомарно
+относительно друг друга: инкремент не может быть посчитан по старому epoch
+и записан уже после rebase.
+
+Ключи Redis:
+  trending:{kind}        ZSET entity_id -> score (kind = post | project)
+  trending:{kind}:epoch  unix-время начала отсчёта
+  trending:seen:{event}:{entity_id}  SET user_id, уже учтённых для сущности
+"""
+import time
+from typing import Dict, List, NamedTuple, Optional
+
+from sqlalchemy import case, func
+from sqlalchemy.orm import Session
+
+from app.models.comment import PostComment, ProjectComment
+from app.models.like import PostLike
+from app.models.save import SavedPost
+from app.models.vote import ProjectVote
+from app.utils.logger import get_logger
+from app.utils.redis_client import get_redis
+
+logger = get_logger(__name__)
+
+HALF_LIFE_SECONDS = 24 * 3600      # Вклад события уменьшается вдвое за сутки
+REBASE_AFTER_SECONDS = 14 * 24 * 3600  # Множитель 2**14 — далеко от переполнения
+MAX_ENTRIES = 5000                 # Хвост с наименьшими счётами обрезается при rebase
+SEEN_TTL_SECONDS = 7 * 24 * 3600   # За неделю вклад сигнала затухает в 128 раз
+
+# Веса событий
+WEIGHTS: Dict[str, float] = {
+    "post_like": 1.0,
+    "post_save": 1.5,
+    "post_comment": 2.0,
+    "project_vote": 1.0,  # только upvote (новый или смена downvote на upvote)
+    "project_comment": 2.0,
+}
+
+EVENT_KIND = {
+    "post_like": "post",
+    "post_save": "post",
+    "post_comment": "post",
+    "project_vote": "project",
+    "project_comment": "project",
+}
+
+
+# События-переключатели: учитываются один раз на пользователя
+ONCE_PER_USER = {"post_like", "post_save", "project_vote"}
+
+
+class Signal(NamedTuple):
+    """Положительный сигнал для трендов; user_id — для учёта один раз на пользователя."""
+    event: str
+    entity_id: int
+    user_id: Optional[int] = None
+
+
+def trending_key(kind: str) -> str:
+    return f"trending:{kind}"
+
+
+def epoch_key(kind: str) -> str:
+    return f"trending:{kind}:epoch"
+
+
+def seen_key(event: str, entity_id: int) -> str:
+    return f"trending:seen:{event}:{entity_id}"
+
+
+# KEYS: пары trending:{kind}, trending:{kind}:epoch
+# ARGV: now, HALF_LIFE, SEEN_TTL, затем для каждой пары ключей: n и n четвёрок
+# (entity_id, вес, ключ seen или "", user_id)
+# SETNX: первый писатель фиксирует epoch, остальные читают его.
+# Одна пачка событий — один вызов, т.е. она применяется целиком или никак.
+RECORD_LUA = """
+local now = tonumber(ARGV[1])
+local half_life = tonumber(ARGV[2])
+local seen_ttl = tonumber(ARGV[3])
+local a = 4
+for k = 1, #KEYS, 2 do
+    redis.call('SETNX', KEYS[k + 1], ARGV[1])
+    local factor = 2 ^ ((now - tonumber(redis.call('GET', KEYS[k + 1]))) / half_life)
+    local n = tonumber(ARGV[a])
+    a = a + 1
+    for i = 1, n do
+        local counted = 1
+        if ARGV[a + 2] ~= '' then
+            counted = redis.call('SADD', ARGV[a + 2], ARGV[a + 3])
+            redis.call('EXPIRE', ARGV[a + 2], seen_ttl)
+        end
+        if counted == 1 then
+            redis.call('ZINCRBY', KEYS[k], tonumber(ARGV[a + 1]) * factor, ARGV[a])
+        end
+        a = a + 4
+    end
+end
+return a
+"""
+
+# KEYS: trending:{kind}, trending:{kind}:epoch
+# ARGV: now, HALF_LIFE, REBASE_AFTER_SECONDS (или 0 при force), MAX_ENTRIES
+# Возвращает сдвиг epoch в секундах или false, если rebase не нужен
+REBASE_LUA = """
+local raw_epoch = redis.call('GET', KEYS[2])
+if not raw_epoch then
+    return false
+end
+local now = tonumber(ARGV[1])
+local age = now - tonumber(raw_epoch)
+if age < tonumber(ARGV[3]) then
+    return false
+end
+redis.call('ZUNIONSTORE', KEYS[1], 1, KEYS[1], 'WEIGHTS', 2 ^ (-age / tonumber(ARGV[2])))
+redis.call('SET', KEYS[2], ARGV[1])
+redis.call('ZREMRANGEBYRANK', KEYS[1], 0, -(tonumber(ARGV[4]) + 1))
+return tostring(age)
+"""
+
+
+async def _record(redis, signals: List[Signal]) -> None:
+    """Один вызов RECORD_LUA на всю пачку."""
+    by_kind: Dict[str, List] = {}
+    for signal in signals:
+        once = signal.event in ONCE_PER_USER and signal.user_id is not None
+        by_kind.setdefault(EVENT_KIND[signal.event], []).extend([
+            str(signal.entity_id),
+            WEIGHTS[signal.event],
+            seen_key(signal.event, signal.entity_id) if once else "",
+            str(signal.user_id) if once else "",
+        ])
+    if not by_kind:
+        return
+    keys, args = [], [time.time(), HALF_LIFE_SECONDS, SEEN_TTL_SECONDS]
+    for kind, quads in by_kind.items():
+        keys.extend([trending_key(kind), epoch_key(kind)])
+        args.extend([len(quads) // 4, *quads])
+    await redis.register_script(RECORD_LUA)(keys=keys, args=args)
+
+
+async def record_event(event: str, entity_id: int, user_id: Optional[int] = None) -> None:
+    """
+    Учитывает положительный сигнал (лайк, голос, комментарий...) в трендах.
+    Ошибки Redis только логируются.
+    """
+    try:
+        async with get_redis() as redis:
+            await _record(redis, [Signal(event, entity_id, user_id)])
+    except Exception as e:
+        logger.warning(f"Trending event {event} for {entity_id} not recorded: {e}")
+
+
+async def record_events(signals: List[Signal]) -> None:
+    """Пакетный вариант record_event для обработчика шины событий."""
+    if not signals:
+        return
+    async with get_redis() as redis:
+        await _record(redis, signals)
+
+
+async def top_ids(kind: str, limit: int) -> List[int]:
+    """Топ-N id по затухшему счёту; пустой список, если Redis недоступен."""
+    try:
+        async with get_redis() as redis:
+            ids = await redis.zrevrangebyscore(trending_key(kind), "+inf", "(0", start=0, num=limit)
+    except Exception as e:
+        logger.warning(f"Trending read for {kind} failed: {e}")
+        return []
+    return [int(i) for i in ids]
+
+
+async def remove_entity(kind: str, entity_id: int) -> None:
+    try:
+        async with get_redis() as redis:
+            await redis.zrem(trending_key(kind), str(entity_id))
+    except Exception as e:
+        logger.warning(f"Trending removal of {kind} {entity_id} failed: {e}")
+
+
+# ---------------------- Периодические задачи ----------------------
+
+async def rebase(kind: str, force: bool = False) -> bool:
+    """Переводит счёты к новому epoch = now. Возвращает True, если rebase выполнен."""
+    async with get_redis() as redis:
+        script = redis.register_script(REBASE_LUA)
+        shifted = await script(
+            keys=[trending_key(kind), epoch_key(kind)],
+            args=[time.time(), HALF_LIFE_SECONDS, 0 if force else REBASE_AFTER_SECONDS, MAX_ENTRIES],
+        )
+    if shifted is None:
+        return False
+    logger.info(f"Trending {kind}: rebased epoch by {round(float(shifted) / 3600, 1)}h")
+    return True
+
+
+def _initial_scores(db: Session, kind: str) -> Dict[int, float]:
+    """Стартовые счёты из накопленных лайков/голосов/комментариев (без времени событий)."""
+    scores: Dict[int, float] = {}
+    if kind == "post":
+        sources = [
+            (PostLike.post_id, func.count(PostLike.id), "post_like"),
+            (SavedPost.post_id, func.count(SavedPost.id), "post_save"),
+            (PostComment.post_id, func.count(PostComment.id), "post_comment"),
+        ]
+    else:
+        sources = [
+            (ProjectVote.project_id, func.sum(case((ProjectVote.is_upvote, 1), else_=0)), "project_vote"),
+            (ProjectComment.project_id, func.count(ProjectComment.id), "project_comment"),
+        ]
+    for id_column, aggregate, event in sources:
+        for entity_id, value in db.query(id_column, aggregate).group_by(id_column).all():
+            scores[entity_id] = scores.get(entity_id, 0.0) + WEIGHTS[event] * float(value or 0)
+    return scores
+
+
+async def rebuild(db: Session, kind: str) -> int:
+    """Пересчитывает ZSET из БД с epoch = now (все исторические события — как свежие)."""
+    scores = {str(entity_id): score for entity_id, score in _initial_scores(db, kind).items() if score > 0}
+    async with get_redis() as redis:
+        key = trending_key(kind)
+        async with redis.pipeline(transaction=True) as pipe:
+            pipe.delete(key)
+            if scores:
+                pipe.zadd(key, scores)
+            pipe.set(epoch_key(kind), time.time())
+            pipe.zremrangebyrank(key, 0, -(MAX_ENTRIES + 1))
+            await pipe.execute()
+    return len(scores)
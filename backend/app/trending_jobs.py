@@ -0,0 +1,41 @@
+"""
+Обслуживание трендов (запускать по cron, например раз в час):
+
+    python -m app.trending_jobs            # rebase счётов, если epoch устарел
+    python -m app.trending_jobs --rebuild  # пересчитать тренды из БД с нуля
+"""
+import argparse
+import asyncio
+
+from app.database.connection import SessionLocal
+from app.services import trending_service
+
+KINDS = ("post", "project")
+
+
+async def run(rebuild: bool, force: bool):
+    if rebuild:
+        db = SessionLocal()
+        try:
+            for kind in KINDS:
+                count = await trending_service.rebuild(db, kind)
+                print(f"{kind}: rebuilt {count} entries")
+        finally:
+            db.close()
+        return
+
+    for kind in KINDS:
+        done = await trending_service.rebase(kind, force=force)
+        print(f"{kind}: {'rebased' if done else 'rebase not needed'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Trending scores maintenance")
+    parser.add_argument("--rebuild", action="store_true", help="пересчитать счёты из БД")
+    parser.add_argument("--force", action="store_true", help="rebase независимо от возраста epoch")
+    args = parser.parse_args()
+    asyncio.run(run(args.rebuild, args.force))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,8 @@
 from typing import Any, AsyncGenerator
 
-import aioredis
-from aioredis import Redis
 from fastapi import HTTPException
+from redis.asyncio import ConnectionPool, Redis
+from redis.exceptions import RedisError
 
 from app.core.config import settings
 from contextlib import asynccontextmanager
@@ -12,7 +12,9 @@ from app.utils.logger import get_logger
 logger = get_logger()
 
 # Создаем пул подключений
-redis_pool = aioredis.ConnectionPool.from_url(
+# redis.asyncio вместо aioredis: aioredis 2.x не импортируется на Python 3.11
+# и не поддерживает XAUTOCLAIM, нужный шине событий
+redis_pool = ConnectionPool.from_url(
     settings.REDIS_URL,
     decode_responses=True,
     max_connections=20  # 🔹 Ограничиваем число подключений
@@ -25,9 +27,9 @@ async def get_redis() -> AsyncGenerator[Redis, Any]:
     Автоматически возвращает соединение в пул.
     """
     try:
-        async with aioredis.Redis(connection_pool=redis_pool) as redis:
+        async with Redis(connection_pool=redis_pool) as redis:
             yield redis
-    except aioredis.RedisError as e:
+    except RedisError as e:
         logger.error(f"Ошибка Redis: {e}")
         raise HTTPException(500, "Ошибка подключения к Redis")
 
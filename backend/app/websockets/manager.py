@@ -1,13 +1,192 @@
 # connectin-backend/app/websockets/manager.py
+import asyncio
 import logging
-from typing import Dict, Set, List, Optional, Any
+from typing import Dict, Set, List, Optional, Any, Tuple
 from datetime import datetime, timezone
 from fastapi import WebSocket
 from collections import defaultdict
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from starlette.concurrency import run_in_threadpool
 import json
 
+from app.database.connection import SessionLocal
+from app.models.chat import ConversationReadState, Message
+
 logger = logging.getLogger(__name__)
 
+# Интервал (сек.), за который события typing/read склеиваются в один фрейм
+COALESCE_TICK_SECONDS = 0.25
+
+
+def filter_read_watermarks(watermarks: Dict[Tuple[int, int], int]) -> Dict[Tuple[int, int], int]:
+    """
+    Оставляет только водяные знаки, чьи message_id принадлежат своему чату.
+    Иначе клиент мог бы сдвинуть свой водяной знак на произвольный id.
+    Одна выборка на тик.
+    """
+    if not watermarks:
+        return {}
+    db = SessionLocal()
+    try:
+        rows = db.execute(
+            select(Message.id, Message.conversation_id)
+            .where(Message.id.in_(set(watermarks.values())))
+        ).all()
+    finally:
+        db.close()
+    owner = {message_id: conversation_id for message_id, conversation_id in rows}
+    return {
+        (conversation_id, user_id): message_id
+        for (conversation_id, user_id), message_id in watermarks.items()
+        if owner.get(message_id) == conversation_id
+    }
+
+
+def persist_read_watermarks(watermarks: Dict[Tuple[int, int], int]) -> None:
+    """
+    Сохраняет водяные знаки прочтения одним UPSERT'ом.
+    watermarks: {(conversation_id, user_id): max_message_id}
+    Значение в БД только растёт (GREATEST), поэтому порядок флашей не важен.
+    """
+    if not watermarks:
+        return
+    rows = [
+        {"conversation_id": conversation_id, "user_id": user_id, "last_read_message_id": message_id}
+        for (conversation_id, user_id), message_id in watermarks.items()
+    ]
+    stmt = pg_insert(ConversationReadState.__table__).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["conversation_id", "user_id"],
+        set_={
+            "last_read_message_id": func.greatest(
+                ConversationReadState.__table__.c.last_read_message_id,
+                stmt.excluded.last_read_message_id
+            ),
+            "updated_at": func.now(),
+        },
+    )
+    db = SessionLocal()
+    try:
+        db.execute(stmt)
+        db.commit()
+    finally:
+        db.close()
+
+
+class EventCoalescer:
+    """
+    Склеивает события typing/read по чатам в один фрейм за тик.
+    - typing: для каждого пользователя остаётся последнее состояние; повтор
+      уже разосланного состояния не отправляется (debounce);
+    - read: для каждого пользователя остаётся максимальный message_id;
+      id, не принадлежащие чату, отбрасываются (validate).
+    Каждый получатель получает фрейм без собственных событий.
+    Фоновая задача флаша запускается по первому событию и завершается,
+    когда очередь пуста.
+
+    От manager нужны get_online_users_in_conversation() и send_to_user().
+    """
+    def __init__(
+        self,
+        manager: "ConnectionManager",
+        tick: float = COALESCE_TICK_SECONDS,
+        persist=persist_read_watermarks,
+        validate=filter_read_watermarks,
+    ):
+        self.manager = manager
+        self.tick = tick
+        self.persist = persist
+        self.validate = validate
+        # conversation_id -> {user_id: (username, is_typing)}
+        self.pending_typing: Dict[int, Dict[int, Tuple[str, bool]]] = defaultdict(dict)
+        # conversation_id -> {user_id: max_message_id}
+        self.pending_reads: Dict[int, Dict[int, int]] = defaultdict(dict)
+        # Последнее разосланное состояние typing: (conversation_id, user_id) -> is_typing
+        self.sent_typing: Dict[Tuple[int, int], bool] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def add_typing(self, conversation_id: int, user_id: int, username: str, is_typing: bool):
+        self.pending_typing[conversation_id][user_id] = (username, is_typing)
+        self._ensure_running()
+
+    def add_read(self, conversation_id: int, user_id: int, message_ids: List[int]):
+        if not message_ids:
+            return
+        reads = self.pending_reads[conversation_id]
+        reads[user_id] = max(reads.get(user_id, 0), max(message_ids))
+        self._ensure_running()
+
+    def forget_user(self, conversation_id: int, user_id: int):
+        """Очищает состояние typing ушедшего пользователя."""
+        self.sent_typing.pop((conversation_id, user_id), None)
+        if conversation_id in self.pending_typing:
+            self.pending_typing[conversation_id].pop(user_id, None)
+
+    def _ensure_running(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while self.pending_typing or self.pending_reads:
+            await asyncio.sleep(self.tick)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"WS coalescer flush failed: {e}")
+
+    async def flush(self):
+        """Рассылает накопленные события (один фрейм на чат и получателя) и сохраняет прочтения."""
+        typing_batch, self.pending_typing = self.pending_typing, defaultdict(dict)
+        reads_batch, self.pending_reads = self.pending_reads, defaultdict(dict)
+        timestamp = datetime.now(timezone.utc).isoformat()
+
+        watermarks = {
+            (conversation_id, user_id): message_id
+            for conversation_id, reads in reads_batch.items()
+            for user_id, message_id in reads.items()
+        }
+        if watermarks and self.validate:
+            watermarks = await run_in_threadpool(self.validate, watermarks)
+
+        read_events_by_conversation: Dict[int, List[dict]] = defaultdict(list)
+        for (conversation_id, user_id), message_id in watermarks.items():
+            read_events_by_conversation[conversation_id].append(
+                {"user_id": user_id, "last_read_message_id": message_id}
+            )
+
+        for conversation_id in set(typing_batch) | set(read_events_by_conversation):
+            typing_events = []
+            for user_id, (username, is_typing) in typing_batch.get(conversation_id, {}).items():
+                key = (conversation_id, user_id)
+                if self.sent_typing.get(key, False) == is_typing:
+                    continue  # Состояние не изменилось
+                if is_typing:
+                    self.sent_typing[key] = True
+                else:
+                    self.sent_typing.pop(key, None)
+                typing_events.append({"user_id": user_id, "username": username, "is_typing": is_typing})
+
+            read_events = read_events_by_conversation.get(conversation_id, [])
+            if not typing_events and not read_events:
+                continue
+
+            for recipient_id in self.manager.get_online_users_in_conversation(conversation_id):
+                # Свои события получателю не отправляем
+                typing_for = [event for event in typing_events if event["user_id"] != recipient_id]
+                read_for = [event for event in read_events if event["user_id"] != recipient_id]
+                if not typing_for and not read_for:
+                    continue
+                message = {
+                    "type": "events", "conversation_id": conversation_id,
+                    "typing": typing_for, "read": read_for,
+                    "timestamp": timestamp,
+                }
+                await self.manager.send_to_user(conversation_id, recipient_id, json.dumps(message))
+
+        if watermarks and self.persist:
+            await run_in_threadpool(self.persist, watermarks)
+
 class ConnectionManager:
     """Управляет активными WebSocket соединениями для чатов."""
     def __init__(self):
@@ -15,6 +194,8 @@ class ConnectionManager:
         self.active_connections: Dict[int, Dict[int, WebSocket]] = defaultdict(dict)
         # user_id -> {conversation_id} # Отслеживаем, в каких чатах юзер онлайн
         self.user_conversations: Dict[int, Set[int]] = defaultdict(set)
+        # Склейка typing/read событий в один фрейм за тик
+        self.coalescer = EventCoalescer(self)
 
     async def connect(self, websocket: WebSocket, conversation_id: int, user_id: int):
         """Принимает и регистрирует новое соединение."""
@@ -41,6 +222,8 @@ class ConnectionManager:
             if not self.user_conversations[user_id]:
                 del self.user_conversations[user_id]
 
+        self.coalescer.forget_user(conversation_id, user_id)
+
         if disconnected:
             logger.info(f"WS Disconnected: User {user_id} from Conversation {conversation_id}.")
 
@@ -72,6 +255,18 @@ class ConnectionManager:
                  # Оповещаем остальных, что пользователь ушел
                  await self.broadcast_status(conversation_id, uid, "offline", sender_user_id=uid)
 
+    async def send_to_user(self, conversation_id: int, user_id: int, message_json: str):
+        """Отправляет JSON-строку одному участнику чата; мёртвое соединение удаляется."""
+        connection = self.active_connections.get(conversation_id, {}).get(user_id)
+        if connection is None:
+            return
+        try:
+            await connection.send_text(message_json)
+        except Exception as e:
+            logger.warning(f"WS Send Error user {user_id} in C:{conversation_id}: {e}. Removing.")
+            self.disconnect(connection, conversation_id, user_id)
+            await self.broadcast_status(conversation_id, user_id, "offline", sender_user_id=user_id)
+
     async def broadcast_status(self, conversation_id: int, user_id: int, status: str, sender_user_id: Optional[int] = None, sender_websocket: Optional[WebSocket] = None):
         """Рассылает статус пользователя."""
         # Используем sender_user_id для исключения из рассылки
@@ -82,21 +277,12 @@ class ConnectionManager:
         await self.broadcast_to_conversation(conversation_id, json.dumps(message), sender_user_id=user_id)
 
     async def send_typing_indicator(self, conversation_id: int, user_id: int, username: str, is_typing: bool):
-        """Отправляет индикатор печати другим участникам."""
-        message = {
-            "type": "typing", "user_id": user_id, "username": username,
-            "is_typing": is_typing, "conversation_id": conversation_id,
-            "timestamp": datetime.now(timezone.utc).isoformat(),
-        }
-        await self.broadcast_to_conversation(conversation_id, json.dumps(message), sender_user_id=user_id)
+        """Ставит индикатор печати в очередь; рассылается пачкой на следующем тике."""
+        self.coalescer.add_typing(conversation_id, user_id, username, is_typing)
 
     async def send_read_receipt(self, conversation_id: int, user_id: int, message_ids: List[int]):
-        """Отправляет подтверждение прочтения другим участникам."""
-        message = {
-            "type": "read", "user_id": user_id, "message_ids": message_ids,
-            "conversation_id": conversation_id, "timestamp": datetime.now(timezone.utc).isoformat(),
-        }
-        await self.broadcast_to_conversation(conversation_id, json.dumps(message), sender_user_id=user_id)
+        """Ставит подтверждение прочтения в очередь (хранится только максимальный id)."""
+        self.coalescer.add_read(conversation_id, user_id, message_ids)
 
     def get_user_status(self, user_id: int) -> str:
         """Проверяет онлайн-статус пользователя."""
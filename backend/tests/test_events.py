@@ -0,0 +1,254 @@
+"""
+Шина доменных событий: цикл потребителя (run_consumer) на InMemoryEventBus
+и на RedisStreamsEventBus, перехват зависших записей и дедупликация повторов;
+учёт сигналов трендов один раз на пользователя.
+
+Redis-тесты идут против REDIS_URL, если он доступен, иначе против fakeredis;
+если нет ни того, ни другого, они пропускаются.
+"""
+import asyncio
+import uuid
+from collections import defaultdict
+from contextlib import asynccontextmanager
+
+import pytest
+
+from app.events import bus as bus_module
+from app.events import consumer as consumer_module
+from app.events import handlers as handlers_module
+from app.events.bus import InMemoryEventBus, RedisStreamsEventBus, envelope, set_event_bus
+from app.events.consumer import run_consumer
+from app.events.handlers import dispatch, update_trending
+from app.events.types import PostCommented, PostLiked, ProjectVoted
+from app.services import trending_service
+from app.utils.redis_client import get_redis
+
+
+@pytest.fixture
+def handled(monkeypatch):
+    """Подменяет реестр обработчиков одним, который запоминает события."""
+    seen = []
+
+    async def record_likes(events):
+        seen.extend(events)
+
+    registry = defaultdict(list)
+    registry[PostLiked.name].append(record_likes)
+    monkeypatch.setattr(handlers_module, "HANDLERS", registry)
+
+    async def no_outbox(*args, **kwargs):
+        return 0
+
+    # Outbox требует PostgreSQL, здесь проверяется только шина
+    monkeypatch.setattr(consumer_module, "relay_outbox", no_outbox)
+    monkeypatch.setattr(consumer_module, "prune_outbox", lambda: None)
+    monkeypatch.setattr(consumer_module, "BLOCK_MS", 20)
+    yield seen
+    set_event_bus(None)
+
+
+def likes(count):
+    return [envelope(PostLiked(post_id=i, user_id=1, delta=1)) for i in range(count)]
+
+
+async def consume_until(condition, timeout=5.0):
+    """Запускает run_consumer, пока condition() не станет истинным."""
+    stop = asyncio.Event()
+    task = asyncio.create_task(run_consumer(stop, batch_size=10))
+    try:
+        deadline = asyncio.get_running_loop().time() + timeout
+        while not condition():
+            assert asyncio.get_running_loop().time() < deadline, "consumer did not handle the events"
+            await asyncio.sleep(0.01)
+    finally:
+        stop.set()
+        await asyncio.wait_for(task, timeout)
+
+
+# ---------------------- InMemoryEventBus ----------------------
+
+def test_consumer_dispatches_and_acks_in_memory(handled):
+    bus = InMemoryEventBus()
+    set_event_bus(bus)
+
+    async def scenario():
+        await bus.publish(likes(25))
+        await consume_until(lambda: len(bus.acked) == 25)
+
+    asyncio.run(scenario())
+    assert sorted(event.post_id for event in handled) == list(range(25))
+
+
+def test_redelivered_events_are_handled_once(handled):
+    bus = InMemoryEventBus()
+    set_event_bus(bus)
+    envelopes = likes(3)
+
+    async def scenario():
+        await bus.publish(envelopes)
+        deliveries = await bus.read_batch("c1", 10, 0)
+        await dispatch(deliveries, bus)
+        # Повторная доставка той же пачки (например, после падения до ack)
+        bus.redeliver(deliveries)
+        await consume_until(lambda: len(bus.acked) == 3)
+
+    asyncio.run(scenario())
+    assert len(handled) == 3
+
+
+def test_failed_handler_does_not_rerun_succeeded_ones(monkeypatch):
+    # Первый обработчик успевает отработать, второй падает: при повторе
+    # должен выполниться только второй
+    calls = {"counted": 0, "flaky": 0}
+
+    async def counted(events):
+        calls["counted"] += len(events)
+
+    async def flaky(events):
+        calls["flaky"] += 1
+        if calls["flaky"] == 1:
+            raise RuntimeError("downstream unavailable")
+
+    registry = defaultdict(list)
+    registry[PostLiked.name].extend([counted, flaky])
+    monkeypatch.setattr(handlers_module, "HANDLERS", registry)
+    bus = InMemoryEventBus()
+
+    async def scenario():
+        await bus.publish(likes(2))
+        deliveries = await bus.read_batch("c1", 10, 0)
+        with pytest.raises(RuntimeError):
+            await dispatch(deliveries, bus)
+        await dispatch(deliveries, bus)
+
+    asyncio.run(scenario())
+    assert calls == {"counted": 2, "flaky": 2}
+
+
+def test_incomplete_bus_fails_on_creation():
+    class PublishOnlyBus(bus_module.EventBus):
+        async def publish(self, envelopes):
+            pass
+
+    with pytest.raises(TypeError):
+        PublishOnlyBus()
+
+
+# ---------------------- RedisStreamsEventBus ----------------------
+
+async def _redis_available():
+    try:
+        async with get_redis() as redis:
+            await asyncio.wait_for(redis.ping(), 1)
+        return True
+    except Exception:
+        return False
+
+
+@pytest.fixture
+def redis_bus(handled, monkeypatch):
+    if not asyncio.run(_redis_available()):
+        fakeredis = pytest.importorskip("fakeredis")
+        server = fakeredis.FakeServer()
+
+        @asynccontextmanager
+        async def fake_get_redis():
+            # fakeredis не ждёт на XREADGROUP BLOCK и не отдаёт управление
+            # циклу событий — без этой паузы потребитель крутится вхолостую
+            await asyncio.sleep(0.001)
+            yield fakeredis.FakeAsyncRedis(server=server, decode_responses=True)
+
+        monkeypatch.setattr(bus_module, "get_redis", fake_get_redis)
+
+    bus = RedisStreamsEventBus(stream=f"test:events:{uuid.uuid4().hex}", group="test")
+    set_event_bus(bus)
+    yield bus
+
+    async def cleanup():
+        async with bus_module.get_redis() as redis:
+            await redis.delete(bus.stream)
+
+    asyncio.run(cleanup())
+
+
+async def pending_count(bus):
+    async with bus_module.get_redis() as redis:
+        return (await redis.xpending(bus.stream, bus.group))["pending"]
+
+
+def test_consumer_dispatches_and_acks_on_redis(redis_bus, handled):
+    async def scenario():
+        await redis_bus.publish(likes(25))
+        await consume_until(lambda: len(handled) == 25)
+        # ack идёт сразу после dispatch, даём циклу завершить итерацию
+        await asyncio.sleep(0.05)
+        return await pending_count(redis_bus)
+
+    assert asyncio.run(scenario()) == 0
+    assert sorted(event.post_id for event in handled) == list(range(25))
+
+
+def test_consumer_reclaims_entries_of_a_dead_consumer(redis_bus, handled, monkeypatch):
+    monkeypatch.setattr(bus_module, "CLAIM_IDLE_MS", 0)
+
+    async def scenario():
+        await redis_bus.publish(likes(3))
+        # Потребитель прочитал пачку и упал, не подтвердив её
+        assert len(await redis_bus.read_batch("dead-consumer", 10, 0)) == 3
+        await consume_until(lambda: len(handled) == 3)
+        await asyncio.sleep(0.05)
+        return await pending_count(redis_bus)
+
+    assert asyncio.run(scenario()) == 0
+
+
+def test_duplicate_event_ids_are_handled_once_on_redis(redis_bus, handled):
+    envelopes = likes(2)
+
+    async def scenario():
+        # Релей outbox опубликовал пачку дважды (упал до отметки published_at)
+        await redis_bus.publish(envelopes)
+        await redis_bus.publish(envelopes)
+        await consume_until(lambda: len(handled) >= 2)
+        await asyncio.sleep(0.1)
+
+    asyncio.run(scenario())
+    assert len(handled) == 2
+
+
+# ---------------------- Тренды ----------------------
+
+def test_toggled_likes_count_once_per_user(monkeypatch):
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+    server = fakeredis.FakeServer()
+
+    @asynccontextmanager
+    async def fake_get_redis():
+        yield fakeredis.FakeAsyncRedis(server=server, decode_responses=True)
+
+    monkeypatch.setattr(trending_service, "get_redis", fake_get_redis)
+
+    async def scenario():
+        # Лайк -> снятие -> лайк одним пользователем, в разных пачках
+        await update_trending([PostLiked(post_id=1, user_id=7, delta=1)])
+        await update_trending([PostLiked(post_id=1, user_id=7, delta=-1)])
+        await update_trending([
+            PostLiked(post_id=1, user_id=7, delta=1),
+            PostLiked(post_id=1, user_id=8, delta=1),
+            PostCommented(post_id=2, user_id=7, comment_id=1),
+            PostCommented(post_id=2, user_id=7, comment_id=2),
+            ProjectVoted(project_id=3, user_id=7, delta=1, upvoted=True),
+            ProjectVoted(project_id=3, user_id=7, delta=2, upvoted=True),
+        ])
+        async with fake_get_redis() as redis:
+            posts = dict(await redis.zrange(trending_service.trending_key("post"), 0, -1, withscores=True))
+            projects = dict(await redis.zrange(trending_service.trending_key("project"), 0, -1, withscores=True))
+        return posts, projects
+
+    posts, projects = asyncio.run(scenario())
+    weights = trending_service.WEIGHTS
+    # Счёты только что созданного epoch: множитель затухания ~1
+    assert posts["1"] == pytest.approx(2 * weights["post_like"], rel=1e-3)
+    assert posts["2"] == pytest.approx(2 * weights["post_comment"], rel=1e-3)
+    assert projects["3"] == pytest.approx(weights["project_vote"], rel=1e-3)
@@ -65,20 +65,74 @@ const NavBar = () => {
         }
     }, [navigate, logout, isAuthenticated]);
 
+    // Live notifications. The stream is opened with a single-use ticket, so the
+    // browser's own reconnect would be rejected: on error we fetch a new ticket
+    // and reconnect ourselves, resuming from the last event id we saw
+    useEffect(() => {
+        if (!isAuthenticated) return;
+
+        let source = null;
+        let retryTimer = null;
+        let lastEventId = null;
+        let closed = false;
+
+        const reconnectLater = () => {
+            if (!closed) retryTimer = setTimeout(connect, 5000);
+        };
+
+        const connect = async () => {
+            try {
+                const token = localStorage.getItem("access_token");
+                if (!token) return;
+
+                const response = await axios.post(
+                    `${import.meta.env.VITE_API_URL}/notifications/stream-ticket`,
+                    {},
+                    {
+                        headers: { Authorization: `Bearer ${token}` },
+                    }
+                );
+                if (closed) return;
+
+                const params = new URLSearchParams({ ticket: response.data.ticket });
+                if (lastEventId) params.set("last_event_id", lastEventId);
+                source = new EventSource(`${import.meta.env.VITE_API_URL}/notifications/stream?${params}`);
+                source.addEventListener("notification", (event) => {
+                    lastEventId = event.lastEventId;
+                    setUnreadNotifications((count) => count + 1);
+                });
+                source.onerror = () => {
+                    source.close();
+                    reconnectLater();
+                };
+            } catch (error) {
+                console.error("Error opening notification stream:", error);
+                // An expired session is handled by the auth check above
+                if (error.response?.status !== 401) reconnectLater();
+            }
+        };
+
+        connect();
+        return () => {
+            closed = true;
+            clearTimeout(retryTimer);
+            if (source) source.close();
+        };
+    }, [isAuthenticated]);
+
     const fetchUnreadNotificationCount = async () => {
         try {
             const token = localStorage.getItem("access_token");
             if (!token) return;
 
             const response = await axios.get(
-                `${import.meta.env.VITE_API_URL}/notifications/me`,
+                `${import.meta.env.VITE_API_URL}/notifications/me/unread-count`,
                 {
                     headers: { Authorization: `Bearer ${token}` },
                 }
             );
             
-            const unreadCount = response.data.filter(notification => !notification.read).length;
-            setUnreadNotifications(unreadCount);
+            setUnreadNotifications(response.data.unread);
         } catch (error) {
             console.error("Error fetching notification count:", error);
         }
@@ -6,6 +6,15 @@ from typing import List
 
 class Settings(BaseSettings):
     DATABASE_URL: str
+    # Database pool (per process) and statement timeout; DB_ASYNC runs sessions on asyncpg
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_TIMEOUT: float = 30
+    DB_STATEMENT_TIMEOUT_MS: int = 5000
+    DB_ASYNC: bool = False
+    # Recommendation index: full rebuild interval (writes on this instance apply immediately)
+    RECOMMENDATION_REFRESH_SECONDS: int = 300
     ALLOWED_ORIGINS: List[str] = ["http://localhost:3000", "http://localhost:5173"]
     
     class Config:
@@ -2,15 +2,17 @@
 Project Service - Project and Team Management
 Handles projects, teams, applications, and recommendations
 """
-from fastapi import FastAPI, HTTPException, Header, Depends
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Header, Depends, Query
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
 from typing import Optional, List
 import logging
 
-from app.database import get_db, engine
+from app.database import DbSession, database, get_db, engine
 from app import models, schemas
 from app.config import settings
+from app.services import project_service
+from app.services.recommendations import recommender
 
 # Create tables
 models.Base.metadata.create_all(bind=engine)
@@ -18,10 +20,18 @@ models.Base.metadata.create_all(bind=engine)
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    recommender.start(database)
+    yield
+    await recommender.stop()
+    await database.dispose()
+
 app = FastAPI(
     title="ConnectIn Project Service",
     description="Project and team management service",
     version="2.0.0",
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -37,6 +47,11 @@ app.add_middleware(
 async def health_check():
     return {"status": "healthy", "service": "project-service"}
 
+# Connection pool state
+@app.get("/metrics")
+async def metrics():
+    return {"database": database.stats(), "recommendations": recommender.stats()}
+
 # Get user ID from header (set by API Gateway)
 def get_current_user_id(x_user_id: Optional[str] = Header(None)) -> Optional[int]:
     if x_user_id:
@@ -49,48 +64,60 @@ async def list_projects(
     skip: int = 0,
     limit: int = 20,
     tech_stack: Optional[str] = None,
-    db: Session = Depends(get_db),
+    db: DbSession = Depends(get_db),
     user_id: Optional[int] = Depends(get_current_user_id)
 ):
     """Get all projects with optional filtering"""
-    query = db.query(models.Project)
-    
-    if tech_stack:
-        query = query.filter(models.Project.tech_stack.contains([tech_stack]))
-    
-    projects = query.offset(skip).limit(limit).all()
-    return projects
+    return await db.run(project_service.list_projects, skip, limit, tech_stack)
 
 # Create project
 @app.post("/projects", response_model=schemas.ProjectResponse, status_code=201)
 async def create_project(
     project: schemas.ProjectCreate,
-    db: Session = Depends(get_db),
+    db: DbSession = Depends(get_db),
     user_id: int = Depends(get_current_user_id)
 ):
     """Create a new project"""
     if not user_id:
         raise HTTPException(status_code=401, detail="Authentication required")
     
-    db_project = models.Project(
-        **project.dict(),
-        owner_id=user_id
-    )
-    db.add(db_project)
-    db.commit()
-    db.refresh(db_project)
+    db_project = await db.run(project_service.create_project, project, user_id)
+    recommender.upsert(db_project)
     
     logger.info(f"Project created: {db_project.id} by user {user_id}")
     return db_project
 
+# Get recommendations (declared before /projects/{project_id}, which would capture it)
+@app.get("/projects/recommendations", response_model=List[schemas.RecommendedProject])
+async def get_recommendations(
+    skills: Optional[str] = Query(None, description="Comma-separated technologies, e.g. python,react"),
+    roles: Optional[str] = Query(None, description="Comma-separated roles the user can take"),
+    limit: int = Query(10, ge=1, le=50),
+    user_id: int = Depends(get_current_user_id),
+    db: DbSession = Depends(get_db)
+):
+    """Get project recommendations for user, scored by skill and role overlap"""
+    if not user_id:
+        raise HTTPException(status_code=401, detail="Authentication required")
+    
+    await recommender.ensure_ready(database)
+    applied = await db.run(project_service.applied_project_ids, user_id)
+    return recommender.recommend(
+        user_id,
+        skills.split(",") if skills else [],
+        roles.split(",") if roles else [],
+        applied,
+        limit,
+    )
+
 # Get single project
 @app.get("/projects/{project_id}", response_model=schemas.ProjectResponse)
 async def get_project(
     project_id: int,
-    db: Session = Depends(get_db)
+    db: DbSession = Depends(get_db)
 ):
     """Get project by ID"""
-    project = db.query(models.Project).filter(models.Project.id == project_id).first()
+    project = await db.run(project_service.get_project, project_id)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     return project
@@ -100,47 +127,44 @@ async def get_project(
 async def update_project(
     project_id: int,
     project_update: schemas.ProjectUpdate,
-    db: Session = Depends(get_db),
+    db: DbSession = Depends(get_db),
     user_id: int = Depends(get_current_user_id)
 ):
     """Update project"""
     if not user_id:
         raise HTTPException(status_code=401, detail="Authentication required")
     
-    db_project = db.query(models.Project).filter(models.Project.id == project_id).first()
+    db_project = await db.run(project_service.get_project, project_id)
     if not db_project:
         raise HTTPException(status_code=404, detail="Project not found")
     
     if db_project.owner_id != user_id:
         raise HTTPException(status_code=403, detail="Not authorized to update this project")
     
-    for key, value in project_update.dict(exclude_unset=True).items():
-        setattr(db_project, key, value)
-    
-    db.commit()
-    db.refresh(db_project)
+    db_project = await db.run(project_service.update_project, db_project, project_update)
+    recommender.upsert(db_project)
     return db_project
 
 # Delete project
 @app.delete("/projects/{project_id}")
 async def delete_project(
     project_id: int,
-    db: Session = Depends(get_db),
+    db: DbSession = Depends(get_db),
     user_id: int = Depends(get_current_user_id)
 ):
     """Delete project"""
     if not user_id:
         raise HTTPException(status_code=401, detail="Authentication required")
     
-    db_project = db.query(models.Project).filter(models.Project.id == project_id).first()
+    db_project = await db.run(project_service.get_project, project_id)
     if not db_project:
         raise HTTPException(status_code=404, detail="Project not found")
     
     if db_project.owner_id != user_id:
         raise HTTPException(status_code=403, detail="Not authorized to delete this project")
     
-    db.delete(db_project)
-    db.commit()
+    await db.run(project_service.delete_project, db_project)
+    recommender.remove(project_id)
     
     return {"message": "Project deleted successfully"}
 
@@ -149,7 +173,7 @@ async def delete_project(
 async def apply_to_project(
     project_id: int,
     application: schemas.ApplicationCreate,
-    db: Session = Depends(get_db),
+    db: DbSession = Depends(get_db),
     user_id: int = Depends(get_current_user_id)
 ):
     """Apply to a project"""
@@ -157,43 +181,37 @@ async def apply_to_project(
         raise HTTPException(status_code=401, detail="Authentication required")
     
     # Check if project exists
-    project = db.query(models.Project).filter(models.Project.id == project_id).first()
+    project = await db.run(project_service.get_project, project_id)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     
     # Check if already applied
-    existing = db.query(models.Application).filter(
-        models.Application.project_id == project_id,
-        models.Application.user_id == user_id
-    ).first()
+    existing = await db.run(project_service.get_application, project_id, user_id)
     
     if existing:
         raise HTTPException(status_code=400, detail="Already applied to this project")
     
     # Create application
-    db_application = models.Application(
-        project_id=project_id,
-       user_id=user_id,
-        message=application.message
-    )
-    db.add(db_application)
-    db.commit()
+    await db.run(project_service.create_application, project_id, user_id, application.message)
     
     return {"message": "Application submitted successfully"}
 
-# Get recommendations (placeholder)
-@app.get("/projects/recommendations")
-async def get_recommendations(
-    user_id: int = Depends(get_current_user_id),
-    db: Session = Depends(get_db)
+# List applications
+@app.get("/projects/{project_id}/applications", response_model=List[schemas.ApplicationResponse])
+async def list_applications(
+    project_id: int,
+    db: DbSession = Depends(get_db),
+    user_id: int = Depends(get_current_user_id)
 ):
-    """Get project recommendations for user"""
+    """List applications to a project: all of them for the owner, own application otherwise"""
     if not user_id:
         raise HTTPException(status_code=401, detail="Authentication required")
     
-    # TODO: Integrate with ML service
-    projects = db.query(models.Project).limit(10).all()
-    return projects
+    project = await db.run(project_service.get_project, project_id)
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+    
+    return await db.run(project_service.list_applications, project, user_id)
 
 if __name__ == "__main__":
     import uvicorn
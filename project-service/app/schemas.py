@@ -38,5 +38,21 @@ class ProjectResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class RecommendedProject(ProjectResponse):
+    score: float
+    matched_tech: List[str] = []
+    matched_roles: List[str] = []
+
 class ApplicationCreate(BaseModel):
     message: Optional[str] = None
+
+class ApplicationResponse(BaseModel):
+    id: int
+    project_id: int
+    user_id: int
+    message: Optional[str]
+    status: str
+    created_at: datetime
+    
+    class Config:
+        from_attributes = True
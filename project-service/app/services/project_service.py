@@ -0,0 +1,72 @@
+"""
+Project service logic (sync Session code, called through DbSession.run)
+"""
+from sqlalchemy import any_, literal
+from sqlalchemy.orm import Session
+from typing import List, Optional, Set
+
+from app import models, schemas
+
+def list_projects(db: Session, skip: int, limit: int, tech_stack: Optional[str] = None) -> List[models.Project]:
+    """List projects, optionally filtered by technology"""
+    query = db.query(models.Project)
+    if tech_stack:
+        # Generic ARRAY has no contains(); tech_stack = ANY(projects.tech_stack) is the portable form
+        query = query.filter(literal(tech_stack) == any_(models.Project.tech_stack))
+    return query.offset(skip).limit(limit).all()
+
+def get_project(db: Session, project_id: int) -> Optional[models.Project]:
+    """Get project by ID"""
+    return db.query(models.Project).filter(models.Project.id == project_id).first()
+
+def create_project(db: Session, project: schemas.ProjectCreate, owner_id: int) -> models.Project:
+    """Create a new project"""
+    db_project = models.Project(**project.dict(), owner_id=owner_id)
+    db.add(db_project)
+    db.commit()
+    db.refresh(db_project)
+    return db_project
+
+def update_project(db: Session, db_project: models.Project, project_update: schemas.ProjectUpdate) -> models.Project:
+    """Apply the fields set in the update"""
+    for key, value in project_update.dict(exclude_unset=True).items():
+        setattr(db_project, key, value)
+    db.commit()
+    db.refresh(db_project)
+    return db_project
+
+def delete_project(db: Session, db_project: models.Project) -> None:
+    """Delete project"""
+    db.delete(db_project)
+    db.commit()
+
+def get_application(db: Session, project_id: int, user_id: int) -> Optional[models.Application]:
+    """Get a user's application to a project"""
+    return db.query(models.Application).filter(
+        models.Application.project_id == project_id,
+        models.Application.user_id == user_id
+    ).first()
+
+def create_application(db: Session, project_id: int, user_id: int, message: Optional[str]) -> models.Application:
+    """Create an application to a project"""
+    db_application = models.Application(
+        project_id=project_id,
+        user_id=user_id,
+        message=message
+    )
+    db.add(db_application)
+    db.commit()
+    db.refresh(db_application)
+    return db_application
+
+def list_applications(db: Session, project: models.Project, user_id: int) -> List[models.Application]:
+    """Applications to a project: all of them for the owner, own application otherwise"""
+    query = db.query(models.Application).filter(models.Application.project_id == project.id)
+    if project.owner_id != user_id:
+        query = query.filter(models.Application.user_id == user_id)
+    return query.order_by(models.Application.created_at.desc()).all()
+
+def applied_project_ids(db: Session, user_id: int) -> Set[int]:
+    """IDs of projects the user applied to"""
+    rows = db.query(models.Application.project_id).filter(models.Application.user_id == user_id).all()
+    return {row[0] for row in rows}
@@ -0,0 +1,317 @@
+"""
+Project recommendations from an in-memory inverted index
+
+The index maps each technology and role to the open projects that list it.
+A request only scores the projects sharing at least one skill or role with
+the user, so latency depends on the matching postings rather than on the
+number of projects.
+
+Scoring:
+- technology: sum of idf(tech) * skill weight over matched technologies,
+  divided by sqrt(len(project.tech_stack)) so long stacks do not win by size
+- role: share of the project's required roles the user can fill
+- ties: newer projects first
+
+Explicit skills (query parameter) weigh 1.0. Technologies of the projects
+the user owns or applied to are added as implicit skills weighing 0.25.
+The user's own projects and projects they applied to are never returned.
+
+The index is rebuilt from the database in the background every
+RECOMMENDATION_REFRESH_SECONDS, which also picks up writes made by other
+instances, and updated in place after writes handled by this instance.
+"""
+import asyncio
+import heapq
+import math
+import time
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+import logging
+
+from sqlalchemy.orm import Session
+
+from app import models, schemas
+from app.config import settings
+from app.db_runtime import Database
+
+logger = logging.getLogger(__name__)
+
+EXPLICIT_SKILL_WEIGHT = 1.0
+IMPLICIT_SKILL_WEIGHT = 0.25
+
+
+def normalize_terms(values: Optional[Iterable[str]]) -> FrozenSet[str]:
+    return frozenset(v.strip().lower() for v in values or () if v and v.strip())
+
+
+@dataclass(frozen=True)
+class IndexedProject:
+    id: int
+    owner_id: int
+    tech: FrozenSet[str]
+    roles: FrozenSet[str]
+    created_at: float
+    project: schemas.ProjectResponse
+
+
+def is_recommendable(project: models.Project) -> bool:
+    return bool(project.is_active) and project.status == "open"
+
+
+def index_entry(project: models.Project) -> IndexedProject:
+    return IndexedProject(
+        id=project.id,
+        owner_id=project.owner_id,
+        tech=normalize_terms(project.tech_stack),
+        roles=normalize_terms(project.required_roles),
+        created_at=project.created_at.timestamp() if project.created_at else 0.0,
+        project=schemas.ProjectResponse.model_validate(project),
+    )
+
+
+class ProjectIndex:
+    """Postings by technology, role and owner over recommendable projects"""
+
+    def __init__(self):
+        self.projects: Dict[int, IndexedProject] = {}
+        self.by_tech: Dict[str, Set[int]] = {}
+        self.by_role: Dict[str, Set[int]] = {}
+        self.by_owner: Dict[int, Set[int]] = {}
+
+    @staticmethod
+    def _post(postings: Dict, key, project_id: int) -> None:
+        postings.setdefault(key, set()).add(project_id)
+
+    @staticmethod
+    def _unpost(postings: Dict, key, project_id: int) -> None:
+        ids = postings.get(key)
+        if ids is not None:
+            ids.discard(project_id)
+            if not ids:
+                del postings[key]
+
+    def add(self, entry: IndexedProject) -> None:
+        self.remove(entry.id)
+        self.projects[entry.id] = entry
+        for tech in entry.tech:
+            self._post(self.by_tech, tech, entry.id)
+        for role in entry.roles:
+            self._post(self.by_role, role, entry.id)
+        self._post(self.by_owner, entry.owner_id, entry.id)
+
+    def remove(self, project_id: int) -> None:
+        entry = self.projects.pop(project_id, None)
+        if entry is None:
+            return
+        for tech in entry.tech:
+            self._unpost(self.by_tech, tech, project_id)
+        for role in entry.roles:
+            self._unpost(self.by_role, role, project_id)
+        self._unpost(self.by_owner, entry.owner_id, project_id)
+
+    def idf(self, tech: str) -> float:
+        return math.log(1 + len(self.projects) / len(self.by_tech[tech]))
+
+    def user_profile(self, user_id: int, skills: FrozenSet[str], applied: Set[int]) -> Dict[str, float]:
+        """Skill weights: explicit skills plus technologies of owned and applied-to projects"""
+        weights: Dict[str, float] = {}
+        for project_id in self.by_owner.get(user_id, set()) | applied:
+            entry = self.projects.get(project_id)
+            if entry is not None:
+                for tech in entry.tech:
+                    weights[tech] = IMPLICIT_SKILL_WEIGHT
+        for skill in skills:
+            weights[skill] = EXPLICIT_SKILL_WEIGHT
+        return weights
+
+    def search(
+        self,
+        user_id: int,
+        skills: FrozenSet[str],
+        roles: FrozenSet[str],
+        applied: Set[int],
+        limit: int,
+    ) -> List[Tuple[IndexedProject, float, List[str], List[str]]]:
+        """
+        Top `limit` projects for the user
+
+        Returns:
+            list: (entry, score, matched technologies, matched roles), best first
+        """
+        excluded = self.by_owner.get(user_id, set()) | applied
+        weights = self.user_profile(user_id, skills, applied)
+
+        tech_scores: Dict[int, float] = {}
+        for tech, weight in weights.items():
+            postings = self.by_tech.get(tech)
+            if not postings:
+                continue
+            contribution = self.idf(tech) * weight
+            for project_id in postings:
+                if project_id not in excluded:
+                    tech_scores[project_id] = tech_scores.get(project_id, 0.0) + contribution
+
+        role_hits: Dict[int, int] = {}
+        for role in roles:
+            for project_id in self.by_role.get(role, ()):
+                if project_id not in excluded:
+                    role_hits[project_id] = role_hits.get(project_id, 0) + 1
+
+        candidates = tech_scores.keys() | role_hits.keys()
+        if not candidates:
+            # Nothing to match on: newest open projects
+            newest = heapq.nlargest(
+                limit,
+                (entry for entry in self.projects.values() if entry.id not in excluded),
+                key=lambda entry: (entry.created_at, entry.id),
+            )
+            return [(entry, 0.0, [], []) for entry in newest]
+
+        def score(project_id: int) -> float:
+            entry = self.projects[project_id]
+            value = tech_scores.get(project_id, 0.0) / math.sqrt(len(entry.tech) or 1)
+            if project_id in role_hits:
+                value += role_hits[project_id] / len(entry.roles)
+            return value
+
+        scored = ((score(project_id), project_id) for project_id in candidates)
+        top = heapq.nlargest(limit, scored, key=lambda item: (item[0], self.projects[item[1]].created_at, item[1]))
+        return [
+            (
+                self.projects[project_id],
+                round(value, 4),
+                sorted(self.projects[project_id].tech & weights.keys()),
+                sorted(self.projects[project_id].roles & roles),
+            )
+            for value, project_id in top
+        ]
+
+
+def build_index(db: Session) -> ProjectIndex:
+    """Full index from the database (runs in the threadpool / run_sync)"""
+    index = ProjectIndex()
+    projects = db.query(models.Project).filter(
+        models.Project.is_active.is_(True),
+        models.Project.status == "open",
+    ).all()
+    for project in projects:
+        index.add(index_entry(project))
+    return index
+
+
+class Recommender:
+    """
+    Owns the live index. All index reads and writes happen on the event loop;
+    only the database read of a rebuild runs elsewhere. Writes that arrive
+    while a rebuild is loading are replayed onto the new index before it is
+    swapped in.
+    """
+
+    def __init__(self):
+        self.index = ProjectIndex()
+        self.ready = False
+        self.last_refresh: Optional[float] = None
+        self._replay: Optional[List[Tuple[str, object]]] = None
+        self._task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+        self._timings: List[float] = []
+        self.requests = 0
+
+    async def refresh(self, database: Database) -> None:
+        async with self._lock:
+            self._replay = []
+            try:
+                async with database.open_session() as db:
+                    index = await db.run(build_index)
+                for op, value in self._replay:
+                    if op == "upsert":
+                        index.add(value)
+                    else:
+                        index.remove(value)
+            finally:
+                self._replay = None
+            self.index = index
+            self.ready = True
+            self.last_refresh = time.time()
+        logger.info(f"Recommendation index rebuilt: {len(index.projects)} projects, {len(index.by_tech)} technologies")
+
+    async def ensure_ready(self, database: Database) -> None:
+        """Build the index on first use if the startup build has not finished or failed"""
+        if not self.ready:
+            await self.refresh(database)
+
+    async def _refresh_loop(self, database: Database) -> None:
+        while True:
+            try:
+                await self.refresh(database)
+            except Exception as e:
+                logger.error(f"Recommendation index refresh failed: {str(e)}")
+            await asyncio.sleep(settings.RECOMMENDATION_REFRESH_SECONDS)
+
+    def start(self, database: Database) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._refresh_loop(database))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def upsert(self, project: models.Project) -> None:
+        """Reflect a created or updated project"""
+        if not is_recommendable(project):
+            self.remove(project.id)
+            return
+        entry = index_entry(project)
+        self.index.add(entry)
+        if self._replay is not None:
+            self._replay.append(("upsert", entry))
+
+    def remove(self, project_id: int) -> None:
+        self.index.remove(project_id)
+        if self._replay is not None:
+            self._replay.append(("remove", project_id))
+
+    def recommend(
+        self,
+        user_id: int,
+        skills: Iterable[str],
+        roles: Iterable[str],
+        applied: Set[int],
+        limit: int,
+    ) -> List[schemas.RecommendedProject]:
+        started = time.perf_counter()
+        results = self.index.search(user_id, normalize_terms(skills), normalize_terms(roles), applied, limit)
+        recommended = [
+            schemas.RecommendedProject(
+                **entry.project.model_dump(),
+                score=score,
+                matched_tech=matched_tech,
+                matched_roles=matched_roles,
+            )
+            for entry, score, matched_tech, matched_roles in results
+        ]
+        self._timings.append(time.perf_counter() - started)
+        if len(self._timings) > 1000:
+            del self._timings[:500]
+        self.requests += 1
+        return recommended
+
+    def stats(self) -> dict:
+        timings = sorted(self._timings)
+        return {
+            "ready": self.ready,
+            "projects": len(self.index.projects),
+            "technologies": len(self.index.by_tech),
+            "roles": len(self.index.by_role),
+            "last_refresh": self.last_refresh,
+            "requests": self.requests,
+            "p95_ms": round(timings[int(len(timings) * 0.95) - 1] * 1000, 3) if len(timings) >= 20 else None,
+        }
+
+
+recommender = Recommender()